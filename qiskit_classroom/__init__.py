@@ -85,10 +85,32 @@ Qiskit-Classroom is licensed under the Apache License, Version 2.0
 #  specific language governing permissions and limitations
 #  under the License.
 
-from qiskit_class_converter import (
-    __FULL_VERSION__ as qiskit_classroom_converter_version,
-)
+from importlib import metadata
+
+
+def package_version(name: str) -> str:
+    """read version of installed distribution without importing it
+
+    Args:
+        name (str): distribution name
+
+    Returns:
+        str: version, unknown when not installed
+    """
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
 
+# same as __FULL_VERSION__ of qiskit_class_converter, whose import loads
+# whole qiskit stack
 QISKIT_CLASSROOM_CONVERTER_VERSION_STR = " ".join(
-    [f"{key}: {value}" for key, value in qiskit_classroom_converter_version.items()]
+    [
+        f"{key}: {value}"
+        for key, value in {
+            "Qiskit": package_version("qiskit"),
+            "Lib": package_version("qiskit-classroom-converter"),
+        }.items()
+    ]
 )
@@ -22,6 +22,7 @@ entry point for gui application
 import sys
 import asyncio
 import functools
+import time
 
 # pylint: disable=no-name-in-module
 from PySide6.QtWidgets import QMainWindow, QStatusBar
@@ -56,44 +57,95 @@ def move_center(window: QMainWindow):
     window.move(frame.topLeft())
 
 
+def create_main_window() -> tuple[QMainWindow, ConverterModel]:
+    """create main window with converter view, model and presenter.
+    conversion workers and renderers are started lazily, so this only
+    builds widgets
+
+    Returns:
+        tuple[QMainWindow, ConverterModel]: main window and its model
+    """
+    main_window = QMainWindow(None)
+    main_window.setWindowTitle("Qiskit_classroom")
+    version_bar = QStatusBar(main_window)
+    version_bar.showMessage("running on " + QISKIT_CLASSROOM_CONVERTER_VERSION_STR)
+    main_window.setStatusBar(version_bar)
+
+    model = ConverterModel()
+    view = ConverterView()
+
+    main_window.setCentralWidget(view)
+
+    presenter = ConverterPresenter(view, model)
+    view.set_presenter(presenter=presenter)
+    return (main_window, model)
+
+
+async def warm_up(main_window: QMainWindow, model: ConverterModel) -> None:
+    """warm up model in background and report it on status bar
+
+    Args:
+        main_window (QMainWindow): main window
+        model (ConverterModel): model of main window
+    """
+    status_bar = main_window.statusBar()
+    version = "running on " + QISKIT_CLASSROOM_CONVERTER_VERSION_STR
+    status_bar.showMessage("warming up converter... " + version)
+    started = time.perf_counter()
+    try:
+        await model.warm_up()
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        # first conversion starts what is missing and shows real error
+        print(f"warm up failed {exc}")
+        status_bar.showMessage(version)
+        return
+    status_bar.showMessage(
+        f"ready in {time.perf_counter() - started:.1f}s, " + version
+    )
+
+
 async def async_main():
     """
     async main for app
     """
 
     def close_future(future: asyncio.Future, loop):
+        nonlocal quitting
+        quitting = True
         loop.call_later(10, future.cancel)
         future.cancel()
-        # remove remain image
-        model.remove_result_img_path()
 
     loop = asyncio.get_event_loop()
     future = asyncio.Future()
+    # qt quits without closing window, so event loop stops after this
+    quitting = False
 
     app = QApplication.instance()
     if hasattr(app, "aboutToQuit"):
         getattr(app, "aboutToQuit").connect(
             functools.partial(close_future, future, loop)
         )
+    if hasattr(app, "lastWindowClosed"):
+        # closed window ends async_main, which quits after workers stop
+        app.setQuitOnLastWindowClosed(False)
+        getattr(app, "lastWindowClosed").connect(future.cancel)
 
-    main_window = QMainWindow(None)
-    main_window.setWindowTitle("Qiskit_classroom")
-    version_bar = QStatusBar(main_window)
-    version_bar.showMessage("running on " + QISKIT_CLASSROOM_CONVERTER_VERSION_STR)
-    main_window.setStatusBar(version_bar)
-
-    model = ConverterModel()
-    view = ConverterView()
-
-    main_window.setCentralWidget(view)
-
-    presenter = ConverterPresenter(view, model)
-    view.set_presenter(presenter=presenter)
-
+    main_window, model = create_main_window()
     main_window.show()
+    # cold start is paid while user types first input
+    warming_up = asyncio.ensure_future(warm_up(main_window, model))
     move_center(main_window)
 
-    await future
+    try:
+        await future
+    finally:
+        warming_up.cancel()
+        # drop remain image
+        model.clear_result_image()
+        if not quitting:
+            # reap worker processes while event loop still runs
+            await asyncio.gather(warming_up, return_exceptions=True)
+            await model.shutdown()
     return True
 
 
@@ -0,0 +1,189 @@
+"""
+    paginated drawing of quantum circuits
+
+    a circuit is cut into pages of fixed number of layers. every page is
+    drawn on its own, so pages are drawn in parallel and the first page
+    is shown no matter how deep the circuit is. functions taking circuit
+    bytes run in engine process with qiskit.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import hashlib
+import io
+from typing import Callable, NamedTuple
+from .result_cache import make_key
+
+# layers of each page. a page of 20 layers fits one row of the drawing
+DEFAULT_PAGE_LAYERS = 20
+# image format of serialized circuit. scripts export circuit instead of
+# drawing it when they are asked for this format
+CIRCUIT_FORMAT = "qpy"
+# every page has same name, so same page of any circuit has same qpy
+PAGE_NAME = "page"
+
+
+class CircuitPage(NamedTuple):
+    """drawn page of circuit"""
+
+    index: int
+    count: int
+    image: bytes
+
+
+PageCallback = Callable[[CircuitPage], None]
+
+
+def layers_of(circuit) -> list[int]:
+    """return layer of every instruction. an instruction is placed right
+    after the last instruction on any of its bits, including bits its
+    condition reads
+
+    Args:
+        circuit (QuantumCircuit): circuit
+
+    Returns:
+        list[int]: layer of each instruction of circuit.data
+    """
+    # pylint: disable=import-outside-toplevel
+    from qiskit.circuit.controlflow import condition_resources
+
+    # next free layer of each bit
+    depth: dict = {}
+    layers = []
+    for instruction in circuit.data:
+        bits = [*instruction.qubits, *instruction.clbits]
+        condition = getattr(instruction.operation, "condition", None)
+        if condition is not None:
+            bits.extend(condition_resources(condition).clbits)
+        layer = max((depth.get(bit, 0) for bit in bits), default=0)
+        for bit in bits:
+            depth[bit] = layer + 1
+        layers.append(layer)
+    return layers
+
+
+def split_circuit(circuit, page_layers: int = DEFAULT_PAGE_LAYERS) -> list:
+    """cut circuit into pages of page_layers layers
+
+    Args:
+        circuit (QuantumCircuit): circuit
+        page_layers (int): layers of each page
+
+    Returns:
+        list[QuantumCircuit]: pages with registers of circuit, named PAGE_NAME
+    """
+    layers = layers_of(circuit)
+    count = max(layers, default=0) // page_layers + 1
+    pages = [circuit.copy_empty_like(PAGE_NAME) for _ in range(count)]
+    for instruction, layer in zip(circuit.data, layers):
+        pages[layer // page_layers].append(instruction)
+    return pages
+
+
+def page_key(data: bytes, image_format: str) -> str:
+    """return cache key of serialized page. qpy holds every detail drawn,
+    such as exact parameters, labels, conditions and control states, so
+    only identical pages share a key
+
+    Args:
+        data (bytes): qpy of page
+        image_format (str): format of image
+
+    Returns:
+        str: cache key
+    """
+    # pylint: disable=import-outside-toplevel
+    import qiskit
+
+    return make_key(
+        page=hashlib.sha256(data).hexdigest(),
+        image_format=image_format,
+        versions=qiskit.__version__,
+    )
+
+
+def dump_circuit(circuit) -> bytes:
+    """serialize circuit
+
+    Args:
+        circuit (QuantumCircuit): circuit
+
+    Returns:
+        bytes: qpy of circuit
+    """
+    # pylint: disable=import-outside-toplevel
+    from qiskit import qpy
+
+    output = io.BytesIO()
+    qpy.dump(circuit, output)
+    return output.getvalue()
+
+
+def load_circuit(data: bytes):
+    """deserialize circuit
+
+    Args:
+        data (bytes): qpy of circuit
+
+    Returns:
+        QuantumCircuit: circuit
+    """
+    # pylint: disable=import-outside-toplevel
+    from qiskit import qpy
+
+    return qpy.load(io.BytesIO(data))[0]
+
+
+def split_pages(
+    data: bytes, page_layers: int, image_format: str
+) -> list[tuple[str, bytes]]:  # pragma: no cover
+    # this function run in engine process with qiskit
+    """cut serialized circuit into serialized pages
+
+    Args:
+        data (bytes): qpy of circuit
+        page_layers (int): layers of each page
+        image_format (str): format pages are drawn in
+
+    Returns:
+        list[tuple[str, bytes]]: cache key and qpy of each page
+    """
+    pages = [
+        dump_circuit(page) for page in split_circuit(load_circuit(data), page_layers)
+    ]
+    return [(page_key(page, image_format), page) for page in pages]
+
+
+def draw_page(data: bytes, image_format: str) -> bytes:  # pragma: no cover
+    # this function run in engine process with qiskit
+    """draw serialized page
+
+    Args:
+        data (bytes): qpy of page
+        image_format (str): format of image
+
+    Returns:
+        bytes: encoded image
+    """
+    image = io.BytesIO()
+    # page is short already, never fold it into rows
+    load_circuit(data).draw(output="mpl", fold=-1).savefig(
+        image, format=image_format, bbox_inches="tight"
+    )
+    return image.getvalue()
@@ -0,0 +1,318 @@
+"""
+    headless command line converter
+
+    pre-render exercise material without GUI. this module and everything it
+    imports must never import PySide6.
+
+    example::
+
+        qiskit-classroom-cli --from MATRIX --to CIRCUIT --jobs 4 \\
+            --output-dir rendered --summary summary.json exercises/
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+# select non-interactive backend before pyplot is imported by worker
+import matplotlib
+
+matplotlib.use("Agg")
+
+# pylint: disable=wrong-import-position
+from .converter_model import ConversionJob, ConverterModel
+from .direct_engine import parse_matrix_literal
+from .expression_enum import Converting_method, QuantumExpression
+from .input_model import Input, MatrixInput, QuantumCircuitInput
+from .matrix_latex import DEFAULT_MAX_MATRIX_SIZE
+from .worker import IMAGE_FORMATS
+
+INPUT_SUFFIXES = (".py", ".qasm", ".txt")
+
+
+def collect_files(paths: list[str]) -> list[tuple[str, str]]:
+    """expand directories to input files
+
+    Args:
+        paths (list[str]): files or directories
+
+    Returns:
+        list[tuple[str, str]]: input files in stable order, each with its
+        path relative to given directory, or its name when file was given
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(
+                    (
+                        os.path.join(root, name),
+                        os.path.relpath(os.path.join(root, name), path),
+                    )
+                    for name in sorted(names)
+                    if name.endswith(INPUT_SUFFIXES)
+                )
+        else:
+            files.append((path, os.path.basename(path)))
+    return files
+
+
+def make_input(args: argparse.Namespace, expression_text: str) -> Input:
+    """create input of file
+
+    Args:
+        args (argparse.Namespace): parsed arguments
+        expression_text (str): file contents
+
+    Raises:
+        ValueError: when number of qubits is not given and cannot be inferred
+
+    Returns:
+        Input: input for from expression
+    """
+    if args.from_expression is QuantumExpression.MATRIX:
+        num_qubits = args.num_qubits
+        if num_qubits is None:
+            matrix = parse_matrix_literal(expression_text)
+            if matrix is None:
+                raise ValueError("--num-qubits is required for this matrix")
+            num_qubits = len(matrix).bit_length() - 1
+        return MatrixInput(num_qubits, args.measure)
+    return QuantumCircuitInput(args.value_name)
+
+
+def output_path(args: argparse.Namespace, relative_path: str) -> str:
+    """return output path of input file. directories of input are mirrored
+    and source extension is kept, so a/x.txt, b/x.txt and a/x.py get
+    different outputs
+
+    Args:
+        args (argparse.Namespace): parsed arguments
+        relative_path (str): input file relative to given directory
+
+    Returns:
+        str: output path
+    """
+    return os.path.join(args.output_dir, f"{relative_path}.{args.format}")
+
+
+def expression_type(name: str) -> QuantumExpression:
+    """argparse type of expression name
+
+    Args:
+        name (str): expression name
+
+    Raises:
+        argparse.ArgumentTypeError: when name is not expression
+
+    Returns:
+        QuantumExpression: expression
+    """
+    try:
+        return QuantumExpression[name.upper()]
+    except KeyError as exc:
+        raise argparse.ArgumentTypeError(f"unknown expression {name}") from exc
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """parse command line arguments
+
+    Args:
+        argv (list[str]): arguments without program name
+
+    Returns:
+        argparse.Namespace: parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="qiskit-classroom-cli",
+        description="convert and visualize quantum expressions without GUI",
+    )
+    parser.add_argument("paths", nargs="+", help="input files or directories")
+    parser.add_argument(
+        "--from",
+        dest="from_expression",
+        required=True,
+        type=expression_type,
+        choices=[QuantumExpression.CIRCUIT, QuantumExpression.MATRIX],
+        metavar="{CIRCUIT,MATRIX}",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_expression",
+        required=True,
+        type=expression_type,
+        choices=[
+            QuantumExpression.CIRCUIT,
+            QuantumExpression.DIRAC,
+            QuantumExpression.MATRIX,
+        ],
+        metavar="{CIRCUIT,DIRAC,MATRIX}",
+    )
+    parser.add_argument(
+        "--value-name",
+        default="quantum_circuit",
+        help="value name of quantum circuit in python inputs",
+    )
+    parser.add_argument(
+        "--num-qubits",
+        type=int,
+        default=None,
+        help="number of qubits of matrix, inferred from matrix size by default",
+    )
+    parser.add_argument("--measure", action="store_true", help="measure all qubits")
+    parser.add_argument(
+        "--shows-result", action="store_true", help="let result state show"
+    )
+    parser.add_argument("--format", choices=IMAGE_FORMATS, default="png")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument(
+        "--max-matrix-size",
+        type=int,
+        default=DEFAULT_MAX_MATRIX_SIZE,
+        help="larger matrices are summarized instead of written in full",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, help="number of parallel conversions"
+    )
+    parser.add_argument(
+        "--summary",
+        default=None,
+        help="write json summary with per file timings to path, - for stdout",
+    )
+    args = parser.parse_args(argv)
+    if args.to_expression not in Converting_method[args.from_expression]:
+        parser.error(
+            f"cannot convert {args.from_expression.name} to {args.to_expression.name}"
+        )
+    if args.format == "tex" and args.to_expression is QuantumExpression.CIRCUIT:
+        parser.error("tex format is for MATRIX and DIRAC results")
+    if args.jobs < 1:
+        parser.error("--jobs must be positive")
+    return args
+
+
+async def convert_files(
+    args: argparse.Namespace, files: list[tuple[str, str]]
+) -> list[dict]:
+    """convert every file. file whose output path is taken by earlier file
+    fails instead of overwriting it
+
+    Args:
+        args (argparse.Namespace): parsed arguments
+        files (list[tuple[str, str]]): input files and relative paths
+
+    Returns:
+        list[dict]: summary of each file in input order
+    """
+    records: list[dict] = [{"path": path} for path, _ in files]
+    destinations = [output_path(args, relative_path) for _, relative_path in files]
+    # output path -> input file writing it
+    owners: dict[str, str] = {}
+    jobs = []
+    for record, destination in zip(records, destinations):
+        input_data, expression_text = None, None
+        if destination in owners:
+            record.update(
+                status="error",
+                error=f"output {destination} is also written by "
+                + owners[destination],
+                seconds=0.0,
+            )
+        else:
+            owners[destination] = record["path"]
+            try:
+                with open(record["path"], "r", encoding="UTF-8") as file:
+                    expression_text = file.read().strip()
+                input_data = make_input(args, expression_text)
+            except (OSError, ValueError) as exc:
+                record.update(status="error", error=str(exc), seconds=0.0)
+        jobs.append(
+            ConversionJob(
+                args.from_expression, args.to_expression, input_data, expression_text
+            )
+        )
+
+    model = ConverterModel(pool_size=args.jobs)
+    model.max_matrix_size = args.max_matrix_size
+    pending = [index for index, record in enumerate(records) if "status" not in record]
+    try:
+        async for result in model.convert_many(
+            [jobs[index] for index in pending],
+            shows_result=args.shows_result,
+            concurrency=args.jobs,
+            image_format=args.format,
+        ):
+            record = records[pending[result.index]]
+            record["seconds"] = round(result.elapsed, 4)
+            if result.error is not None or result.image is None:
+                record.update(
+                    status="error",
+                    error=f"{type(result.error).__name__}: {result.error}",
+                )
+            else:
+                destination = destinations[pending[result.index]]
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                # only disk write of conversion
+                with open(destination, "wb") as file:
+                    file.write(result.image)
+                record.update(status="ok", output=destination)
+            print(f"{record['status']} {record['path']}", file=sys.stderr)
+    finally:
+        await model.shutdown()
+    return records
+
+
+def main(argv: list[str] = None) -> int:
+    """entry point of command line converter
+
+    Args:
+        argv (list[str]): arguments without program name
+
+    Returns:
+        int: exit code, 1 when any file failed
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    files = collect_files(args.paths)
+    started = time.perf_counter()
+    # keep stdout for summary, worker logs go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        records = asyncio.run(convert_files(args, files))
+    failed = sum(record["status"] != "ok" for record in records)
+    summary = {
+        "files": records,
+        "succeeded": len(records) - failed,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    if args.summary == "-":
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    elif args.summary is not None:
+        with open(args.summary, "w", encoding="UTF-8") as file:
+            json.dump(summary, file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
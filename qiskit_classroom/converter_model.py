@@ -19,10 +19,29 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
-import os
+import asyncio
+import functools
+import time
+from typing import AsyncIterator, Iterable, NamedTuple
+from . import QISKIT_CLASSROOM_CONVERTER_VERSION_STR
+from .circuit_pages import (
+    CIRCUIT_FORMAT,
+    DEFAULT_PAGE_LAYERS,
+    CircuitPage,
+    PageCallback,
+)
 from .expression_enum import QuantumExpression
-from .worker import ConverterWorker
-from .input_model import Input
+from .worker import DISPLAY_FORMATS, ConverterWorker
+from .executor import ExecutionMode, create_executor
+from .direct_engine import DirectConversionEngine
+from .input_model import Input, QuantumCircuitInput, MatrixInput
+from .limits import ResourceLimits
+from .matrix_latex import DEFAULT_MAX_MATRIX_SIZE
+from .progress import Progress, ProgressCallback
+from .renderer import LatexRenderer
+from .result_cache import ResultCache, make_key
+from .scheduler import LatestJobScheduler
+from .worker_pool import DEFAULT_POOL_SIZE
 
 
 class ConvertingRuleException(Exception):
@@ -37,18 +56,110 @@ class ConvertingRuleException(Exception):
         )
 
 
+class ConversionJob(NamedTuple):
+    """one conversion of batch"""
+
+    from_expression: QuantumExpression
+    to_expression: QuantumExpression
+    input_data: Input
+    expression_text: str
+
+
+class ConversionResult(NamedTuple):
+    """result of one batch job"""
+
+    # position of job in batch
+    index: int
+    # encoded image, None when conversion failed
+    image: bytes
+    # raised exception, None when conversion succeeded
+    error: Exception
+    # seconds spent on this job
+    elapsed: float
+
+
+# conversion run at launch. matrix input is converted by engine, which
+# imports qiskit and converter and draws with matplotlib
+WARM_UP_JOB = ConversionJob(
+    QuantumExpression.MATRIX,
+    QuantumExpression.CIRCUIT,
+    MatrixInput(1, False),
+    "[[0, 1], [1, 0]]",
+)
+
+
+def make_result_key(
+    job: ConversionJob,
+    shows_result: bool,
+    image_format: str = "png",
+    max_matrix_size: int = DEFAULT_MAX_MATRIX_SIZE,
+) -> str:
+    """return cache key of conversion
+
+    Args:
+        job (ConversionJob): conversion
+        shows_result (bool): shows result option
+        image_format (str): format of result file
+        max_matrix_size (int): larger matrices are summarized
+
+    Returns:
+        str: cache key
+    """
+    input_fields = {}
+    if isinstance(job.input_data, QuantumCircuitInput):
+        input_fields["value_name"] = job.input_data.value_name
+    if isinstance(job.input_data, MatrixInput):
+        # value_name of MatrixInput is random, it does not change result
+        input_fields["num_qubits"] = job.input_data.num_qubits
+        input_fields["do_measure"] = job.input_data.do_measure
+    return make_key(
+        from_expression=getattr(job.from_expression, "name", None),
+        to_expression=getattr(job.to_expression, "name", None),
+        expression_text=job.expression_text,
+        input_data=input_fields,
+        shows_result=shows_result,
+        image_format=image_format,
+        max_matrix_size=max_matrix_size,
+        versions=QISKIT_CLASSROOM_CONVERTER_VERSION_STR,
+    )
+
+
 # pylint: disable=too-many-instance-attributes
 class ConverterModel:
     """
     class for converter
     """
 
-    def __init__(self) -> None:
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        execution_mode: ExecutionMode = ExecutionMode.POOL,
+        result_cache: ResultCache = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        limits: ResourceLimits = None,
+        image_format: str = "svg",
+    ) -> None:
+        if image_format not in DISPLAY_FORMATS:
+            raise ValueError(f"result image cannot be shown as {image_format}")
         self.__from_expression = None
         self.__to_expression = None
-        self.__result_img_path = ""
+        self.__result_image: bytes = None
         self.__input_data = None
         self.__expression_text = ""
+        # runaway conversions are killed instead of freezing the app
+        self.limits = limits if limits is not None else ResourceLimits()
+        # workers are started lazily on first conversion
+        self.executor = create_executor(execution_mode, pool_size, self.limits)
+        self.direct_engine = DirectConversionEngine(pool_size, self.limits)
+        self.renderer = LatexRenderer(pool_size, self.limits)
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.scheduler = LatestJobScheduler()
+        # format of result_image. svg is scaled without rendering again
+        self.image_format = image_format
+        # larger matrices are summarized instead of written in full
+        self.max_matrix_size = DEFAULT_MAX_MATRIX_SIZE
+        # layers of each page of paginated circuit result
+        self.page_layers = DEFAULT_PAGE_LAYERS
 
     @property
     def from_expression(self) -> QuantumExpression:
@@ -88,19 +199,19 @@ class ConverterModel:
         print(f"to expression changed to {value}")
 
     @property
-    def result_img_path(self) -> str:
-        """property of __result_img_path
+    def result_image(self) -> bytes:
+        """property of __result_image
 
         Returns:
-            str: result_img_path
+            bytes: encoded result image, None before first conversion
         """
 
-        return self.__result_img_path
+        return self.__result_image
 
-    @result_img_path.setter
-    def result_img_path(self, value: str) -> None:
-        self.__result_img_path = value
-        print(f"result img path change to {value}")
+    @result_image.setter
+    def result_image(self, value: bytes) -> None:
+        self.__result_image = value
+        print(f"result image change to {len(value) if value else 0} bytes")
 
     @property
     def input_data(self) -> Input:
@@ -130,31 +241,266 @@ class ConverterModel:
         self.__expression_text = value
         print(f"expression_text change to {value}")
 
-    async def convert_and_draw(self, shows_result: bool) -> bool:
-        """run worker to converting expression and visualizating expression
+    def current_job(self) -> ConversionJob:
+        """return conversion of current fields
 
         Returns:
-            bool: if converting and drawing was success return true
+            ConversionJob: conversion
         """
-
-        worker = ConverterWorker(
+        return ConversionJob(
             self.from_expression,
             self.to_expression,
             self.input_data,
             self.expression_text,
-            shows_result=shows_result,
         )
-        img_path = await worker.run()
 
-        # replace image and remove previously generated image
-        if img_path is not None:
-            self.remove_result_img_path()
-            self.result_img_path = img_path
+    def result_cache_key(self, shows_result: bool) -> str:
+        """return cache key of current conversion
+
+        Args:
+            shows_result (bool): shows result option
+
+        Returns:
+            str: cache key
+        """
+        return make_result_key(
+            self.current_job(), shows_result, self.image_format, self.max_matrix_size
+        )
+
+    async def convert_and_draw(
+        self,
+        shows_result: bool,
+        on_progress: ProgressCallback = None,
+        on_page: PageCallback = None,
+    ) -> bool:
+        """run worker to converting expression and visualizating expression.
+        running conversion is cancelled when this method is called again
+
+        Args:
+            shows_result (bool): shows result option
+            on_progress (ProgressCallback): receive progress while converting
+            on_page (PageCallback): receive pages of circuit result as they
+                are drawn. result_image is None then. without it circuit is
+                drawn as one image
+
+        Raises:
+            JobSuperseded: when newer conversion was requested
+
+        Returns:
+            bool: if converting and drawing was success return true
+        """
+        return await self.scheduler.submit(
+            functools.partial(
+                self.__convert_and_draw, shows_result, on_progress, on_page
+            )
+        )
+
+    async def __convert_and_draw(
+        self,
+        shows_result: bool,
+        on_progress: ProgressCallback,
+        on_page: PageCallback,
+    ) -> bool:
+        if on_page is not None and self.to_expression is QuantumExpression.CIRCUIT:
+            self.clear_result_image()
+            await self.draw_pages(
+                self.current_job(), shows_result, on_page, on_progress
+            )
+            return True
+
+        image = await self.convert(
+            self.current_job(), shows_result, self.image_format, on_progress
+        )
+
+        # replace previous image
+        if image is not None:
+            self.result_image = image
         return True
 
-    def remove_result_img_path(self) -> None:
-        """remove generated img file"""
-        if self.__result_img_path is not None:
-            if os.path.isfile(self.__result_img_path):
-                os.remove(self.__result_img_path)
-                print(f"remove {self.result_img_path}")
+    async def convert(
+        self,
+        job: ConversionJob,
+        shows_result: bool,
+        image_format: str = "png",
+        on_progress: ProgressCallback = None,
+    ) -> bytes:
+        """convert expression and visualize it. cached result is reused
+
+        Args:
+            job (ConversionJob): conversion
+            shows_result (bool): shows result option
+            image_format (str): format of result image
+            on_progress (ProgressCallback): receive progress while converting
+
+        Returns:
+            bytes: encoded image
+        """
+        cache_key = make_result_key(
+            job, shows_result, image_format, self.max_matrix_size
+        )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        image = await self.create_worker(
+            job, shows_result, image_format, on_progress
+        ).run()
+        if image:
+            await self.result_cache.store(cache_key, image)
+        return image
+
+    def create_worker(
+        self,
+        job: ConversionJob,
+        shows_result: bool,
+        image_format: str = "png",
+        on_progress: ProgressCallback = None,
+    ) -> ConverterWorker:
+        """create worker running job on executor, engine and renderer of
+        this model
+
+        Args:
+            job (ConversionJob): conversion
+            shows_result (bool): shows result option
+            image_format (str): format of result image
+            on_progress (ProgressCallback): receive progress while converting
+
+        Returns:
+            ConverterWorker: worker
+        """
+        return ConverterWorker(
+            job.from_expression,
+            job.to_expression,
+            job.input_data,
+            job.expression_text,
+            shows_result=shows_result,
+            pool=self.executor,
+            engine=self.direct_engine,
+            image_format=image_format,
+            limits=self.limits,
+            on_progress=on_progress,
+            renderer=self.renderer,
+            max_matrix_size=self.max_matrix_size,
+        )
+
+    async def warm_up(self) -> None:
+        """start workers, engine and renderers, then convert and render
+        samples, so first conversion does not pay for cold start. samples
+        bypass result cache, otherwise later launches would skip them
+
+        Raises:
+            RuntimeError: when sample could not be converted or rendered
+        """
+        tasks = [
+            self.create_worker(WARM_UP_JOB, False, self.image_format).run(),
+            self.renderer.warm_up(self.image_format),
+        ]
+        if self.executor is not None:
+            tasks.append(self.executor.start())
+        await asyncio.gather(*tasks)
+
+    async def draw_pages(
+        self,
+        job: ConversionJob,
+        shows_result: bool,
+        on_page: PageCallback,
+        on_progress: ProgressCallback = None,
+    ) -> int:
+        """convert job to quantum circuit and draw it page by page. pages
+        are drawn in parallel, each cached by its gates, and passed to
+        on_page in order of completion
+
+        Args:
+            job (ConversionJob): conversion to quantum circuit
+            shows_result (bool): shows result option
+            on_page (PageCallback): receive each drawn page
+            on_progress (ProgressCallback): receive progress while converting
+
+        Returns:
+            int: number of pages
+        """
+        circuit = await self.convert(job, shows_result, CIRCUIT_FORMAT, on_progress)
+        pages = await self.direct_engine.split_pages(
+            circuit, self.page_layers, self.image_format
+        )
+
+        async def draw(index: int, key: str, page: bytes) -> CircuitPage:
+            image = self.result_cache.get(key)
+            if image is None:
+                image = await self.direct_engine.draw_page(page, self.image_format)
+                await self.result_cache.store(key, image)
+            return CircuitPage(index, len(pages), image)
+
+        # engine takes pages in submit order, first page is drawn first
+        tasks = [
+            asyncio.ensure_future(draw(index, key, page))
+            for index, (key, page) in enumerate(pages)
+        ]
+        try:
+            for done, next_page in enumerate(asyncio.as_completed(tasks), 1):
+                on_page(await next_page)
+                if on_progress is not None:
+                    on_progress(Progress("drawing", done, len(pages)))
+        finally:
+            for task in tasks:
+                task.cancel()
+        return len(pages)
+
+    async def convert_many(
+        self,
+        jobs: Iterable[ConversionJob],
+        shows_result: bool = False,
+        concurrency: int = DEFAULT_POOL_SIZE,
+        image_format: str = "png",
+    ) -> AsyncIterator[ConversionResult]:
+        """convert many expressions with bounded concurrency.
+        results are yielded in order of completion
+
+        Args:
+            jobs (Iterable[ConversionJob]): (from, to, input, text) of each job
+            shows_result (bool): shows result option for every job
+            concurrency (int): maximum number of jobs running at once
+            image_format (str): format of result images
+
+        Yields:
+            ConversionResult: result of each job
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, job: ConversionJob) -> ConversionResult:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    image = await self.convert(job, shows_result, image_format)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    # one broken job must not stop the batch
+                    return ConversionResult(
+                        index, None, exc, time.perf_counter() - started
+                    )
+                return ConversionResult(
+                    index, image, None, time.perf_counter() - started
+                )
+
+        tasks = [
+            asyncio.ensure_future(run(index, ConversionJob(*job)))
+            for index, job in enumerate(jobs)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def clear_result_image(self) -> None:
+        """drop result image"""
+        self.__result_image = None
+
+    async def shutdown(self) -> None:
+        """stop conversion workers, engine and renderers and wait until
+        their processes exit"""
+        self.scheduler.cancel()
+        tasks = [self.direct_engine.shutdown(), self.renderer.shutdown()]
+        if self.executor is not None:
+            tasks.append(self.executor.terminate())
+        await asyncio.gather(*tasks)
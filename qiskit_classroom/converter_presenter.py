@@ -19,12 +19,14 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
-import asyncio
 from subprocess import TimeoutExpired
 from typing import TYPE_CHECKING
 from .expression_enum import QuantumExpression, Converting_method
+from .circuit_pages import CircuitPage
 from .input_model import Input
 from .converter_model import ConvertingRuleException
+from .limits import ConversionLimitExceeded
+from .scheduler import JobSuperseded
 
 if TYPE_CHECKING:
     from .converter_model import ConverterModel
@@ -127,15 +129,25 @@ class ConverterPresenter:
         """
         self.view.show_progress_bar()
         result = False
+        superseded = False
         self.model.expression_text = self.view.get_expression_plain_text_text().strip()
         input_data: Input = self.view.get_input(self.model.from_expression)
 
         self.model.input_data = input_data
 
+        # circuit pages open their own dialog as soon as first page is drawn
+        self.view.reset_result_pages()
         try:
             result = await self.model.convert_and_draw(
-                shows_result=self.view.get_shows_result()
+                shows_result=self.view.get_shows_result(),
+                on_progress=self.view.update_progress,
+                on_page=self.on_result_page,
             )
+        except JobSuperseded:
+            # newer conversion owns progress bar and result
+            superseded = True
+        except ConversionLimitExceeded as exc:
+            self.view.show_alert_message(str(exc))
         except RuntimeError as exc:
             self.view.show_alert_message("conversion processe error\n" + exc.__str__())
         except TimeoutExpired:
@@ -149,13 +161,23 @@ class ConverterPresenter:
         except NameError:
             self.view.show_alert_message("value_name or some value name not defined")
         finally:
-            self.view.close_progress_bar()
+            if not superseded:
+                self.view.close_progress_bar()
 
-        if result:
-            # wait until file save
-            await asyncio.sleep(0.5)
-            self.view.show_result_image(self.model.result_img_path)
+        if result and self.model.result_image is not None:
+            # image arrives in memory with result of conversion
+            self.view.show_result_image(
+                self.model.result_image, self.model.image_format
+            )
+
+    def on_result_page(self, page: CircuitPage) -> None:
+        """show page of circuit result
+
+        Args:
+            page (CircuitPage): drawn page
+        """
+        self.view.show_result_page(page, self.model.image_format)
 
     def on_view_destoryed(self) -> None:
-        """remove image file on view destryed"""
-        self.model.remove_result_img_path()
+        """drop result image on view destryed"""
+        self.model.clear_result_image()
@@ -26,6 +26,8 @@ from qiskit_classroom.expression_enum import (
     Converting_method,
     QuantumExpression,
 )
+from qiskit_classroom.circuit_pages import CircuitPage
+from qiskit_classroom.progress import Progress
 from qiskit_classroom.result_image_dialog import ResultImageDialog
 from qiskit_classroom.input_view import (
     ExpressionPlainText,
@@ -57,6 +59,8 @@ class ConverterView(QWidget):
         super().__init__()
         self.presenter = None
         self.currently_showing_input = QuantumExpression.NONE
+        # dialog receiving pages of running circuit conversion
+        self.result_pages_dialog: ResultImageDialog = None
         self.set_ui()
         self.center()
         self.setAcceptDrops(True)
@@ -296,8 +300,27 @@ class ConverterView(QWidget):
         """
         show progress bar to user. show progress to user!
         """
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setLabelText("wait for progressing")
         self.progress_bar.show()
 
+    def update_progress(self, progress: Progress) -> None:
+        """show progress of running conversion
+
+        Args:
+            progress (Progress): progress event
+        """
+        if progress.total > 0:
+            self.progress_bar.setRange(0, progress.total)
+            self.progress_bar.setValue(progress.done)
+            self.progress_bar.setLabelText(
+                f"{progress.stage} {progress.done}/{progress.total}"
+            )
+        else:
+            # unknown size, busy indicator
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setLabelText(progress.stage)
+
     def close_progress_bar(self) -> None:
         """
         close progress bar dialog
@@ -313,10 +336,28 @@ class ConverterView(QWidget):
         if result == QMessageBox.StandardButton.Yes:
             self.on_convert_push_button_clicked()
 
-    def show_result_image(self, image_path: str) -> None:
+    def reset_result_pages(self) -> None:
+        """let next circuit page open new ResultImageDialog"""
+        self.result_pages_dialog = None
+
+    def show_result_page(self, page: CircuitPage, image_format: str = "png") -> None:
+        """show page of circuit result. first page of conversion opens
+        ResultImageDialog, later pages are added to it
+
+        Args:
+            page (CircuitPage): drawn page
+            image_format (str): png or svg
+        """
+        if self.result_pages_dialog is None:
+            self.result_pages_dialog = ResultImageDialog(self)
+            self.result_pages_dialog.show_pages(page.count, image_format)
+        self.result_pages_dialog.set_page(page)
+
+    def show_result_image(self, image: bytes, image_format: str = "png") -> None:
         """show result image by ResultImageDialog
 
         Args:
-            image_path (str): image path want to show
+            image (bytes): encoded image want to show
+            image_format (str): png or svg
         """
-        ResultImageDialog(self).show_image(image_path=image_path)
+        ResultImageDialog(self).show_image(image=image, image_format=image_format)
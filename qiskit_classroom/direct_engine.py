@@ -0,0 +1,310 @@
+"""
+    conversion engine for structured inputs
+
+    matrix literals and OpenQASM programs need no user code, so they are
+    converted by calling ConversionService directly instead of generating
+    and executing a script.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import ast
+import asyncio
+import io
+import signal
+from typing import Any, Callable, Union
+from .circuit_pages import CIRCUIT_FORMAT, draw_page, dump_circuit, split_pages
+from .expression_enum import QuantumExpression
+from .input_model import Input, MatrixInput
+from .limits import ResourceLimits, apply_limits, clear_limits
+from .matrix_latex import DEFAULT_MAX_MATRIX_SIZE, matrix_to_latex
+from .process_pool import SpawnedProcessPool
+from .worker_process import CpuTimeExceeded, on_cpu_time_exceeded, preload
+
+DEFAULT_MAX_WORKERS = 2
+
+
+def parse_matrix_literal(expression_text: str) -> list:
+    """parse matrix written as python literal
+
+    Args:
+        expression_text (str): matrix text
+
+    Returns:
+        list: matrix, None when text is not a plain literal matrix
+    """
+    try:
+        matrix = ast.literal_eval(expression_text.strip())
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+    if not isinstance(matrix, (list, tuple)) or not matrix:
+        return None
+    if not all(isinstance(row, (list, tuple)) for row in matrix):
+        return None
+    return matrix
+
+
+def is_qasm(expression_text: str) -> bool:
+    """check text is OpenQASM program
+
+    Args:
+        expression_text (str): expression text
+
+    Returns:
+        bool: text starts with OPENQASM header
+    """
+    return expression_text.lstrip().startswith("OPENQASM")
+
+
+def is_structured(
+    from_expression: QuantumExpression,
+    to_expression: QuantumExpression,
+    expression_text: str,
+) -> bool:
+    """check conversion can run without executing user code
+
+    Args:
+        from_expression (QuantumExpression): from expression
+        to_expression (QuantumExpression): to expression
+        expression_text (str): expression text
+
+    Returns:
+        bool: conversion is supported by direct engine
+    """
+    if to_expression is QuantumExpression.NONE:
+        return False
+    if from_expression is QuantumExpression.MATRIX:
+        return parse_matrix_literal(expression_text) is not None
+    if from_expression is QuantumExpression.CIRCUIT:
+        return is_qasm(expression_text)
+    return False
+
+
+def format_gate_matrices(
+    result: dict, shows_result: bool, max_matrix_size: int = DEFAULT_MAX_MATRIX_SIZE
+) -> str:
+    """format QC_TO_MATRIX result same as generated visualization code
+
+    Args:
+        result (dict): QC_TO_MATRIX result with numpy matrices
+        shows_result (bool): append result state
+        max_matrix_size (int): larger matrices are summarized
+
+    Returns:
+        str: latex
+    """
+    otimes = " \\otimes "
+    lines = [
+        "\\stackrel{"
+        + otimes.join(name[1])
+        + "}{"
+        + matrix_to_latex(gate, max_matrix_size)
+        + "}"
+        for gate, name in zip(reversed(result["gate"]), reversed(result["name"]))
+    ]
+    if shows_result:
+        lines.append(
+            "= \\stackrel{result}{"
+            + matrix_to_latex(result["result"], max_matrix_size)
+            + "}"
+        )
+    return "\n".join(lines)
+
+
+def convert_structured(
+    from_expression: QuantumExpression,
+    to_expression: QuantumExpression,
+    input_data: Input,
+    expression_text: str,
+    shows_result: bool,
+    image_format: str,
+    max_matrix_size: int = DEFAULT_MAX_MATRIX_SIZE,
+) -> Union[str, bytes]:  # pragma: no cover
+    # this function run in engine process with qiskit
+    """convert structured input
+
+    Returns:
+        Union[str, bytes]: latex for MATRIX and DIRAC, encoded image for CIRCUIT
+        or qpy of circuit when image_format is CIRCUIT_FORMAT
+    """
+    # pylint: disable=import-outside-toplevel, too-many-arguments, too-many-locals
+    import numpy as np
+    from qiskit import QuantumCircuit
+    from qiskit_class_converter import ConversionService
+
+    if from_expression is QuantumExpression.MATRIX:
+        matrix = parse_matrix_literal(expression_text)
+        if to_expression is QuantumExpression.MATRIX:
+            return matrix_to_latex(np.array(matrix), max_matrix_size)
+        matrix_input: MatrixInput = input_data
+        converter = ConversionService(
+            conversion_type="MATRIX_TO_QC", option={"label": "unitary gate"}
+        )
+        result = converter.convert(input_value=matrix)
+        quantum_circuit = QuantumCircuit(matrix_input.num_qubits)
+        quantum_circuit.append(result, list(range(result.num_qubits)))
+        if matrix_input.do_measure:
+            quantum_circuit.measure_all()
+    else:
+        quantum_circuit = QuantumCircuit.from_qasm_str(expression_text)
+        if to_expression is not QuantumExpression.CIRCUIT:
+            # MATRIX result stays numpy, matrix_to_latex summarizes it
+            option = {"print": "raw"}
+            if to_expression is QuantumExpression.MATRIX:
+                option = {}
+            converter = ConversionService(
+                conversion_type=f"QC_TO_{to_expression.value[1]}", option=option
+            )
+            result = converter.convert(input_value=quantum_circuit)
+            if to_expression is QuantumExpression.MATRIX:
+                return format_gate_matrices(result, shows_result, max_matrix_size)
+            return str(result)
+
+    if image_format == CIRCUIT_FORMAT:
+        return dump_circuit(quantum_circuit)
+    image = io.BytesIO()
+    quantum_circuit.draw(output="mpl").savefig(
+        image, format=image_format, bbox_inches="tight"
+    )
+    return image.getvalue()
+
+
+def initialize_engine() -> None:  # pragma: no cover
+    # this function run in engine process
+    """preload libraries and stop job instead of process on SIGXCPU"""
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, on_cpu_time_exceeded)
+    preload()
+
+
+def run_limited(limits: dict, function: Callable, *args) -> Any:  # pragma: no cover
+    # this function run in engine process
+    """run function under cpu and address space limits
+
+    Args:
+        limits (dict): cpu_time and memory limits
+        function (Callable): module level function of engine process
+
+    Returns:
+        Any: result of function
+    """
+    apply_limits(limits)
+    try:
+        return function(*args)
+    finally:
+        clear_limits()
+
+
+class DirectConversionEngine(SpawnedProcessPool):
+    """run structured conversions in a process pool"""
+
+    def __init__(
+        self, max_workers: int = DEFAULT_MAX_WORKERS, limits: ResourceLimits = None
+    ) -> None:
+        """
+        Args:
+            max_workers (int): number of engine processes
+            limits (ResourceLimits): limits of each conversion, None for unlimited
+        """
+        super().__init__(max_workers, initialize_engine, limits)
+
+    # pylint: disable=too-many-arguments
+    async def convert(
+        self,
+        from_expression: QuantumExpression,
+        to_expression: QuantumExpression,
+        input_data: Input,
+        expression_text: str,
+        shows_result: bool,
+        image_format: str,
+        max_matrix_size: int = DEFAULT_MAX_MATRIX_SIZE,
+    ) -> Union[str, bytes]:
+        """convert structured input in engine process
+
+        Raises:
+            ConversionLimitExceeded: when conversion exceeded its limits
+            RuntimeError: when conversion failed
+
+        Returns:
+            Union[str, bytes]: latex for MATRIX and DIRAC, encoded image for
+            CIRCUIT
+        """
+        return await self.run(
+            convert_structured,
+            from_expression,
+            to_expression,
+            input_data,
+            expression_text,
+            shows_result,
+            image_format,
+            max_matrix_size,
+        )
+
+    async def split_pages(
+        self, circuit: bytes, page_layers: int, image_format: str
+    ) -> list[tuple[str, bytes]]:
+        """cut serialized circuit into pages in engine process
+
+        Args:
+            circuit (bytes): qpy of circuit
+            page_layers (int): layers of each page
+            image_format (str): format pages are drawn in
+
+        Returns:
+            list[tuple[str, bytes]]: cache key and qpy of each page
+        """
+        return await self.run(split_pages, circuit, page_layers, image_format)
+
+    async def draw_page(self, page: bytes, image_format: str) -> bytes:
+        """draw page in engine process. pages drawn at once run in parallel
+
+        Args:
+            page (bytes): qpy of page
+            image_format (str): format of image
+
+        Returns:
+            bytes: encoded image
+        """
+        return await self.run(draw_page, page, image_format)
+
+    async def run(self, function: Callable, *args) -> Any:
+        """run function in engine process under limits
+
+        Args:
+            function (Callable): module level function
+
+        Raises:
+            ConversionLimitExceeded: when function exceeded its limits
+            RuntimeError: when function failed
+
+        Returns:
+            Any: result of function
+        """
+        try:
+            return await self.submit(
+                run_limited, self.limits.to_message(), function, *args
+            )
+        except asyncio.TimeoutError:
+            raise self.limits.error_of("wall_time") from None
+        except CpuTimeExceeded:
+            raise self.limits.error_of("cpu_time") from None
+        except MemoryError:
+            raise self.limits.error_of("memory") from None
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # invalid matrix or qasm surfaces as conversion error
+            raise RuntimeError(str(exc)) from exc
@@ -0,0 +1,63 @@
+"""
+    execution modes for generated conversion scripts
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import enum
+from typing import Union
+from .fork_server import ForkServer
+from .limits import ResourceLimits
+from .worker_pool import DEFAULT_POOL_SIZE, WorkerPool
+
+Executor = Union[WorkerPool, ForkServer]
+
+
+class ExecutionMode(enum.Enum):
+    """
+    how ConverterWorker runs generated script
+    """
+
+    # new interpreter for every job
+    SUBPROCESS = "subprocess"
+    # long-lived warm interpreters
+    POOL = "pool"
+    # child forked from warm zygote for every job
+    FORK_SERVER = "fork_server"
+
+
+def create_executor(
+    mode: ExecutionMode,
+    size: int = DEFAULT_POOL_SIZE,
+    limits: ResourceLimits = None,
+) -> Executor:
+    """create executor of mode
+
+    Args:
+        mode (ExecutionMode): execution mode
+        size (int): number of warm workers for POOL
+        limits (ResourceLimits): limits of each job, None for unlimited
+
+    Returns:
+        Executor: executor, None for SUBPROCESS
+    """
+    if mode is ExecutionMode.POOL:
+        return WorkerPool(size, limits=limits)
+    if mode is ExecutionMode.FORK_SERVER:
+        return ForkServer(limits)
+    return None
@@ -0,0 +1,140 @@
+"""
+    pooled matplotlib figures rendering equations
+
+    figures are drawn on the Agg canvas without pyplot, so no global figure
+    manager is touched. text extent is measured before drawing and the
+    figure is sized to it, so every equation is drawn in one pass instead
+    of the two passes of bbox_inches="tight".
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import contextlib
+import io
+import threading
+from typing import Iterator
+import matplotlib as mpl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.text import Text
+from .tex_daemon import DEFAULT_DPI
+
+# margin around equation, same as bbox_inches="tight"
+PAD_INCHES = 0.1
+DEFAULT_MAX_IDLE_FIGURES = 4
+
+# mathtext parser of matplotlib is shared and usetex reads preamble from
+# global rcParams, so only one equation is measured and drawn at a time
+DRAW_LOCK = threading.Lock()
+
+
+def new_figure() -> tuple[Figure, Text]:
+    """create figure on Agg canvas with one empty text
+
+    Returns:
+        tuple[Figure, Text]: figure and its text
+    """
+    figure = Figure(dpi=DEFAULT_DPI)
+    FigureCanvasAgg(figure)
+    # text is placed in inches from bottom left corner of figure
+    text = figure.text(
+        PAD_INCHES,
+        PAD_INCHES,
+        "",
+        transform=figure.dpi_scale_trans,
+        horizontalalignment="left",
+        verticalalignment="bottom",
+    )
+    return (figure, text)
+
+
+class FigurePool:
+    """keep idle figures for reuse. figure is lent to one thread at a time
+    and drawing is serialized, so pool is safe to share between threads"""
+
+    def __init__(self, max_idle: int = DEFAULT_MAX_IDLE_FIGURES) -> None:
+        """
+        Args:
+            max_idle (int): maximum number of kept idle figures
+        """
+        self.max_idle = max_idle
+        self.__idle: list[tuple[Figure, Text]] = []
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__idle)
+
+    @contextlib.contextmanager
+    def figure(self) -> Iterator[tuple[Figure, Text]]:
+        """borrow idle figure or create new one
+
+        Yields:
+            Iterator[tuple[Figure, Text]]: figure and its text
+        """
+        with self.__lock:
+            borrowed = self.__idle.pop() if self.__idle else None
+        if borrowed is None:
+            borrowed = new_figure()
+        try:
+            yield borrowed
+        finally:
+            borrowed[1].set_text("")
+            with self.__lock:
+                if len(self.__idle) < self.max_idle:
+                    self.__idle.append(borrowed)
+
+    def render(self, latex: str, image_format: str, settings: dict) -> bytes:
+        """render latex equation to encoded image
+
+        Args:
+            latex (str): latex on one line
+            image_format (str): format of image
+            settings (dict): matplotlib settings of font.size, text.usetex,
+                mathtext.fontset and text.latex.preamble
+
+        Returns:
+            bytes: encoded image
+        """
+        usetex = settings.get("text.usetex", False)
+        with self.figure() as (figure, text), DRAW_LOCK, (
+            mpl.rc_context({"text.latex.preamble": settings["text.latex.preamble"]})
+            if usetex
+            else contextlib.nullcontext()
+        ):
+            text.set_text(f"${latex}$")
+            text.set_usetex(usetex)
+            text.set_fontproperties(
+                FontProperties(
+                    size=settings["font.size"],
+                    math_fontfamily=settings.get("mathtext.fontset", "cm"),
+                )
+            )
+            extent = text.get_window_extent(figure.canvas.get_renderer())
+            figure.set_size_inches(
+                extent.width / figure.dpi + 2 * PAD_INCHES,
+                extent.height / figure.dpi + 2 * PAD_INCHES,
+            )
+            output = io.BytesIO()
+            figure.savefig(output, format=image_format, dpi=DEFAULT_DPI)
+        return output.getvalue()
+
+
+# figures of matplotlib renders in this process
+FIGURE_POOL = FigurePool()
@@ -0,0 +1,139 @@
+"""
+    fork server (zygote) for conversion jobs
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import itertools
+import os
+from typing import Callable, Optional
+from .limits import ResourceLimits
+from .protocol import JobResult, unpack_result
+from .worker_pool import PooledWorker, spawn_worker
+
+# seconds zygote may take to kill its children and exit
+ZYGOTE_EXIT_TIMEOUT = 5.0
+
+
+class ForkServer:
+    """keep one zygote process which imported qiskit, converter and matplotlib.
+    zygote forks a child per job, so libraries are shared copy-on-write and
+    every job still runs in its own process. jobs are multiplexed over one
+    channel to zygote"""
+
+    def __init__(self, limits: ResourceLimits = None) -> None:
+        """
+        Args:
+            limits (ResourceLimits): limits of each job, None for unlimited
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("fork server is not supported on this platform")
+        self.limits = limits if limits is not None else ResourceLimits(None, None, None)
+        self.__zygote: PooledWorker = None
+        self.__start_lock: asyncio.Lock = None
+        self.__job_ids = itertools.count()
+
+    @property
+    def running(self) -> bool:
+        """property of zygote state
+
+        Returns:
+            bool: zygote is running
+        """
+        return self.__zygote is not None and self.__zygote.alive
+
+    async def spawn_zygote(self) -> PooledWorker:  # pragma: no cover
+        # this method create real process
+        """start zygote process and wait until it is ready
+
+        Returns:
+            PooledWorker: zygote
+        """
+        return await spawn_worker("--zygote")
+
+    async def start(self) -> None:
+        """start zygote if it is not running"""
+        if self.__start_lock is None:
+            self.__start_lock = asyncio.Lock()
+        async with self.__start_lock:
+            if self.running:
+                return
+            if self.__zygote is not None:
+                self.__zygote.kill()
+            self.__zygote = await self.spawn_zygote()
+
+    async def run(
+        self,
+        source: str,
+        on_line: Optional[Callable[[str], None]] = None,
+        artifact: bool = False,
+    ) -> JobResult:
+        """run generated script in a child forked from zygote
+
+        Args:
+            source (str): generated script
+            on_line (Optional[Callable[[str], None]]): receive stdout lines
+                while script runs
+            artifact (bool): script must produce image. image is returned
+                as payload of result
+
+        Raises:
+            ConversionLimitExceeded: when job exceeded its limits
+            ConversionError: when script raised exception
+
+        Returns:
+            JobResult: result of script. stdout is empty when lines were
+            passed to on_line
+        """
+        await self.start()
+        zygote = self.__zygote
+        job_id = next(self.__job_ids)
+        try:
+            frame = await asyncio.wait_for(
+                zygote.run(
+                    job_id, source, self.limits.to_message(), on_line, artifact
+                ),
+                self.limits.wall_time,
+            )
+        except asyncio.TimeoutError:
+            self.__cancel(zygote, job_id)
+            raise self.limits.error_of("wall_time") from None
+        except asyncio.CancelledError:
+            self.__cancel(zygote, job_id)
+            raise
+        return unpack_result(frame, self.limits)
+
+    @staticmethod
+    def __cancel(zygote: PooledWorker, job_id: int) -> None:
+        if zygote.alive:
+            # kill forked child of this job
+            zygote.channel.send({"type": "cancel", "id": job_id})
+
+    async def terminate(self) -> None:
+        """stop zygote and wait until it exits. zygote kills running
+        children when its channel is closed"""
+        zygote, self.__zygote = self.__zygote, None
+        if zygote is None:
+            return
+        zygote.channel.close()
+        try:
+            await asyncio.wait_for(zygote.process.wait(), ZYGOTE_EXIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            print("conversion zygote did not exit, killing it")
+        await zygote.stop()
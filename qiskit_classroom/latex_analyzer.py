@@ -0,0 +1,54 @@
+"""
+    analyzer choosing typesetter of latex result
+
+    matplotlib mathtext renders in process without TeX, but it knows no
+    amsmath environments or \\stackrel. only latex which mathtext parses
+    is rendered with it.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import functools
+import re
+
+# constructs of converter results which only TeX renders
+TEX_ONLY_PATTERN = re.compile(r"\\begin\s*\{|\\stackrel|\\\\")
+
+
+@functools.lru_cache(maxsize=1024)
+def is_mathtext(latex: str) -> bool:
+    """check latex can be rendered by mathtext
+
+    Args:
+        latex (str): normalized latex without $
+
+    Returns:
+        bool: mathtext parses latex
+    """
+    if not latex.strip() or TEX_ONLY_PATTERN.search(latex):
+        return False
+    # matplotlib is loaded on first analysis, not at startup
+    # pylint: disable=import-outside-toplevel
+    from matplotlib.mathtext import MathTextParser
+
+    try:
+        MathTextParser("path").parse(f"${latex}$")
+    except Exception:  # pylint: disable=broad-exception-caught
+        # unknown command or syntax mathtext does not support
+        return False
+    return True
@@ -0,0 +1,141 @@
+"""
+    resource limits for conversion jobs
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # windows. only wall-clock limit is enforced
+    resource = None
+
+DEFAULT_WALL_TIME = 60.0
+DEFAULT_CPU_TIME = 60
+# preloaded worker already maps about 500MB of address space
+DEFAULT_MEMORY = 4 * 1024 * 1024 * 1024
+
+
+class ConversionLimitExceeded(RuntimeError):
+    """
+    Exception class for conversion job which exceeded resource limit
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class ConversionTimeout(ConversionLimitExceeded):
+    """
+    Exception class for conversion job which exceeded wall-clock or cpu time
+    """
+
+
+class ConversionMemoryExceeded(ConversionLimitExceeded):
+    """
+    Exception class for conversion job which exceeded address space
+    """
+
+
+class ResourceLimits:
+    """wall-clock, cpu and address space limits of one conversion job.
+    None means unlimited"""
+
+    def __init__(
+        self,
+        wall_time: float = DEFAULT_WALL_TIME,
+        cpu_time: int = DEFAULT_CPU_TIME,
+        memory: int = DEFAULT_MEMORY,
+    ) -> None:
+        """
+        Args:
+            wall_time (float): seconds until job is killed
+            cpu_time (int): cpu seconds job may use
+            memory (int): bytes of address space job may use
+        """
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.memory = memory
+
+    def to_message(self) -> dict:
+        """return limits enforced inside worker process
+
+        Returns:
+            dict: cpu_time and memory
+        """
+        return {"cpu_time": self.cpu_time, "memory": self.memory}
+
+    def apply(self) -> None:  # pragma: no cover
+        # this method limits current process
+        """limit new process. used as preexec_fn of subprocess"""
+        apply_limits(self.to_message())
+
+    def error_of(self, limit: str) -> ConversionLimitExceeded:
+        """return exception of breached limit
+
+        Args:
+            limit (str): wall_time, cpu_time or memory
+
+        Returns:
+            ConversionLimitExceeded: typed error
+        """
+        if limit == "memory":
+            return ConversionMemoryExceeded(
+                f"conversion exceeded memory limit of {self.memory // (1024 * 1024)} MB"
+            )
+        if limit == "cpu_time":
+            return ConversionTimeout(
+                f"conversion exceeded cpu time limit of {self.cpu_time} s"
+            )
+        return ConversionTimeout(
+            f"conversion exceeded time limit of {self.wall_time} s"
+        )
+
+
+def apply_limits(limits: dict) -> None:
+    """set cpu and address space limits of current process.
+    cpu limit counts from cpu time already used, so long-lived workers can
+    limit each job
+
+    Args:
+        limits (dict): cpu_time and memory, None means unlimited
+    """
+    if resource is None or not limits:
+        return
+    if limits.get("cpu_time"):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        seconds = int(usage.ru_utime + usage.ru_stime) + 1 + limits["cpu_time"]
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        if hard != resource.RLIM_INFINITY:
+            seconds = min(seconds, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (seconds, hard))
+    if limits.get("memory"):
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        memory = limits["memory"]
+        if hard != resource.RLIM_INFINITY:
+            memory = min(memory, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memory, hard))
+
+
+def clear_limits() -> None:
+    """raise cpu and address space soft limits back to hard limits"""
+    if resource is None:
+        return
+    for kind in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+        _, hard = resource.getrlimit(kind)
+        resource.setrlimit(kind, (hard, hard))
@@ -0,0 +1,198 @@
+"""
+    size-aware latex of matrices
+
+    matrices up to max_size rows and columns are written in full. larger
+    matrices are summarized with numpy before any latex is generated, so
+    latex length stays bounded as the number of qubits grows.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import numpy as np
+from .tex_daemon import MAX_MATRIX_COLUMNS
+
+# largest number of rows and columns written in full. 16 is 4 qubits
+DEFAULT_MAX_MATRIX_SIZE = 16
+# largest matrix written in exact form like sqrt(2)/2 by sympy, same as
+# default of array_to_latex. larger matrices are written numerically
+MAX_EXACT_SIZE = 8
+# entries closer to zero are treated as zero
+ZERO_TOLERANCE = 1e-10
+# decimal places of entries in non-zero table
+PRECISION = 5
+
+
+def format_number(value: float) -> str:
+    """format real number without trailing zeros
+
+    Args:
+        value (float): number
+
+    Returns:
+        str: number
+    """
+    return np.format_float_positional(value, precision=PRECISION, trim="-")
+
+
+def format_entry(real: float, imag: float) -> str:
+    """format complex entry as latex
+
+    Args:
+        real (float): rounded real part
+        imag (float): rounded imaginary part
+
+    Returns:
+        str: latex of entry
+    """
+    if imag == 0:
+        return format_number(real)
+    imaginary = "i" if abs(imag) == 1 else f"{format_number(abs(imag))}i"
+    if real == 0:
+        return imaginary if imag > 0 else f"-{imaginary}"
+    sign = "+" if imag > 0 else "-"
+    return f"{format_number(real)} {sign} {imaginary}"
+
+
+def size_label(shape: tuple[int, ...], nonzero: int) -> str:
+    """return latex label of matrix size
+
+    Args:
+        shape (tuple[int, ...]): shape of matrix
+        nonzero (int): number of non-zero entries
+
+    Returns:
+        str: label
+    """
+    return " \\times ".join(map(str, shape)) + f",\\ {nonzero} \\neq 0"
+
+
+def nonzero_table(matrix: np.ndarray, mask: np.ndarray) -> str:
+    """write non-zero entries of sparse matrix as table
+
+    Args:
+        matrix (np.ndarray): two dimensional matrix
+        mask (np.ndarray): non-zero entries of matrix
+
+    Returns:
+        str: latex table of row, column and value
+    """
+    rows, columns = np.nonzero(mask)
+    values = np.round(matrix[rows, columns].astype(complex), PRECISION)
+    lines = [
+        f"({row}, {column}) & {format_entry(real, imag)} \\\\"
+        for row, column, real, imag in zip(
+            rows.tolist(), columns.tolist(), values.real.tolist(), values.imag.tolist()
+        )
+    ]
+    return "\n".join(
+        [
+            "\\begin{array}{c|c}",
+            "(\\mathrm{row}, \\mathrm{column}) & \\mathrm{value} \\\\",
+            "\\hline",
+            *lines,
+            "\\end{array}",
+        ]
+    )
+
+
+def kept_indices(length: int, max_size: int) -> tuple[np.ndarray, int]:
+    """return indices shown along one axis and position of dots
+
+    Args:
+        length (int): length of axis
+        max_size (int): largest number of shown indices including dots
+
+    Returns:
+        tuple[np.ndarray, int]: shown indices and position of dots, -1 when
+        every index is shown
+    """
+    if length <= max_size:
+        return (np.arange(length), -1)
+    head = max_size // 2
+    tail = max_size - head - 1
+    return (np.concatenate([np.arange(head), np.arange(length - tail, length)]), head)
+
+
+def elided_matrix(matrix: np.ndarray, max_size: int) -> str:
+    """write corners of large matrix and elide the middle with dots
+
+    Args:
+        matrix (np.ndarray): matrix or vector
+        max_size (int): largest number of rows and columns including dots
+
+    Returns:
+        str: latex matrix
+    """
+    matrix = np.atleast_2d(matrix)
+    row_indices, row_dots = kept_indices(matrix.shape[0], max_size)
+    column_indices, column_dots = kept_indices(matrix.shape[1], max_size)
+    # only shown entries are rounded and formatted
+    shown = np.round(
+        matrix[np.ix_(row_indices, column_indices)].astype(complex), PRECISION
+    )
+    rows = [
+        [format_entry(real, imag) for real, imag in zip(reals, imags)]
+        for reals, imags in zip(shown.real.tolist(), shown.imag.tolist())
+    ]
+    if column_dots >= 0:
+        for row in rows:
+            row.insert(column_dots, "\\cdots")
+    if row_dots >= 0:
+        dots = ["\\vdots"] * len(column_indices)
+        if column_dots >= 0:
+            dots.insert(column_dots, "\\ddots")
+        rows.insert(row_dots, dots)
+    lines = [" & ".join(row) + " \\\\" for row in rows]
+    return "\n".join(["\\begin{bmatrix}", *lines, "\\end{bmatrix}"])
+
+
+def matrix_to_latex(matrix, max_size: int = DEFAULT_MAX_MATRIX_SIZE) -> str:
+    """write matrix as latex. matrix up to MAX_EXACT_SIZE is written in
+    exact form, up to max_size numerically. larger matrix is written as
+    table of its non-zero entries when it has at most max_size of them,
+    otherwise its corners are shown and the middle is elided
+
+    Args:
+        matrix (_type_): matrix, vector or scalar
+        max_size (int): largest number of rows and columns written in full,
+            at most MAX_MATRIX_COLUMNS
+
+    Returns:
+        str: latex of matrix
+    """
+    # elided matrix needs at least first, dots and last row, and latex
+    # rejects matrices wider than MaxMatrixCols
+    max_size = min(max(max_size, 3), MAX_MATRIX_COLUMNS)
+    # scalar is written as vector of one entry
+    matrix = np.atleast_1d(np.asarray(matrix))
+    if max(matrix.shape) <= min(max_size, MAX_EXACT_SIZE):
+        # pylint: disable=import-outside-toplevel
+        from qiskit.visualization import array_to_latex
+
+        # exact forms like sqrt(2)/2 are worth sympy for small matrices
+        return array_to_latex(matrix, source=True, max_size=max_size)
+    if max(matrix.shape) <= max_size:
+        # sympy takes seconds for dense 4 qubit unitary, nothing is elided
+        return elided_matrix(matrix, max_size)
+    mask = np.abs(matrix) > ZERO_TOLERANCE
+    nonzero = int(np.count_nonzero(mask))
+    if matrix.ndim == 2 and nonzero <= max_size:
+        body = nonzero_table(matrix, mask)
+    else:
+        body = elided_matrix(matrix, max_size)
+    return f"\\underset{{{size_label(matrix.shape, nonzero)}}}{{{body}}}"
@@ -0,0 +1,169 @@
+"""
+    lazily started pool of spawned helper processes
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+from .limits import ResourceLimits
+
+
+class SpawnedProcessPool:
+    """processes which are created on first use. every process has its own
+    executor and runs one job at a time, so process of cancelled or timed
+    out job is killed and replaced without failing jobs of other processes"""
+
+    def __init__(
+        self,
+        max_workers: int,
+        initializer: Callable[[], None],
+        limits: ResourceLimits = None,
+    ) -> None:
+        """
+        Args:
+            max_workers (int): number of processes
+            initializer (Callable[[], None]): run once in every process
+            limits (ResourceLimits): limits of each job, None for unlimited
+        """
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.limits = limits if limits is not None else ResourceLimits(None, None, None)
+        self.__executors: list[ProcessPoolExecutor] = []
+        self.__idle: "asyncio.Queue[ProcessPoolExecutor]" = None
+
+    @property
+    def processes(self) -> list[multiprocessing.Process]:
+        """property of running processes
+
+        Returns:
+            list[multiprocessing.Process]: spawned processes
+        """
+        # pylint: disable=protected-access
+        return [
+            process
+            for executor in self.__executors
+            for process in (executor._processes or {}).values()
+        ]
+
+    def create_executor(self) -> ProcessPoolExecutor:
+        """create executor of one process. process is spawned by first job
+
+        Returns:
+            ProcessPoolExecutor: executor of one process
+        """
+        # spawn, forking gui process with running qt threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.initializer,
+        )
+
+    async def start(self) -> None:
+        """spawn every process and wait until its initializer ran
+
+        Raises:
+            BrokenProcessPool: when initializer failed
+        """
+        await asyncio.gather(
+            *[
+                asyncio.wrap_future(self.__add_idle_executor())
+                for _ in range(self.max_workers - len(self.__executors))
+            ]
+        )
+
+    def __add_idle_executor(self) -> Future:
+        executor = self.create_executor()
+        # spawn process and run initializer before first job arrives
+        started = executor.submit(os.getpid)
+        self.__executors.append(executor)
+        self.__get_idle_queue().put_nowait(executor)
+        return started
+
+    def __get_idle_queue(self) -> "asyncio.Queue[ProcessPoolExecutor]":
+        if self.__idle is None:
+            self.__idle = asyncio.Queue()
+        return self.__idle
+
+    async def __acquire(self) -> ProcessPoolExecutor:
+        idle = self.__get_idle_queue()
+        if idle.empty() and len(self.__executors) < self.max_workers:
+            self.__add_idle_executor()
+        return await idle.get()
+
+    def __release(self, executor: ProcessPoolExecutor) -> None:
+        # executor of killed or shut down pool is not reused
+        if executor in self.__executors:
+            self.__get_idle_queue().put_nowait(executor)
+
+    def __retire(self, executor: ProcessPoolExecutor) -> None:
+        # pylint: disable=protected-access
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+        if executor in self.__executors:
+            self.__executors.remove(executor)
+
+    def __replace(self, executor: ProcessPoolExecutor) -> None:
+        if executor not in self.__executors:
+            return
+        self.__retire(executor)
+        # warm replacement in background
+        self.__add_idle_executor()
+
+    async def submit(self, function: Callable, *args) -> Any:
+        """run function in idle process. process is killed and replaced when
+        job is cancelled or exceeds wall_time, since running job cannot be
+        interrupted, and when job broke its process
+
+        Args:
+            function (Callable): module level function
+
+        Raises:
+            asyncio.TimeoutError: when job exceeded wall_time
+
+        Returns:
+            Any: result of function
+        """
+        executor = await self.__acquire()
+        job = asyncio.get_event_loop().run_in_executor(executor, function, *args)
+        try:
+            result = await asyncio.wait_for(job, self.limits.wall_time)
+        except BaseException as exc:
+            if job.cancelled() or not job.done() or isinstance(exc, BrokenProcessPool):
+                self.__replace(executor)
+            else:
+                self.__release(executor)
+            raise
+        self.__release(executor)
+        return result
+
+    async def shutdown(self) -> None:
+        """kill processes including running jobs and wait until they exit"""
+        processes = self.processes
+        for executor in list(self.__executors):
+            self.__retire(executor)
+        self.__idle = None
+        await asyncio.gather(
+            *[asyncio.to_thread(process.join) for process in processes]
+        )
@@ -0,0 +1,98 @@
+"""
+    progress events streamed from conversion output
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+from typing import Callable, NamedTuple, Optional
+
+# generated scripts print progress markers as stdout lines starting with this
+PROGRESS_PREFIX = "%progress "
+
+
+class Progress(NamedTuple):
+    """progress of conversion stage. total is 0 when stage size is unknown"""
+
+    stage: str
+    done: int = 0
+    total: int = 0
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+def parse_progress(line: str) -> Optional[Progress]:
+    """parse progress marker line
+
+    Args:
+        line (str): output line
+
+    Returns:
+        Optional[Progress]: progress, None when line is not a marker
+    """
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    fields = line[len(PROGRESS_PREFIX) :].split()
+    try:
+        return Progress(fields[0], int(fields[1]), int(fields[2]))
+    except (IndexError, ValueError):
+        return None
+
+
+class OutputCollector:
+    """collect stdout of conversion line by line. progress markers are
+    reported to callback while script runs, other lines are kept and
+    rendered as one equation after script exits"""
+
+    def __init__(self, on_progress: Optional[ProgressCallback] = None) -> None:
+        """
+        Args:
+            on_progress (Optional[ProgressCallback]): called for every progress
+        """
+        self.on_progress = on_progress
+        self.lines: list[str] = []
+
+    @property
+    def output(self) -> str:
+        """stdout received so far without progress markers
+
+        Returns:
+            str: partial result
+        """
+        return "".join(line + "\n" for line in self.lines)
+
+    def report(self, progress: Progress) -> None:
+        """report progress to callback
+
+        Args:
+            progress (Progress): progress
+        """
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def feed(self, line: str) -> None:
+        """handle one stdout line
+
+        Args:
+            line (str): line without line break
+        """
+        progress = parse_progress(line)
+        if progress is None:
+            self.lines.append(line)
+        else:
+            self.report(progress)
@@ -0,0 +1,326 @@
+"""
+    length-prefixed framed protocol between app and conversion workers
+
+    every frame is a fixed header with two big-endian lengths, then a json
+    header and a binary payload::
+
+        | header length (4) | payload length (4) | json header | payload |
+
+    json header always has ``type`` and, except ``ready``, the job ``id``.
+
+    - ``ready``: worker finished start up. has ``pid``
+    - ``job``: run ``source`` under ``limits``. ``stream`` asks for lines.
+      ``artifact`` tells script must produce image
+    - ``cancel``: kill job, only for zygote
+    - ``line``: one stdout line of streaming job
+    - ``result``: job ended. has ``stdout``, ``stderr``, ``error``,
+      ``limit``, ``memory``, ``timings`` and ``artifact``, size of image
+      sent as payload
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import json
+import struct
+from typing import BinaryIO, Callable, NamedTuple, Optional
+from .limits import ResourceLimits
+
+FRAME_HEADER = struct.Struct(">II")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+class ProtocolError(RuntimeError):
+    """
+    Exception class for broken frame stream
+    """
+
+
+class ConversionError(RuntimeError):
+    """
+    Exception class for exception raised by conversion script
+    """
+
+    def __init__(self, error_type: str, message: str, traceback: str = "") -> None:
+        super().__init__(f"{error_type}: {message}" if message else error_type)
+        self.error_type = error_type
+        self.traceback = traceback
+
+
+class Frame(NamedTuple):
+    """decoded frame"""
+
+    header: dict
+    payload: bytes = b""
+
+
+class JobResult(NamedTuple):
+    """successful result of job"""
+
+    stdout: str
+    stderr: str
+    timings: dict
+    payload: bytes = b""
+    artifact_size: Optional[int] = None
+
+
+def encode_frame(header: dict, payload: bytes = b"") -> bytes:
+    """encode frame
+
+    Args:
+        header (dict): json header
+        payload (bytes): binary payload
+
+    Returns:
+        bytes: frame
+    """
+    encoded = json.dumps(header).encode()
+    return FRAME_HEADER.pack(len(encoded), len(payload)) + encoded + payload
+
+
+def check_lengths(header_length: int, payload_length: int) -> None:
+    """check frame lengths before reading frame body
+
+    Args:
+        header_length (int): length of json header
+        payload_length (int): length of payload
+
+    Raises:
+        ProtocolError: when frame is too large
+    """
+    if header_length + payload_length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"frame of {header_length + payload_length} bytes")
+
+
+def read_frame(stream: BinaryIO) -> Optional[Frame]:
+    """read one frame from blocking stream
+
+    Args:
+        stream (BinaryIO): frame stream
+
+    Raises:
+        ProtocolError: when stream ends inside frame
+
+    Returns:
+        Optional[Frame]: frame, None at end of stream
+    """
+    prefix = stream.read(FRAME_HEADER.size)
+    if not prefix:
+        return None
+    if len(prefix) < FRAME_HEADER.size:
+        raise ProtocolError("stream ended inside frame")
+    header_length, payload_length = FRAME_HEADER.unpack(prefix)
+    check_lengths(header_length, payload_length)
+    body = stream.read(header_length + payload_length)
+    if len(body) < header_length + payload_length:
+        raise ProtocolError("stream ended inside frame")
+    return Frame(json.loads(body[:header_length]), body[header_length:])
+
+
+async def read_frame_async(reader: asyncio.StreamReader) -> Optional[Frame]:
+    """read one frame from asyncio stream
+
+    Args:
+        reader (asyncio.StreamReader): frame stream
+
+    Raises:
+        ProtocolError: when stream ends inside frame
+
+    Returns:
+        Optional[Frame]: frame, None at end of stream
+    """
+    try:
+        prefix = await reader.readexactly(FRAME_HEADER.size)
+        header_length, payload_length = FRAME_HEADER.unpack(prefix)
+        check_lengths(header_length, payload_length)
+        body = await reader.readexactly(header_length + payload_length)
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial and exc.expected == FRAME_HEADER.size:
+            return None
+        raise ProtocolError("stream ended inside frame") from exc
+    return Frame(json.loads(body[:header_length]), body[header_length:])
+
+
+# pylint: disable=too-few-public-methods
+class FrameDecoder:
+    """decode frames from chunks of non-blocking stream"""
+
+    def __init__(self) -> None:
+        self.buffer = b""
+
+    def feed(self, data: bytes) -> list[Frame]:
+        """add chunk and return every completed frame
+
+        Args:
+            data (bytes): chunk
+
+        Returns:
+            list[Frame]: completed frames
+        """
+        self.buffer += data
+        frames = []
+        while len(self.buffer) >= FRAME_HEADER.size:
+            header_length, payload_length = FRAME_HEADER.unpack_from(self.buffer)
+            check_lengths(header_length, payload_length)
+            end = FRAME_HEADER.size + header_length + payload_length
+            if len(self.buffer) < end:
+                break
+            body = self.buffer[FRAME_HEADER.size : end]
+            frames.append(Frame(json.loads(body[:header_length]), body[header_length:]))
+            self.buffer = self.buffer[end:]
+        return frames
+
+
+def error_of(error: dict) -> Exception:
+    """return local exception of error raised in worker
+
+    SyntaxError and NameError keep their type, presenter explains them to
+    user. everything else is ConversionError
+
+    Args:
+        error (dict): type, message and traceback
+
+    Returns:
+        Exception: typed error
+    """
+    if error["type"] == "SyntaxError":
+        return SyntaxError(error["message"])
+    if error["type"] == "NameError":
+        return NameError(error["message"])
+    return ConversionError(error["type"], error["message"], error["traceback"])
+
+
+def unpack_result(frame: Frame, limits: ResourceLimits) -> JobResult:
+    """return result of result frame or raise its error
+
+    Args:
+        frame (Frame): result frame
+        limits (ResourceLimits): limits of job
+
+    Raises:
+        ConversionLimitExceeded: when job exceeded its limits
+        ConversionError: when script raised exception
+
+    Returns:
+        JobResult: result
+    """
+    header = frame.header
+    if header.get("limit") is not None:
+        raise limits.error_of(header["limit"])
+    if header.get("error") is not None:
+        raise error_of(header["error"])
+    return JobResult(
+        header["stdout"],
+        header["stderr"],
+        header.get("timings", {}),
+        frame.payload,
+        header.get("artifact"),
+    )
+
+
+class Channel:
+    """multiplex jobs over frame streams of one worker process. results and
+    lines are dispatched to the job with same id"""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.__pending: dict = {}
+        self.__dispatcher: asyncio.Task = None
+
+    async def receive(self) -> Frame:
+        """read one frame directly. only before dispatching starts
+
+        Raises:
+            RuntimeError: when worker exited
+
+        Returns:
+            Frame: frame
+        """
+        frame = await read_frame_async(self.reader)
+        if frame is None:
+            raise RuntimeError("conversion worker exited unexpectedly")
+        return frame
+
+    def send(self, header: dict, payload: bytes = b"") -> None:
+        """write frame without waiting
+
+        Args:
+            header (dict): json header
+            payload (bytes): binary payload
+        """
+        self.writer.write(encode_frame(header, payload))
+
+    async def request(
+        self,
+        header: dict,
+        payload: bytes = b"",
+        on_line: Optional[Callable[[str], None]] = None,
+    ) -> Frame:
+        """send job frame and wait its result frame
+
+        Args:
+            header (dict): job header with id
+            payload (bytes): binary payload
+            on_line (Optional[Callable[[str], None]]): receive line frames of job
+
+        Returns:
+            Frame: result frame
+        """
+        if self.__dispatcher is None:
+            self.__dispatcher = asyncio.ensure_future(self.__dispatch())
+        future = asyncio.get_event_loop().create_future()
+        self.__pending[header["id"]] = (future, on_line)
+        try:
+            self.send(header, payload)
+            await self.writer.drain()
+            return await future
+        finally:
+            self.__pending.pop(header["id"], None)
+
+    async def __dispatch(self) -> None:
+        try:
+            while True:
+                frame = await read_frame_async(self.reader)
+                if frame is None:
+                    break
+                future, on_line = self.__pending.get(frame.header.get("id"), (None, None))
+                if future is None or future.done():
+                    # late frame of cancelled job
+                    continue
+                if frame.header["type"] == "line":
+                    if on_line is not None:
+                        on_line(frame.header["line"])
+                else:
+                    future.set_result(frame)
+            error = RuntimeError("conversion worker exited unexpectedly")
+        except (ProtocolError, ValueError) as exc:
+            error = RuntimeError(f"broken conversion worker stream {exc}")
+        for future, _ in list(self.__pending.values()):
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self) -> None:
+        """stop dispatching and close stream to worker"""
+        if self.__dispatcher is not None:
+            self.__dispatcher.cancel()
+            self.__dispatcher = None
+        if not self.writer.is_closing():
+            self.writer.close()
@@ -0,0 +1,300 @@
+"""
+    renderer of latex results
+
+    matplotlib with usetex runs latex and dvipng synchronously, so results
+    are rendered in separate processes instead of on the GUI event loop.
+    latex which mathtext supports is rendered without TeX. otherwise each
+    render process keeps a TexDaemon with precompiled preamble and falls
+    back to matplotlib usetex when TeX tools are missing. matplotlib draws
+    on pooled figures without pyplot. rendered equations are cached by
+    normalized latex and render settings.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import functools
+import os
+from multiprocessing import util
+from typing import Optional
+from .latex_analyzer import is_mathtext
+from .limits import ResourceLimits
+from .process_pool import SpawnedProcessPool
+from .result_cache import (
+    DEFAULT_CACHE_DIR,
+    LayeredCache,
+    MemoryCache,
+    ResultCache,
+    make_key,
+)
+from .tex_daemon import (
+    BODY_FONT,
+    DEFAULT_DPI,
+    MATRIX_COLUMNS_SETTING,
+    PREAMBLE,
+    TexDaemon,
+    TexError,
+)
+
+DEFAULT_MAX_RENDERERS = 2
+DEFAULT_EQUATION_CACHE_DIR = os.path.join(
+    os.path.dirname(DEFAULT_CACHE_DIR), "equations"
+)
+DEFAULT_EQUATION_CACHE_SIZE = 64 * 1024 * 1024
+
+# matplotlib settings of latex results
+LATEX_RC = {
+    "font.size": 9,
+    "text.usetex": True,
+    "text.latex.preamble": r"\usepackage{{amsmath}}" + MATRIX_COLUMNS_SETTING,
+}
+# matplotlib settings of mathtext results. computer modern like TeX
+MATHTEXT_RC = {
+    "font.size": 9,
+    "text.usetex": False,
+    "mathtext.fontset": "cm",
+}
+
+# equations rendered at launch, mathtext and TeX-only
+WARM_UP_MATHTEXT = "\\frac{1}{\\sqrt{2}}|0\\rangle"
+WARM_UP_TEX = "\\stackrel{H}{\\begin{bmatrix}1 & 1 \\\\ 1 & -1\\end{bmatrix}}"
+
+# TeX tools get this share of wall_time, so render process kills them
+# before pool kills render process and they are never left orphaned
+TEX_TIME_SHARE = 0.8
+
+# TexDaemon of this render process
+TEX_DAEMON = TexDaemon()
+
+
+def normalize_latex(latex: str) -> str:
+    """collapse whitespace of latex. latex treats every run of whitespace
+    as one space, and new line causes runtime error
+
+    Args:
+        latex (str): latex
+
+    Returns:
+        str: latex on one line
+    """
+    return " ".join(latex.split())
+
+
+def render_latex(
+    latex: str, image_format: str = "png", usetex: bool = True
+) -> bytes:
+    """render latex to encoded image in memory.
+    with tex image_format latex source is returned as is.
+
+    Args:
+        latex (str): latex matrix code
+        image_format (str): format of image
+        usetex (bool): typeset with TeX, mathtext otherwise
+
+    Returns:
+        bytes: encoded image
+    """
+    latex = normalize_latex(latex)
+
+    if image_format == "tex":
+        return f"${latex}$\n".encode("UTF-8")
+
+    # matplotlib is loaded on first render, not at startup
+    # pylint: disable=import-outside-toplevel
+    from .figure_pool import FIGURE_POOL
+
+    return FIGURE_POOL.render(
+        latex, image_format, LATEX_RC if usetex else MATHTEXT_RC
+    )
+
+
+def typesetter_of(latex: str, image_format: str) -> str:
+    """return typesetter rendering latex
+
+    Args:
+        latex (str): normalized latex
+        image_format (str): format of image
+
+    Returns:
+        str: mathtext, tex or usetex
+    """
+    if is_mathtext(latex):
+        return "mathtext"
+    if TexDaemon.supports(image_format):
+        return "tex"
+    return "usetex"
+
+
+def render_equation(
+    latex: str, image_format: str = "png", tex_timeout: Optional[float] = None
+) -> bytes:
+    """render latex with mathtext when it is supported, with TexDaemon, or
+    with matplotlib usetex when TeX tools of image format are missing
+
+    Args:
+        latex (str): latex matrix code
+        image_format (str): format of image
+        tex_timeout (Optional[float]): seconds TeX tools may take, None for
+            timeout of TexDaemon
+
+    Raises:
+        TexError: when latex could not be typeset
+
+    Returns:
+        bytes: encoded image
+    """
+    typesetter = typesetter_of(latex, image_format)
+    if typesetter == "tex":
+        return TEX_DAEMON.render_many([latex], image_format, tex_timeout)[0]
+    return render_latex(latex, image_format, usetex=typesetter == "usetex")
+
+
+def initialize_renderer() -> None:  # pragma: no cover
+    # this function run in render process
+    """select non-interactive backend and compile preamble once"""
+    # pylint: disable=import-outside-toplevel
+    import matplotlib as mpl
+
+    mpl.use("Agg")
+    # remove compiled format when pool stops this process
+    util.Finalize(TEX_DAEMON, TEX_DAEMON.close, exitpriority=10)
+    if TEX_DAEMON.supports("png"):
+        try:
+            TEX_DAEMON.start()
+        except TexError as exc:
+            print(f"latex preamble could not be compiled {exc}")
+
+
+class LatexRenderer(SpawnedProcessPool):
+    """render latex results in a process pool"""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_RENDERERS,
+        limits: ResourceLimits = None,
+        cache: LayeredCache = None,
+    ) -> None:
+        """
+        Args:
+            max_workers (int): number of render processes
+            limits (ResourceLimits): wall_time of each render, None for unlimited
+            cache (LayeredCache): rendered equations
+        """
+        super().__init__(max_workers, initialize_renderer, limits)
+        self.cache = (
+            cache
+            if cache is not None
+            else LayeredCache(
+                MemoryCache(),
+                ResultCache(DEFAULT_EQUATION_CACHE_DIR, DEFAULT_EQUATION_CACHE_SIZE),
+            )
+        )
+        # renders in flight. same equation requested again waits for them
+        self.__pending: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def cache_key(latex: str, image_format: str) -> str:
+        """return cache key of rendered equation
+
+        Args:
+            latex (str): normalized latex
+            image_format (str): format of image
+
+        Returns:
+            str: cache key
+        """
+        return make_key(
+            latex=latex,
+            image_format=image_format,
+            dpi=DEFAULT_DPI,
+            typesetter=typesetter_of(latex, image_format),
+            font=[LATEX_RC, MATHTEXT_RC, BODY_FONT],
+            preamble=PREAMBLE,
+        )
+
+    async def render(self, latex: str, image_format: str = "png") -> bytes:
+        """render latex in render process. identical equation is rendered
+        only once
+
+        Args:
+            latex (str): latex result of conversion
+            image_format (str): format of image
+
+        Raises:
+            ConversionTimeout: when render exceeded wall_time
+            RuntimeError: when latex could not be rendered
+
+        Returns:
+            bytes: encoded image
+        """
+        latex = normalize_latex(latex)
+        if image_format == "tex":
+            return render_latex(latex, image_format)
+        key = self.cache_key(latex, image_format)
+        image = self.cache.get(key)
+        if image is not None:
+            return image
+        pending = self.__pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self.__render(key, latex, image_format))
+            self.__pending[key] = pending
+            pending.add_done_callback(functools.partial(self.__forget, key))
+        # cancelled caller leaves render to other callers and cache
+        return await asyncio.shield(pending)
+
+    async def warm_up(self, image_format: str = "png") -> None:
+        """start render processes and render sample equations without
+        cache, so fonts and TeX are loaded before first result. TeX sample
+        is skipped when TeX tools are missing
+
+        Args:
+            image_format (str): format of image
+
+        Raises:
+            RuntimeError: when sample could not be rendered
+        """
+        latexes = [WARM_UP_MATHTEXT]
+        if TexDaemon.supports(image_format):
+            latexes.append(WARM_UP_TEX)
+        await asyncio.gather(
+            *[self.__render_uncached(latex, image_format) for latex in latexes]
+        )
+
+    def __forget(self, key: str, pending: asyncio.Future) -> None:
+        self.__pending.pop(key, None)
+        # failure was raised to every waiting caller
+        if not pending.cancelled():
+            pending.exception()
+
+    async def __render(self, key: str, latex: str, image_format: str) -> bytes:
+        image = await self.__render_uncached(latex, image_format)
+        await self.cache.store(key, image)
+        return image
+
+    async def __render_uncached(self, latex: str, image_format: str) -> bytes:
+        wall_time = self.limits.wall_time
+        tex_timeout = None if wall_time is None else wall_time * TEX_TIME_SHARE
+        try:
+            image = await self.submit(
+                render_equation, latex, image_format, tex_timeout
+            )
+        except asyncio.TimeoutError:
+            raise self.limits.error_of("wall_time") from None
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            raise RuntimeError(str(exc)) from exc
+        return image
@@ -0,0 +1,272 @@
+"""
+    content-addressed on-disk cache for conversion results
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "qiskit-classroom", "results"
+)
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_MEMORY_SIZE = 32 * 1024 * 1024
+
+
+def make_key(**fields) -> str:
+    """hash fields to cache key
+
+    Returns:
+        str: hex digest of fields
+    """
+    content = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("UTF-8")).hexdigest()
+
+
+class ResultCache:
+    """store result bytes by key. the least recently used entries are removed
+    when total size exceeds max_size"""
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        """
+        Args:
+            directory (str): cache directory, created on first write
+            max_size (int): maximum total bytes of entries
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+    def path_of(self, key: str) -> str:
+        """return file path of key
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            str: entry path
+        """
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> bytes:
+        """return cached bytes and mark entry as recently used
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            bytes: cached bytes, None when missing
+        """
+        path = self.path_of(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """store bytes then evict old entries
+
+        Args:
+            key (str): cache key
+            data (bytes): result
+        """
+        if len(data) > self.max_size:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # write then rename so readers never see half written entry
+            file_descriptor, temp_path = tempfile.mkstemp(
+                dir=self.directory, prefix=".tmp"
+            )
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self.path_of(key))
+        except OSError as exc:
+            print(f"failed to write cache {exc}")
+            return
+        self.evict()
+
+    async def store(self, key: str, data: bytes) -> None:
+        """store bytes like put without blocking event loop
+
+        Args:
+            key (str): cache key
+            data (bytes): result
+        """
+        await asyncio.to_thread(self.put, key, data)
+
+    def entries(self) -> list[tuple[os.DirEntry, os.stat_result]]:
+        """return entries ordered by last use. entries removed meanwhile by
+        other instance sharing directory are skipped
+
+        Returns:
+            list[tuple[os.DirEntry, os.stat_result]]: entries and their stat,
+                least recently used first
+        """
+        entries = []
+        try:
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        entries.append((entry, entry.stat()))
+                    except FileNotFoundError:
+                        continue
+        except OSError:
+            return []
+        return sorted(entries, key=lambda item: item[1].st_mtime_ns)
+
+    def evict(self) -> None:
+        """remove least recently used entries until size fits max_size"""
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        for entry, stat in entries:
+            if total <= self.max_size:
+                break
+            total -= stat.st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """remove every entry"""
+        for entry, _ in self.entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class MemoryCache:
+    """keep result bytes in memory. the least recently used entries are
+    dropped when total size exceeds max_size"""
+
+    def __init__(self, max_size: int = DEFAULT_MEMORY_SIZE) -> None:
+        """
+        Args:
+            max_size (int): maximum total bytes of entries
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.__entries: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+
+    def get(self, key: str) -> bytes:
+        """return cached bytes and mark entry as recently used
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            bytes: cached bytes, None when missing
+        """
+        data = self.__entries.get(key)
+        if data is not None:
+            self.__entries.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """store bytes then drop old entries
+
+        Args:
+            key (str): cache key
+            data (bytes): result
+        """
+        if len(data) > self.max_size:
+            return
+        if key in self.__entries:
+            self.size -= len(self.__entries.pop(key))
+        self.__entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_size:
+            _, dropped = self.__entries.popitem(last=False)
+            self.size -= len(dropped)
+
+    def clear(self) -> None:
+        """drop every entry"""
+        self.__entries.clear()
+        self.size = 0
+
+
+class LayeredCache:
+    """memory cache in front of disk cache"""
+
+    def __init__(self, memory: MemoryCache = None, disk: ResultCache = None) -> None:
+        """
+        Args:
+            memory (MemoryCache): first level cache
+            disk (ResultCache): second level cache, None for memory only
+        """
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+
+    def get(self, key: str) -> bytes:
+        """return cached bytes. entry found on disk is kept in memory
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            bytes: cached bytes, None when missing
+        """
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.memory.put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """store bytes in every level
+
+        Args:
+            key (str): cache key
+            data (bytes): result
+        """
+        self.memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(key, data)
+
+    async def store(self, key: str, data: bytes) -> None:
+        """store bytes in every level. disk is written off event loop
+
+        Args:
+            key (str): cache key
+            data (bytes): result
+        """
+        self.memory.put(key, data)
+        if self.disk is not None:
+            await self.disk.store(key, data)
+
+    def clear(self) -> None:
+        """remove every entry"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -19,7 +19,7 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
-import shutil
+import os
 
 # pylint: disable=no-name-in-module
 from PySide6.QtWidgets import (
@@ -30,10 +30,31 @@ from PySide6.QtWidgets import (
     QFileDialog,
     QHBoxLayout,
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap
+from .circuit_pages import CircuitPage
+from .tiled_image_view import ZOOM_STEP, TiledImageView
 
+# maximum size of dialog when it opens. larger image is scrolled
+MAX_VIEW_WIDTH = 1200
+MAX_VIEW_HEIGHT = 800
 
+
+def page_paths(path: str, count: int) -> list[str]:
+    """return file of each page. single page is written to path itself
+
+    Args:
+        path (str): chosen file
+        count (int): number of pages
+
+    Returns:
+        list[str]: files like circuit-1.png, circuit-2.png
+    """
+    if count <= 1:
+        return [path]
+    stem, extension = os.path.splitext(path)
+    return [f"{stem}-{index}{extension}" for index in range(1, count + 1)]
+
+
+# pylint: disable=too-many-instance-attributes
 class ResultImageDialog(QDialog):
     """
     show image which converted
@@ -41,15 +62,36 @@ class ResultImageDialog(QDialog):
 
     def __init__(self, parent) -> None:
         super().__init__(parent)
-        self.image_path: str = ""
+        # encoded image. written to disk only when user saves it
+        self.image: bytes = b""
+        self.image_format = "png"
+        # pages of paginated circuit, None until page is drawn
+        self.pages: list[bytes] = []
+        self.page_index = 0
         self.setWindowTitle("Result Image")
         self.setMinimumWidth(300)
         self.setMinimumHeight(200)
 
         vbox = QVBoxLayout(self)
-        vbox.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label = QLabel()
-        vbox.addWidget(self.image_label)
+        # only visible tiles of image are rendered, huge matrices open fast
+        self.image_view = TiledImageView()
+        vbox.addWidget(self.image_view, 1)
+
+        page_hbox = QHBoxLayout()
+        self.previous_page_button = QPushButton("<")
+        self.previous_page_button.clicked.connect(
+            lambda: self.go_to_page(self.page_index - 1)
+        )
+        page_hbox.addWidget(self.previous_page_button)
+        self.page_label = QLabel()
+        page_hbox.addWidget(self.page_label)
+        self.next_page_button = QPushButton(">")
+        self.next_page_button.clicked.connect(
+            lambda: self.go_to_page(self.page_index + 1)
+        )
+        page_hbox.addWidget(self.next_page_button)
+        vbox.addLayout(page_hbox)
+        self.show_page_controls(False)
 
         hbox = QHBoxLayout()
 
@@ -57,6 +99,18 @@ class ResultImageDialog(QDialog):
         self.close_button.clicked.connect(self.close)
         hbox.addWidget(self.close_button)
 
+        self.zoom_out_button = QPushButton("-")
+        self.zoom_out_button.clicked.connect(
+            lambda: self.image_view.set_zoom(self.image_view.zoom / ZOOM_STEP)
+        )
+        hbox.addWidget(self.zoom_out_button)
+
+        self.zoom_in_button = QPushButton("+")
+        self.zoom_in_button.clicked.connect(
+            lambda: self.image_view.set_zoom(self.image_view.zoom * ZOOM_STEP)
+        )
+        hbox.addWidget(self.zoom_in_button)
+
         self.save_image = QPushButton("Save image")
         self.save_image.clicked.connect(self.on_save_image_clicked)
         hbox.addWidget(self.save_image)
@@ -64,29 +118,107 @@ class ResultImageDialog(QDialog):
         vbox.addLayout(hbox)
 
     def on_save_image_clicked(self) -> None:
-        """copy converted image"""
-        (path, _) = QFileDialog.getSaveFileName(self, "Image save", "", "Image (*.png)")
-        shutil.copyfile(self.image_path, path)
-
-    def show_image(self, image_path: str) -> None:
+        """write converted image to chosen file. every page of paginated
+        circuit is written to its own file"""
+        (path, _) = QFileDialog.getSaveFileName(
+            self, "Image save", "", f"Image (*.{self.image_format})"
+        )
+        if not path:
+            return
+        images = self.pages if len(self.pages) > 1 else [self.image]
+        for page_path, image in zip(page_paths(path, len(images)), images):
+            # page which is not drawn yet is skipped
+            if image:
+                with open(page_path, "wb") as file:
+                    file.write(image)
+
+    def show_image(self, image: bytes, image_format: str = "png") -> None:
         """show image
 
         Args:
-            image_path (str): image path
+            image (bytes): encoded image
+            image_format (str): png or svg
         """
-        self.image_path = image_path
-        img = QPixmap(image_path)
-        self.image_label.setPixmap(img)
-        # resize dialog by image size
-        self.resize(img.width() + 100, img.height() + 150)
-        self.image_label.show()
+        self.image = image
+        self.image_format = image_format
+        self.image_view.set_image(image, image_format)
+        self.fit_to_image()
         self.show()
+        self.image_view.setFocus()
+
+    def fit_to_image(self) -> None:
+        """resize dialog by image size"""
+        size = self.image_view.sizeHint()
+        self.resize(
+            min(size.width(), MAX_VIEW_WIDTH) + 50,
+            min(size.height(), MAX_VIEW_HEIGHT) + 100,
+        )
+
+    def show_page_controls(self, visible: bool) -> None:
+        """show or hide page buttons
+
+        Args:
+            visible (bool): show buttons
+        """
+        for widget in (
+            self.previous_page_button,
+            self.page_label,
+            self.next_page_button,
+        ):
+            widget.setVisible(visible)
+
+    def show_pages(self, count: int, image_format: str = "png") -> None:
+        """open dialog for paginated circuit. pages are shown as they are
+        drawn
+
+        Args:
+            count (int): number of pages
+            image_format (str): png or svg
+        """
+        self.pages = [None] * count
+        self.image_format = image_format
+        self.show_page_controls(count > 1)
+        self.save_image.setText("Save pages" if count > 1 else "Save image")
+        self.go_to_page(0)
+        self.show()
+
+    def set_page(self, page: CircuitPage) -> None:
+        """keep drawn page and show it when it is current page
+
+        Args:
+            page (CircuitPage): drawn page
+        """
+        self.pages[page.index] = page.image
+        if page.index == self.page_index:
+            self.go_to_page(page.index)
+            if page.index == 0:
+                self.fit_to_image()
+
+    def go_to_page(self, index: int) -> None:
+        """show page. page which is not drawn yet is left blank
+
+        Args:
+            index (int): page index
+        """
+        if not 0 <= index < len(self.pages):
+            return
+        self.page_index = index
+        self.image = self.pages[index] or b""
+        self.page_label.setText(f"page {index + 1} / {len(self.pages)}")
+        self.previous_page_button.setEnabled(index > 0)
+        self.next_page_button.setEnabled(index < len(self.pages) - 1)
+        if not self.image:
+            self.image_view.reset()
+            self.image_view.viewport().update()
+            return
+        self.image_view.set_image(self.image, self.image_format)
 
     def hideEvent(self, event) -> None:  # pylint: disable=invalid-name
-        """remove image
+        """remove image and its tiles
 
         Args:
             event (_type_): default event argument
         """
-        self.image_label.clear()
+        self.image_view.reset()
+        self.image_view.viewport().update()
         return super().hideEvent(event)
@@ -0,0 +1,93 @@
+"""
+    scheduler which runs only the latest conversion job
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+DEFAULT_DEBOUNCE = 0.15
+
+
+class JobSuperseded(Exception):
+    """
+    Exception class for job which was replaced by newer job
+    """
+
+    def __init__(self) -> None:
+        super().__init__("Job was superseded by newer job.")
+
+
+class LatestJobScheduler:
+    """own in-flight job. submitting new job cancels the running one, so only
+    the newest result is delivered"""
+
+    def __init__(self, debounce: float = DEFAULT_DEBOUNCE) -> None:
+        """
+        Args:
+            debounce (float): seconds to wait before job starts. job submitted
+            again within this time never starts
+        """
+        self.debounce = debounce
+        self.__task: asyncio.Task = None
+
+    @property
+    def busy(self) -> bool:
+        """property of in-flight job
+
+        Returns:
+            bool: job is running
+        """
+        return self.__task is not None and not self.__task.done()
+
+    async def __run(self, job: Callable[[], Awaitable[Any]]) -> Any:
+        if self.debounce > 0:
+            await asyncio.sleep(self.debounce)
+        return await job()
+
+    async def submit(self, job: Callable[[], Awaitable[Any]]) -> Any:
+        """cancel running job and run new job
+
+        Args:
+            job (Callable[[], Awaitable[Any]]): coroutine function of job
+
+        Raises:
+            JobSuperseded: when newer job was submitted before this job ends
+
+        Returns:
+            Any: result of job
+        """
+        self.cancel()
+        task = asyncio.ensure_future(self.__run(job))
+        self.__task = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.__task is not task:
+                raise JobSuperseded() from None
+            raise
+        finally:
+            if self.__task is task:
+                self.__task = None
+
+    def cancel(self) -> None:
+        """cancel running job"""
+        if self.busy:
+            self.__task.cancel()
+        self.__task = None
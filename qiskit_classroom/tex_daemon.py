@@ -0,0 +1,275 @@
+"""
+    long-lived TeX service of render process
+
+    the preamble is compiled once into a TeX format, so every later run
+    starts with amsmath already loaded. equations are typeset in batches,
+    one page per equation, and pages are converted by dvipng or dvisvgm.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Optional
+
+FORMAT_NAME = "classroom"
+# amsmath accepts only 10 matrix columns by default
+MAX_MATRIX_COLUMNS = 64
+MATRIX_COLUMNS_SETTING = rf"\setcounter{{MaxMatrixCols}}{{{MAX_MATRIX_COLUMNS}}}"
+PREAMBLE = "\n".join(
+    [
+        r"\documentclass{article}",
+        r"\usepackage{amsmath}",
+        MATRIX_COLUMNS_SETTING,
+        r"\pagestyle{empty}",
+    ]
+)
+# same font size as matplotlib renderer
+BODY_FONT = r"\fontsize{9}{11}\selectfont"
+DEFAULT_DPI = 200
+# seconds one latex or converter run may take before it is killed
+DEFAULT_TIMEOUT = 30.0
+# tool converting dvi pages of each image format
+CONVERTERS = {"png": "dvipng", "svg": "dvisvgm"}
+
+
+class TexError(RuntimeError):
+    """
+    Exception class for latex which could not be typeset
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+def log_error(log: str) -> str:
+    """return first error of latex log
+
+    Args:
+        log (str): latex output
+
+    Returns:
+        str: error lines, whole log tail when no error line is found
+    """
+    lines = log.splitlines()
+    for index, line in enumerate(lines):
+        if line.startswith("!"):
+            return "\n".join(lines[index : index + 3])
+    return "\n".join(lines[-5:])
+
+
+class TexDaemon:
+    """keep compiled preamble format and typeset many equations with it"""
+
+    def __init__(
+        self,
+        preamble: str = PREAMBLE,
+        dpi: int = DEFAULT_DPI,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            preamble (str): preamble compiled into format
+            dpi (int): resolution of png images
+            timeout (Optional[float]): seconds each tool run may take, None
+                for unlimited
+        """
+        self.preamble = preamble
+        self.dpi = dpi
+        self.timeout = timeout
+        self.__directory: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        """property of compiled format
+
+        Returns:
+            bool: format is compiled
+        """
+        return self.__directory is not None
+
+    @staticmethod
+    def supports(image_format: str) -> bool:
+        """check latex and converter of image format are installed
+
+        Args:
+            image_format (str): format of image
+
+        Returns:
+            bool: image format can be typeset
+        """
+        converter = CONVERTERS.get(image_format)
+        return (
+            converter is not None
+            and shutil.which("latex") is not None
+            and shutil.which(converter) is not None
+        )
+
+    def run(self, *args: str, deadline: Optional[float] = None) -> str:
+        """run tool in working directory. tool running past deadline is
+        killed, so it never outlives render process killed by its pool
+
+        Args:
+            deadline (Optional[float]): time.monotonic() tool must finish
+                by, None for timeout from now
+
+        Raises:
+            TexError: when tool failed or timed out
+
+        Returns:
+            str: output of tool
+        """
+        timeout = (
+            self.timeout if deadline is None else max(deadline - time.monotonic(), 0)
+        )
+        try:
+            process = subprocess.run(
+                args,
+                cwd=self.__directory,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                check=False,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            raise TexError(f"{args[0]} timed out after {timeout:.1f} s") from None
+        output = process.stdout.decode("UTF-8", errors="replace")
+        if process.returncode != 0:
+            raise TexError(f"{args[0]} failed\n{log_error(output)}")
+        return output
+
+    def start(self) -> None:
+        """compile preamble into format. compiled only once
+
+        Raises:
+            TexError: when preamble could not be compiled
+        """
+        if self.running:
+            return
+        self.__directory = tempfile.mkdtemp(prefix="qiskit-classroom-tex-")
+        with open(
+            os.path.join(self.__directory, "preamble.tex"), "w", encoding="UTF-8"
+        ) as file:
+            file.write(self.preamble + "\n\\dump\n")
+        try:
+            self.run(
+                "latex",
+                "-ini",
+                "-interaction=nonstopmode",
+                f"-jobname={FORMAT_NAME}",
+                "&latex",
+                "preamble.tex",
+            )
+        except TexError:
+            self.close()
+            raise
+
+    @staticmethod
+    def make_document(equations: list[str]) -> str:
+        """make document body with one page per equation
+
+        Args:
+            equations (list[str]): latex of each equation
+
+        Returns:
+            str: document source without preamble
+        """
+        pages = [
+            "\\shipout\\hbox{$" + equation.replace("\n", " ").strip() + "$}"
+            for equation in equations
+        ]
+        return "\n".join(["\\begin{document}", BODY_FONT, *pages, "\\end{document}"])
+
+    def render_many(
+        self,
+        equations: list[str],
+        image_format: str = "png",
+        timeout: Optional[float] = None,
+    ) -> list[bytes]:
+        """typeset equations in one latex run
+
+        Args:
+            equations (list[str]): latex of each equation
+            image_format (str): png or svg
+            timeout (Optional[float]): seconds latex and converter may take
+                together, None for timeout of each run
+
+        Raises:
+            TexError: when any equation could not be typeset or timed out
+
+        Returns:
+            list[bytes]: encoded image of each equation
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.start()
+        with open(
+            os.path.join(self.__directory, "equations.tex"), "w", encoding="UTF-8"
+        ) as file:
+            file.write(self.make_document(equations))
+        self.run(
+            "latex",
+            f"-fmt={FORMAT_NAME}",
+            "-interaction=nonstopmode",
+            "-halt-on-error",
+            "equations.tex",
+            deadline=deadline,
+        )
+        if image_format == "svg":
+            self.run(
+                "dvisvgm",
+                "--page=1-",
+                "--no-fonts",
+                "-o",
+                "page%p.svg",
+                "equations.dvi",
+                deadline=deadline,
+            )
+            names = [f"page{index}.svg" for index in range(1, len(equations) + 1)]
+        else:
+            self.run(
+                "dvipng",
+                "-q",
+                "-T",
+                "tight",
+                "-D",
+                str(self.dpi),
+                "-bg",
+                "Transparent",
+                "-o",
+                "page%d.png",
+                "equations.dvi",
+                deadline=deadline,
+            )
+            names = [f"page{index}.png" for index in range(1, len(equations) + 1)]
+        images = []
+        for name in names:
+            path = os.path.join(self.__directory, name)
+            with open(path, "rb") as file:
+                images.append(file.read())
+            os.remove(path)
+        return images
+
+    def close(self) -> None:
+        """remove compiled format"""
+        if self.__directory is not None:
+            shutil.rmtree(self.__directory, ignore_errors=True)
+            self.__directory = None
@@ -0,0 +1,570 @@
+"""
+    scrollable and zoomable view of large result images
+
+    only tiles inside the viewport are rendered. images are decoded and
+    tiles are rendered in background threads, and both are kept in bounded
+    caches shared by every view.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import hashlib
+import math
+import threading
+from typing import Union
+
+# pylint: disable=no-name-in-module
+from PySide6.QtCore import (
+    QBuffer,
+    QByteArray,
+    QIODevice,
+    QObject,
+    QPoint,
+    QRectF,
+    QRunnable,
+    QSize,
+    QThreadPool,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QColor, QImage, QImageReader, QPainter
+from PySide6.QtSvg import QSvgRenderer
+from PySide6.QtWidgets import QAbstractScrollArea
+from .tex_daemon import DEFAULT_DPI
+from .tiles import TILE_SIZE, Tile, TileCache, clamp_zoom, visible_tiles
+
+# svg size is in points. show it as large as png rendered at DEFAULT_DPI
+SVG_SCALE = DEFAULT_DPI / 72
+ZOOM_STEP = 1.25
+RENDER_THREADS = 2
+PLACEHOLDER_COLOR = QColor(240, 240, 240)
+# longer edge of pre-scaled image drawn while tiles are rendered
+PREVIEW_SIZE = 1024
+SOURCE_CACHE_BYTES = 256 * 1024 * 1024
+TILE_CACHE_BYTES = 64 * 1024 * 1024
+
+# sources and tiles are shared by every view and keyed by image digest,
+# so reopening recent result is neither decoded nor rendered again.
+# both are only touched on GUI thread
+SOURCE_CACHE = TileCache(SOURCE_CACHE_BYTES)
+TILE_CACHE = TileCache(TILE_CACHE_BYTES)
+
+
+def new_tile_image(tile: Tile) -> QImage:
+    """create white image of tile size
+
+    Args:
+        tile (Tile): tile
+
+    Returns:
+        QImage: blank tile image
+    """
+    image = QImage(tile.width, tile.height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    return image
+
+
+def open_reader(data: QByteArray) -> tuple[QBuffer, QImageReader]:
+    """open image reader on encoded image. buffer must outlive reader
+
+    Args:
+        data (QByteArray): encoded image
+
+    Returns:
+        tuple[QBuffer, QImageReader]: buffer and reader
+    """
+    buffer = QBuffer()
+    buffer.setData(data)
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    return (buffer, QImageReader(buffer))
+
+
+def preview_size(size: QSize) -> QSize:
+    """fit size in PREVIEW_SIZE keeping aspect ratio
+
+    Args:
+        size (QSize): full size
+
+    Returns:
+        QSize: size of preview
+    """
+    return size.scaled(
+        QSize(PREVIEW_SIZE, PREVIEW_SIZE), Qt.AspectRatioMode.KeepAspectRatio
+    ).boundedTo(size)
+
+
+class SvgSource:
+    """svg document rendered tile by tile"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = QByteArray(data)
+        self.size: QSize = QSvgRenderer(self.data).defaultSize()
+        self.preview: QImage = None
+        # renderer is not shared between threads, each thread parses once
+        self.__local = threading.local()
+
+    @property
+    def cost(self) -> int:
+        """property of memory kept by source
+
+        Returns:
+            int: approximate size in bytes
+        """
+        preview = preview_size(self.size * SVG_SCALE)
+        return self.data.size() + preview.width() * preview.height() * 4
+
+    def renderer(self) -> QSvgRenderer:
+        """return renderer of current thread
+
+        Returns:
+            QSvgRenderer: renderer
+        """
+        renderer = getattr(self.__local, "renderer", None)
+        if renderer is None:
+            renderer = QSvgRenderer(self.data)
+            self.__local.renderer = renderer
+        return renderer
+
+    def load(self) -> None:
+        """render preview"""
+        size = preview_size(self.size * SVG_SCALE)
+        preview = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
+        preview.fill(Qt.GlobalColor.white)
+        painter = QPainter(preview)
+        self.renderer().render(painter)
+        painter.end()
+        self.preview = preview
+
+    def render_tile(self, tile: Tile, scale: float) -> QImage:
+        """render part of document
+
+        Args:
+            tile (Tile): tile in scaled content
+            scale (float): scale of content
+
+        Returns:
+            QImage: rendered tile
+        """
+        image = new_tile_image(tile)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # whole document is placed so only tile area lands on image
+        self.renderer().render(
+            painter,
+            QRectF(
+                -tile.left,
+                -tile.top,
+                self.size.width() * scale,
+                self.size.height() * scale,
+            ),
+        )
+        painter.end()
+        return image
+
+
+class RasterSource:
+    """bitmap decoded in background and scaled tile by tile"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = QByteArray(data)
+        # only header is read here, pixels are decoded by load
+        _, reader = open_reader(self.data)
+        self.size: QSize = reader.size()
+        self.image: QImage = None
+        self.preview: QImage = None
+        self.__lock = threading.Lock()
+        if not self.size.isValid():
+            # format without size in header
+            self.load()
+
+    @property
+    def cost(self) -> int:
+        """property of memory kept by source
+
+        Returns:
+            int: approximate size in bytes
+        """
+        pixels = self.size.width() * self.size.height()
+        preview = preview_size(self.size)
+        return self.data.size() + (pixels + preview.width() * preview.height()) * 4
+
+    def load(self) -> QImage:
+        """decode bitmap and scale preview once
+
+        Returns:
+            QImage: decoded bitmap
+        """
+        with self.__lock:
+            if self.image is None:
+                _, reader = open_reader(self.data)
+                image = reader.read()
+                self.size = image.size()
+                self.preview = image.scaled(
+                    preview_size(self.size),
+                    Qt.AspectRatioMode.IgnoreAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+                self.image = image
+            return self.image
+
+    def render_tile(self, tile: Tile, scale: float) -> QImage:
+        """scale part of bitmap
+
+        Args:
+            tile (Tile): tile in scaled content
+            scale (float): scale of content
+
+        Returns:
+            QImage: rendered tile
+        """
+        source = self.load()
+        image = new_tile_image(tile)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawImage(
+            QRectF(0, 0, tile.width, tile.height),
+            source,
+            QRectF(
+                tile.left / scale,
+                tile.top / scale,
+                tile.width / scale,
+                tile.height / scale,
+            ),
+        )
+        painter.end()
+        return image
+
+
+ImageSource = Union[SvgSource, RasterSource]
+
+
+# pylint: disable=too-few-public-methods
+class TileSignals(QObject):
+    """deliver rendered tiles and loaded sources to GUI thread"""
+
+    rendered = Signal(object, QImage)
+    loaded = Signal(object)
+
+
+# pylint: disable=too-few-public-methods
+class SourceLoadTask(QRunnable):
+    """decode source and scale its preview in thread pool"""
+
+    def __init__(self, source: ImageSource, signals: TileSignals) -> None:
+        super().__init__()
+        self.source = source
+        self.signals = signals
+
+    def run(self) -> None:
+        """load source and emit it"""
+        self.source.load()
+        self.signals.loaded.emit(self.source)
+
+
+# pylint: disable=too-few-public-methods
+class TileRenderTask(QRunnable):
+    """render one tile in thread pool"""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        key: tuple,
+        source: ImageSource,
+        tile: Tile,
+        scale: float,
+        signals: TileSignals,
+    ) -> None:
+        super().__init__()
+        self.key = key
+        self.source = source
+        self.tile = tile
+        self.scale = scale
+        self.signals = signals
+
+    def run(self) -> None:
+        """render tile and emit it"""
+        self.signals.rendered.emit(
+            self.key, self.source.render_tile(self.tile, self.scale)
+        )
+
+
+# pylint: disable=too-many-instance-attributes
+class TiledImageView(QAbstractScrollArea):
+    """scroll and zoom image. ctrl + wheel or +, - and 0 keys zoom"""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.source: ImageSource = None
+        # digest of shown image, tiles of other images are not shown
+        self.digest = ""
+        self.base_scale = 1.0
+        self.zoom = 1.0
+        # keys of tiles queued or rendering
+        self.pending: set[tuple] = set()
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(RENDER_THREADS)
+        self.signals = TileSignals()
+        self.signals.rendered.connect(self.on_tile_rendered)
+        self.signals.loaded.connect(self.on_source_loaded)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+
+    @property
+    def scale(self) -> float:
+        """property of scale from source to content
+
+        Returns:
+            float: scale
+        """
+        return self.base_scale * self.zoom
+
+    def content_size(self) -> tuple[int, int]:
+        """return size of zoomed content
+
+        Returns:
+            tuple[int, int]: width and height
+        """
+        if self.source is None:
+            return (0, 0)
+        return (
+            math.ceil(self.source.size.width() * self.scale),
+            math.ceil(self.source.size.height() * self.scale),
+        )
+
+    def set_image(self, image: bytes, image_format: str = "png") -> None:
+        """replace shown image. recent images are taken from cache,
+        others are decoded in background
+
+        Args:
+            image (bytes): encoded image
+            image_format (str): png or svg
+        """
+        self.reset()
+        self.digest = hashlib.sha256(image).hexdigest()
+        self.source = SOURCE_CACHE.get(self.digest)
+        if self.source is None:
+            if image_format == "svg":
+                self.source = SvgSource(image)
+            else:
+                self.source = RasterSource(image)
+            SOURCE_CACHE.put(self.digest, self.source, self.source.cost)
+        if self.source.preview is None:
+            self.thread_pool.start(SourceLoadTask(self.source, self.signals), 1)
+        self.base_scale = SVG_SCALE if image_format == "svg" else 1.0
+        self.zoom = 1.0
+        self.update_scroll_bars()
+        self.viewport().update()
+
+    def reset(self) -> None:
+        """drop image and queued renders. cached tiles are kept"""
+        self.thread_pool.clear()
+        self.pending.clear()
+        self.source = None
+        self.digest = ""
+
+    def set_zoom(self, zoom: float) -> None:
+        """zoom around viewport center
+
+        Args:
+            zoom (float): zoom factor
+        """
+        zoom = clamp_zoom(zoom)
+        if self.source is None or zoom == self.zoom:
+            return
+        horizontal, vertical = self.horizontalScrollBar(), self.verticalScrollBar()
+        center_x = (horizontal.value() + self.viewport().width() / 2) / self.scale
+        center_y = (vertical.value() + self.viewport().height() / 2) / self.scale
+        self.zoom = zoom
+        # tiles of old zoom would only delay visible ones
+        self.thread_pool.clear()
+        self.pending.clear()
+        self.update_scroll_bars()
+        horizontal.setValue(round(center_x * self.scale - self.viewport().width() / 2))
+        vertical.setValue(round(center_y * self.scale - self.viewport().height() / 2))
+        self.viewport().update()
+
+    def sizeHint(self) -> QSize:  # pylint: disable=invalid-name
+        """size showing whole content
+
+        Returns:
+            QSize: size hint
+        """
+        width, height = self.content_size()
+        frame = self.frameWidth() * 2
+        return QSize(width + frame, height + frame)
+
+    def update_scroll_bars(self) -> None:
+        """fit scroll ranges to content and viewport"""
+        width, height = self.content_size()
+        viewport = self.viewport().size()
+        for scroll_bar, content, page in (
+            (self.horizontalScrollBar(), width, viewport.width()),
+            (self.verticalScrollBar(), height, viewport.height()),
+        ):
+            scroll_bar.setPageStep(page)
+            scroll_bar.setSingleStep(TILE_SIZE // 8)
+            scroll_bar.setRange(0, max(0, content - page))
+
+    def resizeEvent(self, event) -> None:  # pylint: disable=invalid-name
+        """update scroll bars on resize
+
+        Args:
+            event (_type_): default event argument
+        """
+        self.update_scroll_bars()
+        super().resizeEvent(event)
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:  # pylint: disable=invalid-name
+        """repaint on scroll
+
+        Args:
+            dx (int): horizontal move
+            dy (int): vertical move
+        """
+        del dx, dy
+        self.viewport().update()
+
+    def wheelEvent(self, event) -> None:  # pylint: disable=invalid-name
+        """zoom with ctrl + wheel, scroll otherwise
+
+        Args:
+            event (_type_): default event argument
+        """
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            steps = event.angleDelta().y() / 120
+            self.set_zoom(self.zoom * ZOOM_STEP**steps)
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    def keyPressEvent(self, event) -> None:  # pylint: disable=invalid-name
+        """zoom with +, - and 0 keys
+
+        Args:
+            event (_type_): default event argument
+        """
+        key = event.key()
+        if key in (Qt.Key.Key_Plus, Qt.Key.Key_Equal):
+            self.set_zoom(self.zoom * ZOOM_STEP)
+        elif key == Qt.Key.Key_Minus:
+            self.set_zoom(self.zoom / ZOOM_STEP)
+        elif key == Qt.Key.Key_0:
+            self.set_zoom(1.0)
+        else:
+            super().keyPressEvent(event)
+
+    def paintEvent(self, event) -> None:  # pylint: disable=invalid-name
+        """draw cached tiles and request missing ones. preview is drawn
+        in place of missing tiles
+
+        Args:
+            event (_type_): default event argument
+        """
+        del event
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), self.palette().window())
+        if self.source is None:
+            return
+        width, height = self.content_size()
+        viewport = self.viewport().size()
+        left, top = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        # center content smaller than viewport
+        offset = QPoint(
+            max(0, (viewport.width() - width) // 2) - left,
+            max(0, (viewport.height() - height) // 2) - top,
+        )
+        for tile in visible_tiles(
+            (left, top, viewport.width(), viewport.height()), (width, height)
+        ):
+            key = (self.digest, self.zoom, tile.column, tile.row)
+            image = TILE_CACHE.get(key)
+            position = QPoint(tile.left, tile.top) + offset
+            if image is not None:
+                painter.drawImage(position, image)
+                continue
+            self.draw_preview(painter, tile, position)
+            self.request_tile(key, tile)
+        painter.end()
+
+    def draw_preview(self, painter: QPainter, tile: Tile, position: QPoint) -> None:
+        """draw tile area of pre-scaled preview, placeholder until it is ready
+
+        Args:
+            painter (QPainter): viewport painter
+            tile (Tile): missing tile
+            position (QPoint): position of tile in viewport
+        """
+        target = QRectF(position.x(), position.y(), tile.width, tile.height)
+        preview = self.source.preview
+        if preview is None:
+            painter.fillRect(target, PLACEHOLDER_COLOR)
+            return
+        width, height = self.content_size()
+        # empty or undecodable content has nothing to scale from
+        if width == 0 or height == 0:
+            return
+        ratio = preview.width() / width
+        painter.drawImage(
+            target,
+            preview,
+            QRectF(
+                tile.left * ratio,
+                tile.top * ratio,
+                tile.width * ratio,
+                tile.height * ratio,
+            ),
+        )
+
+    def request_tile(self, key: tuple, tile: Tile) -> None:
+        """render tile in background unless it is already requested
+
+        Args:
+            key (tuple): tile key
+            tile (Tile): tile
+        """
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        self.thread_pool.start(
+            TileRenderTask(key, self.source, tile, self.scale, self.signals)
+        )
+
+    def on_tile_rendered(self, key: tuple, image: QImage) -> None:
+        """keep rendered tile and repaint
+
+        Args:
+            key (tuple): tile key
+            image (QImage): rendered tile
+        """
+        self.pending.discard(key)
+        TILE_CACHE.put(key, image, image.sizeInBytes())
+        if key[0] == self.digest:
+            self.viewport().update()
+
+    def on_source_loaded(self, source: ImageSource) -> None:
+        """repaint with preview of loaded source
+
+        Args:
+            source (ImageSource): loaded source
+        """
+        if source is self.source:
+            self.viewport().update()
+
+    def shutdown(self) -> None:
+        """stop background renders"""
+        self.reset()
+        self.thread_pool.waitForDone()
@@ -0,0 +1,156 @@
+"""
+    tile geometry and tile cache of tiled image view
+
+    this module must never import PySide6, so it is tested without display.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import collections
+from typing import Any, Hashable, NamedTuple
+
+TILE_SIZE = 256
+# 192 tiles of 256x256 ARGB are 48MB
+DEFAULT_MAX_TILES = 192
+MIN_ZOOM = 0.1
+MAX_ZOOM = 8.0
+
+
+class Tile(NamedTuple):
+    """position and size of tile in zoomed content"""
+
+    column: int
+    row: int
+    left: int
+    top: int
+    width: int
+    height: int
+
+
+def clamp_zoom(zoom: float) -> float:
+    """limit zoom factor
+
+    Args:
+        zoom (float): requested zoom
+
+    Returns:
+        float: zoom between MIN_ZOOM and MAX_ZOOM
+    """
+    return min(max(zoom, MIN_ZOOM), MAX_ZOOM)
+
+
+def visible_tiles(
+    viewport: tuple[int, int, int, int],
+    content_size: tuple[int, int],
+    tile_size: int = TILE_SIZE,
+) -> list[Tile]:
+    """return tiles overlapping viewport, nearest to viewport center first
+
+    Args:
+        viewport (tuple[int, int, int, int]): left, top, width and height of
+            visible area in content coordinates
+        content_size (tuple[int, int]): width and height of zoomed content
+        tile_size (int): edge length of tile
+
+    Returns:
+        list[Tile]: visible tiles clipped to content
+    """
+    left, top, width, height = viewport
+    content_width, content_height = content_size
+    right = min(left + width, content_width)
+    bottom = min(top + height, content_height)
+    left, top = max(left, 0), max(top, 0)
+    if right <= left or bottom <= top:
+        return []
+    tiles = [
+        Tile(
+            column,
+            row,
+            column * tile_size,
+            row * tile_size,
+            min(tile_size, content_width - column * tile_size),
+            min(tile_size, content_height - row * tile_size),
+        )
+        for row in range(top // tile_size, (bottom - 1) // tile_size + 1)
+        for column in range(left // tile_size, (right - 1) // tile_size + 1)
+    ]
+    center = ((left + right) / 2, (top + bottom) / 2)
+    return sorted(
+        tiles,
+        key=lambda tile: (tile.left + tile.width / 2 - center[0]) ** 2
+        + (tile.top + tile.height / 2 - center[1]) ** 2,
+    )
+
+
+class TileCache:
+    """keep rendered tiles. the least recently used tiles are dropped when
+    total cost exceeds max_cost"""
+
+    def __init__(self, max_cost: int = DEFAULT_MAX_TILES) -> None:
+        """
+        Args:
+            max_cost (int): maximum total cost, number of tiles when every
+                tile costs 1
+        """
+        self.max_cost = max_cost
+        self.cost = 0
+        # key -> (tile, cost)
+        self.__tiles: collections.OrderedDict[Hashable, tuple[Any, int]] = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self.__tiles)
+
+    def get(self, key: Hashable) -> Any:
+        """return tile and mark it as recently used
+
+        Args:
+            key (Hashable): tile key
+
+        Returns:
+            Any: tile, None when missing
+        """
+        entry = self.__tiles.get(key)
+        if entry is None:
+            return None
+        self.__tiles.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, tile: Any, cost: int = 1) -> None:
+        """store tile then drop old tiles. tile costing more than max_cost
+        is not stored
+
+        Args:
+            key (Hashable): tile key
+            tile (Any): rendered tile
+            cost (int): cost of tile, such as its size in bytes
+        """
+        if key in self.__tiles:
+            self.cost -= self.__tiles.pop(key)[1]
+        if cost > self.max_cost:
+            return
+        self.__tiles[key] = (tile, cost)
+        self.cost += cost
+        while self.cost > self.max_cost:
+            self.cost -= self.__tiles.popitem(last=False)[1][1]
+
+    def clear(self) -> None:
+        """drop every tile"""
+        self.__tiles.clear()
+        self.cost = 0
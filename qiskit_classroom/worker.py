@@ -19,23 +19,48 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
-import asyncio
 import datetime
-import random
-import os
-import string
-import sys
-import matplotlib as mpl
-import matplotlib.pyplot as plt
+import time
+from typing import Callable, Optional, TYPE_CHECKING
 from .expression_enum import QuantumExpression
 from .input_model import Input, QuantumCircuitInput, MatrixInput
+from .circuit_pages import CIRCUIT_FORMAT
+from .direct_engine import is_structured
+from .limits import ResourceLimits
+from .progress import PROGRESS_PREFIX, OutputCollector, Progress, ProgressCallback
+from .protocol import JobResult
+from .latex_analyzer import is_mathtext
+from .matrix_latex import DEFAULT_MAX_MATRIX_SIZE
+from .renderer import normalize_latex, render_latex
+from .worker_pool import run_in_new_worker
+from .worker_process import ARTIFACT_NAME
+
+if TYPE_CHECKING:
+    from .direct_engine import DirectConversionEngine
+    from .executor import Executor
+    from .renderer import LatexRenderer
+
+# formats of result image. LaTeX source is only for MATRIX and DIRAC results
+IMAGE_FORMATS = ("png", "svg", "pdf", "tex")
+# formats ResultImageDialog can show
+DISPLAY_FORMATS = ("png", "svg")
+
+MATRIX_LATEX_IMPORT = "from qiskit_classroom.matrix_latex import matrix_to_latex"
+CONVERTER_IMPORT = "from qiskit_class_converter import ConversionService"
 
-mpl.rcParams["font.size"] = 9
-mpl.rcParams["text.usetex"] = True
-mpl.rcParams["text.latex.preamble"] = r"\usepackage{{amsmath}}"
 
-ARRAY_TO_LATEX_IMPORT = "from qiskit.visualization import array_to_latex"
-CONVERTER_IMPORT = "from qiskit_class_converter import ConversionService"
+def progress_code(stage: str, done: str = "0", total: str = "0") -> str:
+    """generate code printing progress marker
+
+    Args:
+        stage (str): stage name
+        done (str): expression of finished steps
+        total (str): expression of total steps
+
+    Returns:
+        str: print statement
+    """
+    return f"print(f'{PROGRESS_PREFIX}{stage} {done} {total}')"
 
 
 def add_new_line(strings: list[str]) -> str:
@@ -62,64 +87,93 @@ class ConverterWorker:
         input_data: Input,
         expression_text: str,
         shows_result: bool,
+        pool: Optional["Executor"] = None,
+        engine: Optional["DirectConversionEngine"] = None,
+        image_format: str = "png",
+        limits: Optional[ResourceLimits] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        renderer: Optional["LatexRenderer"] = None,
+        max_matrix_size: int = DEFAULT_MAX_MATRIX_SIZE,
     ) -> None:
+        if image_format not in IMAGE_FORMATS + (CIRCUIT_FORMAT,):
+            raise ValueError(f"unsupported image format {image_format}")
+        if image_format == "tex" and to_expression is QuantumExpression.CIRCUIT:
+            raise ValueError("quantum circuit cannot be written as LaTeX source")
+        if (
+            image_format == CIRCUIT_FORMAT
+            and to_expression is not QuantumExpression.CIRCUIT
+        ):
+            raise ValueError("only quantum circuit can be exported as qpy")
         self.from_expression = from_expression
         self.to_expression = to_expression
-        self.__injected_sourcecode_path = ConverterWorker.generate_random_file_name()
 
         # copy text
         self.expression_text = "" + expression_text
         self.input_data = input_data
         self.shows_result = shows_result
+        # run generated script in warm worker pool or fork server when given
+        self.pool = pool
+        # convert structured input without generating script when given
+        self.engine = engine
+        self.image_format = image_format
+        # render latex results off the event loop when given
+        self.renderer = renderer
+        # larger matrices are summarized instead of written in full
+        self.max_matrix_size = max_matrix_size
+        # limits of subprocess. pool and engine enforce their own limits
+        self.limits = limits if limits is not None else ResourceLimits(None, None, None)
+        # stdout is parsed while script runs. progress goes to on_progress
+        self.output = OutputCollector(on_progress)
+        # seconds spent in each stage
+        self.timings: dict[str, float] = {}
+
+    def generate_savefig_code(self, value_name: str) -> str:
+        """generate code drawing quantum circuit into in-memory artifact.
+        with CIRCUIT_FORMAT circuit is exported as qpy for paginated drawing
 
-    @staticmethod
-    def generate_random_file_name() -> str:  # pragma: no cover
-        # this method implmented with random function
-        """return generated file name
+        Args:
+            value_name (str): value name of quantum circuit
 
         Returns:
-            str: generated file name
+            str: drawing code
         """
-        return (
-            "/tmp/"
-            + "".join(random.choice(string.ascii_letters) for _ in range(10))
-            + ".py"
+        if self.image_format == CIRCUIT_FORMAT:
+            return add_new_line(
+                [
+                    f'{ARTIFACT_NAME} = __import__("io").BytesIO()',
+                    "from qiskit import qpy",
+                    f"qpy.dump({value_name}, {ARTIFACT_NAME})",
+                ]
+            )
+        return add_new_line(
+            [
+                f'{ARTIFACT_NAME} = __import__("io").BytesIO()',
+                f'{value_name}.draw(output="mpl")'
+                + f'.savefig({ARTIFACT_NAME}, format="{self.image_format}", '
+                + 'bbox_inches="tight")',
+            ]
         )
 
-    @staticmethod
-    def write_converting_code(file_path: str, code: str) -> bool:  # pragma: no cover
-        """write code to file_path
-
-        Args:
-            file_path (str): target
-            code (str): contents
+    def generate_code(self) -> str:
+        """generate script of user's code, conversion and visualization
 
         Returns:
-            bool: is succesful
+            str: script source. it is sent to executor, never written to file
         """
-        try:
-            with open(file_path, mode="w", encoding="UTF-8") as file:
-                file.write(code)
-        except FileNotFoundError:
-            return False
-        return True
-
-    def __generate_code(self):  # pragma: no cover
         expression_text = self.expression_text
         if self.from_expression is QuantumExpression.MATRIX:
             input_data: MatrixInput = self.input_data
             expression_text = f"{input_data.value_name}={expression_text}"
-        ConverterWorker.write_converting_code(
-            self.__injected_sourcecode_path,
-            add_new_line(
-                [
-                    expression_text,
-                    CONVERTER_IMPORT,
-                    ARRAY_TO_LATEX_IMPORT,
-                    self.generate_conversion_code(),
-                    self.generate_visualization_code(),
-                ]
-            ),
+        return add_new_line(
+            [
+                expression_text,
+                CONVERTER_IMPORT,
+                MATRIX_LATEX_IMPORT,
+                progress_code("converting"),
+                self.generate_conversion_code(),
+                progress_code("visualizing"),
+                self.generate_visualization_code(),
+            ]
         )
 
     def generate_conversion_code(self) -> str:
@@ -136,6 +190,9 @@ class ConverterWorker:
         option: dict[str, str] = {}
         if self.to_expression is QuantumExpression.CIRCUIT:
             option = matrix_to_qc_option
+        elif self.to_expression is QuantumExpression.MATRIX:
+            # numpy matrices. matrix_to_latex decides how much to write
+            option = {}
         else:
             option = default_option
         first_line = (
@@ -175,128 +232,171 @@ class ConverterWorker:
             if self.to_expression is QuantumExpression.MATRIX:
                 return add_new_line(
                     [
+                        "gate_count = len(result['gate'])",
                         (
-                            "for gate, name in zip(reversed(result['gate']),"
-                            + "reversed(result['name'])):"
+                            "for index, (gate, name) in enumerate("
+                            + "zip(reversed(result['gate']),reversed(result['name']))):"
                         ),
                         "\totimes=' \\\\otimes '",
-                        """\tprint('\\stackrel{' + otimes.join(name[1]) +'}' + f'{{{gate}}}')""",
-                        "print(f\"= \\stackrel{{result}}{{{result['result']}}}\")"
+                        (
+                            "\tprint('\\\\stackrel{' + otimes.join(name[1]) + '}{' "
+                            + f"+ matrix_to_latex(gate, {self.max_matrix_size}) + '}}')"
+                        ),
+                        "\t" + progress_code("gate", "{index + 1}", "{gate_count}"),
+                        (
+                            "print('= \\\\stackrel{result}{' + matrix_to_latex("
+                            + f"result['result'], {self.max_matrix_size}) + '}}')"
+                        )
                         if self.shows_result
                         else "",
                     ]
                 )
 
             if self.to_expression is QuantumExpression.CIRCUIT:
-                return add_new_line(
-                    [
-                        'quantum_circuit.draw(output="mpl")'
-                        + f'.savefig("{self.__injected_sourcecode_path+".png"}", '
-                        + 'bbox_inches="tight")'
-                    ]
-                )
+                return self.generate_savefig_code("quantum_circuit")
 
             if self.to_expression is QuantumExpression.DIRAC:
                 return add_new_line(["print(result)"])
         else:
             if self.to_expression is QuantumExpression.MATRIX:
                 matrix_input: MatrixInput = self.input_data
-                return add_new_line(
-                    [f"print(array_to_latex({matrix_input.value_name}, source=True))"]
-                )
-            if self.to_expression is QuantumExpression.CIRCUIT:
-                qunatum_input: QuantumCircuitInput = self.input_data
                 return add_new_line(
                     [
-                        f'{qunatum_input.value_name}.draw(output="mpl")'
-                        + f'.savefig("{self.__injected_sourcecode_path+".png"}",'
-                        + 'bbox_inches="tight")'
+                        f"print(matrix_to_latex({matrix_input.value_name}, "
+                        + f"{self.max_matrix_size}))"
                     ]
                 )
+            if self.to_expression is QuantumExpression.CIRCUIT:
+                qunatum_input: QuantumCircuitInput = self.input_data
+                return self.generate_savefig_code(qunatum_input.value_name)
         return ""
 
-    async def run(self) -> str:
-        """inject expression convert code to user's source code and create
-        subprocess for drawing converted expresion
+    async def run(self) -> bytes:
+        """inject expression convert code to user's source code and run it
+        in executor or subprocess for drawing converted expresion
+
+        Raises:
+            SyntaxError: when user's code has syntax error
+            NameError: when value name is not defined
+            ConversionError: when script raised other exception
+            ConversionLimitExceeded: when script exceeded its limits
 
         Returns:
-            str: path of subprocess created image
+            bytes: encoded result image
         """
         print("now running")
         print(datetime.datetime.now().time())
-        self.__generate_code()
-        stdout, stderr = await self.run_subprocess()
+        if self.engine is not None and is_structured(
+            self.from_expression, self.to_expression, self.expression_text
+        ):
+            return await self.run_direct()
+
+        # circuit image is drawn by script and arrives as payload of result
+        result = await self.run_subprocess(
+            self.generate_code(),
+            on_line=self.output.feed,
+            artifact=self.to_expression is QuantumExpression.CIRCUIT,
+        )
+        # lines which were not streamed
+        for line in result.stdout.splitlines():
+            self.output.feed(line)
+        stdout = self.output.output
+        self.timings.update(result.timings)
 
         if stdout:
             print(f"output {stdout}")
-        if stderr:
-            stderr: str = stderr
-            print(f"error {stderr}")
-            if stderr.find("SyntaxError") != -1:
-                raise SyntaxError
-            if stderr.find("NameError") != -1:
-                raise NameError
+        if result.stderr:
+            print(f"error {result.stderr}")
         print("end at ")
         print(datetime.datetime.now().time())
 
-        # remove injected source code
-        if not self.cleanup():
-            print("error removing file")
-
         if self.to_expression is QuantumExpression.CIRCUIT:
-            return self.__injected_sourcecode_path + ".png"
+            return result.payload
 
-        return self.draw_latex(latex=stdout)
+        return await self.draw(stdout)
 
-    async def run_subprocess(self) -> (str, str):
-        """run generated script's subprocess
+    async def run_direct(self) -> bytes:
+        """convert structured input with engine
 
         Returns:
-            (str, str): subprocess's stdout and stderr
+            bytes: encoded result image
         """
-        proc = await asyncio.create_subprocess_exec(
-            sys.executable,
-            self.__injected_sourcecode_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        self.output.report(Progress("converting"))
+        result = await self.engine.convert(
+            self.from_expression,
+            self.to_expression,
+            self.input_data,
+            self.expression_text,
+            self.shows_result,
+            self.image_format,
+            self.max_matrix_size,
         )
-        stdout, stderr = await proc.communicate()
+        print("end at ")
+        print(datetime.datetime.now().time())
+        if self.to_expression is QuantumExpression.CIRCUIT:
+            return result
+        return await self.draw(result)
 
-        await proc.wait()
-        return (stdout.decode(), stderr.decode())
+    async def run_subprocess(
+        self,
+        source: str,
+        on_line: Optional[Callable[[str], None]] = None,
+        artifact: bool = False,
+    ) -> JobResult:
+        """run generated script in executor, or in a fresh worker process
+        without executor
 
-    def cleanup(self) -> bool:
-        """remove generated script
+        Args:
+            source (str): generated script
+            on_line (Optional[Callable[[str], None]]): receive stdout lines
+                while script runs
+            artifact (bool): script must produce image
+
+        Raises:
+            ConversionLimitExceeded: when script exceeded its limits
+            ConversionError: when script raised exception
 
         Returns:
-            bool: result of removing file
+            JobResult: result of script. stdout is empty when lines were
+            passed to on_line
         """
-        try:
-            os.remove(self.__injected_sourcecode_path)
-        except FileNotFoundError:
-            return False
-        return True
+        if self.pool is not None:
+            return await self.pool.run(source, on_line, artifact)
+        return await run_in_new_worker(source, self.limits, on_line, artifact)
+
+    async def draw(self, latex: str) -> bytes:
+        """render latex result and record time spent on it. gate equations
+        are typeset side by side as one equation, so rendering waits for the
+        whole output instead of rendering each line as it arrives
+
+        Args:
+            latex (str): latex result of conversion
 
-    def draw_latex(self, latex: str) -> str:  # pragma: no cover
+        Returns:
+            bytes: encoded image
+        """
+        self.output.report(Progress("drawing"))
+        started = time.perf_counter()
+        image = await self.draw_latex(latex=latex)
+        self.timings["drawing"] = time.perf_counter() - started
+        return image
+
+    async def draw_latex(self, latex: str) -> bytes:
         """
-        render latex to image and save as file.
+        render latex to encoded image in memory with renderer.
+        without renderer latex is rendered in this process.
 
         Args:
             latex (str): latex matrix code
 
         Raises:
-            MatrixNotFound: when latex not have matrix
+            ConversionTimeout: when render exceeded wall_time
+            RuntimeError: when latex could not be rendered
 
         Returns:
-            str: image file path
+            bytes: encoded image
         """
-
-        # this code avoid latex runtime error (\n ocurse error)
-        latex = latex.replace("\n", " ").strip()
-
-        fig = plt.figure()
-        fig.text(0, 0, f"${latex}$")
-        output = self.__injected_sourcecode_path + ".png"
-        fig.savefig(output, dpi=200, bbox_inches="tight")
-        plt.close()
-        return output
+        if self.renderer is not None:
+            return await self.renderer.render(latex, self.image_format)
+        usetex = not is_mathtext(normalize_latex(latex))
+        return render_latex(latex, self.image_format, usetex=usetex)
@@ -0,0 +1,344 @@
+"""
+    pool of warm conversion worker processes
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import itertools
+import sys
+from typing import Callable, Optional
+from .limits import ResourceLimits
+from .protocol import Channel, Frame, JobResult, unpack_result
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_JOBS_PER_WORKER = 50
+DEFAULT_MAX_MEMORY = 1024 * 1024 * 1024
+
+WORKER_MODULE = "qiskit_classroom.worker_process"
+
+
+class PooledWorker:
+    """handle of one long-lived worker process"""
+
+    # pylint: disable=no-member
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+        self.channel = Channel(process.stdout, process.stdin)
+        self.jobs_done = 0
+        self.memory = 0
+
+    @property
+    def alive(self) -> bool:
+        """property of process state
+
+        Returns:
+            bool: process is still running
+        """
+        return self.process.returncode is None
+
+    async def receive(self) -> Frame:
+        """read one frame from worker
+
+        Raises:
+            RuntimeError: when worker exited
+
+        Returns:
+            Frame: frame
+        """
+        return await self.channel.receive()
+
+    # pylint: disable=too-many-arguments
+    async def run(
+        self,
+        job_id: int,
+        source: str,
+        limits: dict = None,
+        on_line: Optional[Callable[[str], None]] = None,
+        artifact: bool = False,
+    ) -> Frame:
+        """send job to worker and wait result
+
+        Args:
+            job_id (int): job id
+            source (str): generated script
+            limits (dict): cpu_time and memory limits of job
+            on_line (Optional[Callable[[str], None]]): receive stdout lines
+                while job runs
+            artifact (bool): script must produce image
+
+        Returns:
+            Frame: result frame
+        """
+        job = {
+            "type": "job",
+            "id": job_id,
+            "source": source,
+            "limits": limits,
+            "stream": on_line is not None,
+            "artifact": artifact,
+        }
+        frame = await self.channel.request(job, on_line=on_line)
+        self.jobs_done += 1
+        self.memory = frame.header["memory"]
+        return frame
+
+    def kill(self) -> None:
+        """kill worker process"""
+        self.channel.close()
+        if self.alive:
+            self.process.kill()
+
+    async def stop(self) -> None:
+        """kill worker process and wait until it exits, so its pipes are
+        closed before event loop is closed"""
+        if self.alive:
+            self.process.kill()
+        await self.process.wait()
+        self.channel.close()
+
+
+async def spawn_worker(*args: str) -> PooledWorker:  # pragma: no cover
+    # this function create real process
+    """start worker process and wait until it is ready
+
+    Args:
+        args (str): arguments of worker module
+
+    Returns:
+        PooledWorker: ready worker
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        WORKER_MODULE,
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    worker = PooledWorker(process)
+    try:
+        await worker.receive()
+    except BaseException:
+        # cancelled or failed start leaves no process behind
+        await worker.stop()
+        raise
+    return worker
+
+
+async def run_in_new_worker(
+    source: str,
+    limits: ResourceLimits,
+    on_line: Optional[Callable[[str], None]] = None,
+    artifact: bool = False,
+) -> JobResult:  # pragma: no cover
+    # this function create real process
+    """run generated script in fresh worker process which exits after it
+
+    Args:
+        source (str): generated script
+        limits (ResourceLimits): limits of job
+        on_line (Optional[Callable[[str], None]]): receive stdout lines
+            while script runs
+        artifact (bool): script must produce image
+
+    Raises:
+        ConversionLimitExceeded: when job exceeded its limits
+
+    Returns:
+        JobResult: result of script
+    """
+    worker = await spawn_worker()
+    try:
+        frame = await asyncio.wait_for(
+            worker.run(0, source, limits.to_message(), on_line, artifact),
+            limits.wall_time,
+        )
+    except asyncio.TimeoutError:
+        raise limits.error_of("wall_time") from None
+    finally:
+        await worker.stop()
+    return unpack_result(frame, limits)
+
+
+# pylint: disable=too-many-instance-attributes
+class WorkerPool:
+    """keep python interpreters which already imported qiskit, converter and
+    matplotlib, and dispatch generated scripts to them"""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER,
+        max_memory: int = DEFAULT_MAX_MEMORY,
+        limits: ResourceLimits = None,
+    ) -> None:
+        """
+        Args:
+            size (int): maximum number of worker processes
+            max_jobs_per_worker (int): recycle worker after this number of jobs
+            max_memory (int): recycle worker when its memory exceeds this bytes
+            limits (ResourceLimits): limits of each job, None for unlimited
+        """
+        if size < 1:
+            raise ValueError("pool size must be positive")
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_memory = max_memory
+        self.limits = limits if limits is not None else ResourceLimits(None, None, None)
+        self.__workers: list[PooledWorker] = []
+        self.__starting = 0
+        self.__idle: "asyncio.Queue[PooledWorker]" = None
+        self.__job_ids = itertools.count()
+
+    @property
+    def workers(self) -> list[PooledWorker]:
+        """property of __workers
+
+        Returns:
+            list[PooledWorker]: running workers
+        """
+        return list(self.__workers)
+
+    async def spawn_worker(self) -> PooledWorker:  # pragma: no cover
+        # this method create real process
+        """start worker process and wait until it is ready
+
+        Returns:
+            PooledWorker: ready worker
+        """
+        return await spawn_worker()
+
+    async def start(self) -> None:
+        """fill the pool with warm workers"""
+        await asyncio.gather(
+            *[self.__add_idle_worker() for _ in range(self.__free_slots())]
+        )
+
+    def __free_slots(self) -> int:
+        return self.size - len(self.__workers) - self.__starting
+
+    async def __add_idle_worker(self) -> None:
+        if self.__free_slots() <= 0:
+            return
+        try:
+            worker = await self.__launch()
+        except (OSError, RuntimeError) as exc:
+            print(f"failed to start conversion worker {exc}")
+            return
+        self.__get_idle_queue().put_nowait(worker)
+
+    async def __launch(self) -> PooledWorker:
+        # reserve slot before await so concurrent acquires do not over spawn
+        self.__starting += 1
+        try:
+            worker = await self.spawn_worker()
+        finally:
+            self.__starting -= 1
+        self.__workers.append(worker)
+        return worker
+
+    def __get_idle_queue(self) -> "asyncio.Queue[PooledWorker]":
+        if self.__idle is None:
+            self.__idle = asyncio.Queue()
+        return self.__idle
+
+    async def __acquire(self) -> PooledWorker:
+        idle = self.__get_idle_queue()
+        while True:
+            if idle.empty() and self.__free_slots() > 0:
+                return await self.__launch()
+            worker = await idle.get()
+            if worker.alive:
+                return worker
+            self.__retire(worker)
+
+    def __release(self, worker: PooledWorker) -> None:
+        if (
+            not worker.alive
+            or worker.jobs_done >= self.max_jobs_per_worker
+            or worker.memory >= self.max_memory
+        ):
+            self.__replace(worker)
+            return
+        self.__get_idle_queue().put_nowait(worker)
+
+    def __retire(self, worker: PooledWorker) -> None:
+        worker.kill()
+        if worker in self.__workers:
+            self.__workers.remove(worker)
+
+    def __replace(self, worker: PooledWorker) -> None:
+        self.__retire(worker)
+        # warm replacement in background
+        asyncio.ensure_future(self.__add_idle_worker())
+
+    async def run(
+        self,
+        source: str,
+        on_line: Optional[Callable[[str], None]] = None,
+        artifact: bool = False,
+    ) -> JobResult:
+        """run generated script in a warm worker
+
+        Args:
+            source (str): generated script
+            on_line (Optional[Callable[[str], None]]): receive stdout lines
+                while script runs
+            artifact (bool): script must produce image. image is returned
+                as payload of result
+
+        Raises:
+            ConversionLimitExceeded: when job exceeded its limits
+            ConversionError: when script raised exception
+
+        Returns:
+            JobResult: result of script. stdout is empty when lines were
+            passed to on_line
+        """
+        worker = await self.__acquire()
+        try:
+            frame = await asyncio.wait_for(
+                worker.run(
+                    next(self.__job_ids),
+                    source,
+                    self.limits.to_message(),
+                    on_line,
+                    artifact,
+                ),
+                self.limits.wall_time,
+            )
+        except asyncio.TimeoutError:
+            self.__replace(worker)
+            raise self.limits.error_of("wall_time") from None
+        except BaseException:
+            # worker state is unknown after failure or cancellation
+            self.__replace(worker)
+            raise
+        if frame.header["limit"] is not None:
+            self.__replace(worker)
+        else:
+            self.__release(worker)
+        return unpack_result(frame, self.limits)
+
+    async def terminate(self) -> None:
+        """kill every worker and wait until they exit"""
+        workers = list(self.__workers)
+        self.__workers.clear()
+        self.__idle = None
+        await asyncio.gather(*[worker.stop() for worker in workers])
@@ -0,0 +1,376 @@
+"""
+    long-lived conversion worker process
+
+    run with ``python -m qiskit_classroom.worker_process``.
+    heavy libraries are imported once at start up and every job received
+    on stdin is executed inside the already warm interpreter.
+
+    with ``--zygote`` the process never runs jobs itself. it forks a child
+    for every job so each job starts warm but still gets its own process.
+
+    jobs and results are frames of ``qiskit_classroom.protocol``.
+"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import contextlib
+import io
+import linecache
+import os
+import selectors
+import signal
+import sys
+import time
+import traceback
+from typing import BinaryIO, Callable, Optional
+from .limits import apply_limits, clear_limits
+from .protocol import Frame, FrameDecoder, encode_frame, read_frame
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # windows
+    resource = None
+
+# exception name reported for each breached limit
+LIMIT_ERRORS = {"CpuTimeExceeded": "cpu_time", "MemoryError": "memory"}
+# scripts hand over their image by binding bytes or BytesIO to this name
+ARTIFACT_NAME = "__artifact__"
+
+
+class CpuTimeExceeded(Exception):
+    """
+    Exception class raised by SIGXCPU handler
+    """
+
+
+def on_cpu_time_exceeded(signum, frame) -> None:  # pragma: no cover
+    # pylint: disable=unused-argument
+    """SIGXCPU handler. stop running job instead of killing worker"""
+    raise CpuTimeExceeded()
+
+
+def preload() -> None:  # pragma: no cover
+    # this method only import libraries
+    """import libraries used by generated scripts"""
+    # pylint: disable=import-outside-toplevel, unused-import
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+    import qiskit
+    from qiskit import qpy
+    from qiskit.visualization import array_to_latex
+    from qiskit_class_converter import ConversionService
+
+
+def current_memory() -> int:
+    """return resident set size of this process
+
+    Returns:
+        int: memory usage in bytes
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="UTF-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):  # pragma: no cover
+        # not linux. ru_maxrss is kilobytes on linux and bytes on macOS
+        if resource is None:
+            return 0
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+class LineWriter(io.TextIOBase):
+    """text stream which passes every complete line to callback"""
+
+    def __init__(self, on_line: Callable[[str], None]) -> None:
+        super().__init__()
+        self.on_line = on_line
+        self.buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        if "\n" in self.buffer:
+            *lines, self.buffer = self.buffer.split("\n")
+            for line in lines:
+                self.on_line(line)
+        return len(text)
+
+    def getvalue(self) -> str:
+        """pass unfinished last line and return empty output, every line was
+        already passed to callback
+
+        Returns:
+            str: empty string
+        """
+        if self.buffer:
+            self.on_line(self.buffer)
+            self.buffer = ""
+        return ""
+
+
+def execute_job(
+    source: str,
+    filename: str = "<conversion>",
+    on_line: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """execute generated script in fresh namespace
+
+    Args:
+        source (str): generated script
+        filename (str): name of script shown in traceback
+        on_line (Optional[Callable[[str], None]]): stream stdout lines to this
+            callback instead of capturing them
+
+    Returns:
+        dict: captured stdout and stderr, raised error with its traceback or
+        None, seconds spent in compile and execute and artifact bytes of
+        script or None
+    """
+    stdout = io.StringIO() if on_line is None else LineWriter(on_line)
+    stderr = io.StringIO()
+    error = None
+    timings = {}
+    namespace = {"__name__": "__main__", "__file__": filename}
+    # script has no file, register its lines for traceback
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            code = compile(source, filename, "exec")
+            timings["compile"] = time.perf_counter() - started
+            exec(code, namespace)  # pylint: disable=exec-used
+            timings["execute"] = time.perf_counter() - started - timings["compile"]
+        except (Exception, SystemExit) as exc:  # pylint: disable=broad-exception-caught
+            error = {
+                "type": type(exc).__name__,
+                "message": str(exc),
+                "traceback": traceback.format_exc(),
+            }
+        finally:
+            linecache.cache.pop(filename, None)
+            if "matplotlib.pyplot" in sys.modules:
+                sys.modules["matplotlib.pyplot"].close("all")
+    artifact = namespace.get(ARTIFACT_NAME)
+    if isinstance(artifact, io.BytesIO):
+        artifact = artifact.getvalue()
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "error": error,
+        "timings": timings,
+        "artifact": artifact if isinstance(artifact, bytes) else None,
+    }
+
+
+def run_job(job: dict, send: Optional[Callable[[dict], None]] = None) -> Frame:
+    """execute job under its resource limits
+
+    Args:
+        job (dict): job header
+        send (Optional[Callable[[dict], None]]): send line frames of job
+            with ``stream`` key. stdout of result is empty then
+
+    Returns:
+        Frame: result frame with artifact as payload. limit is name of
+        breached limit or None
+    """
+
+    def send_line(line: str) -> None:
+        send({"type": "line", "id": job["id"], "line": line})
+
+    streams = send is not None and job.get("stream")
+    apply_limits(job.get("limits"))
+    try:
+        result = execute_job(
+            job["source"], f"<conversion {job['id']}>", send_line if streams else None
+        )
+    finally:
+        clear_limits()
+    error = result["error"]
+    payload = result.pop("artifact") or b""
+    if error is None and job.get("artifact") and not payload:
+        message = f"script did not bind result image to {ARTIFACT_NAME}"
+        error = {"type": "ArtifactMissing", "message": message, "traceback": ""}
+    result.update(
+        type="result",
+        id=job["id"],
+        error=error,
+        artifact=len(payload) if payload else None,
+        memory=current_memory(),
+        limit=LIMIT_ERRORS.get(error["type"]) if error is not None else None,
+    )
+    return Frame(result, payload)
+
+
+def serve(reader: BinaryIO, writer: BinaryIO) -> None:
+    """answer jobs until reader reaches EOF
+
+    stdout of streaming job is sent as line frames before its result.
+
+    Args:
+        reader (BinaryIO): job frame stream
+        writer (BinaryIO): result frame stream
+    """
+
+    def send(header: dict, payload: bytes = b"") -> None:
+        writer.write(encode_frame(header, payload))
+        writer.flush()
+
+    send({"type": "ready", "pid": os.getpid()})
+    while True:
+        frame = read_frame(reader)
+        if frame is None:
+            break
+        if frame.header["type"] == "job":
+            send(*run_job(frame.header, send))
+
+
+def fork_job(job: dict) -> (int, int):
+    """fork child which runs job and writes its frames to pipe
+
+    Args:
+        job (dict): job header
+
+    Returns:
+        (int, int): child pid and read end of frame pipe
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        # child process. never return to zygote loop
+        exit_code = 0
+        try:
+            os.close(read_fd)
+            with os.fdopen(write_fd, "wb") as pipe:
+
+                def send(header: dict, payload: bytes = b"") -> None:
+                    pipe.write(encode_frame(header, payload))
+                    pipe.flush()
+
+                send(*run_job(job, send))
+        except BaseException:  # pylint: disable=broad-exception-caught
+            exit_code = 1
+        finally:
+            os._exit(exit_code)  # pylint: disable=protected-access
+    os.close(write_fd)
+    return (pid, read_fd)
+
+
+def serve_zygote(reader_fd: int, writer: BinaryIO) -> None:
+    """fork child for every job until reader reaches EOF
+
+    a cancel frame kills the child of that job. at EOF every running child
+    is killed, since sleeping or blocked child never hits its cpu limit.
+
+    Args:
+        reader_fd (int): file descriptor of job frame stream
+        writer (BinaryIO): result frame stream
+    """
+
+    def send(frame: Frame) -> None:
+        writer.write(encode_frame(frame.header, frame.payload))
+        writer.flush()
+
+    def handle(frame: Frame) -> None:
+        job = frame.header
+        if job["type"] == "cancel":
+            for child in children.values():
+                if child["id"] == job["id"]:
+                    os.kill(child["pid"], signal.SIGKILL)
+            return
+        pid, read_fd = fork_job(job)
+        children[read_fd] = {
+            "id": job["id"],
+            "pid": pid,
+            "decoder": FrameDecoder(),
+            "finished": False,
+        }
+        selector.register(read_fd, selectors.EVENT_READ)
+
+    def relay(child: dict, data: bytes) -> None:
+        for frame in child["decoder"].feed(data):
+            child["finished"] = frame.header["type"] == "result"
+            send(frame)
+
+    def finish(read_fd: int) -> None:
+        child = children.pop(read_fd)
+        selector.unregister(read_fd)
+        os.close(read_fd)
+        _, status = os.waitpid(child["pid"], 0)
+        if not child["finished"]:
+            message = f"conversion process crashed (wait status {status})"
+            error = {"type": "ProcessCrashed", "message": message, "traceback": ""}
+            result = {"stdout": "", "stderr": "", "error": error, "timings": {}}
+            result.update(type="result", id=child["id"], memory=0, limit=None)
+            send(Frame(result))
+
+    def kill_children() -> None:
+        for read_fd, child in children.items():
+            os.kill(child["pid"], signal.SIGKILL)
+            os.waitpid(child["pid"], 0)
+            selector.unregister(read_fd)
+            os.close(read_fd)
+        children.clear()
+
+    children: dict[int, dict] = {}
+    selector = selectors.DefaultSelector()
+    selector.register(reader_fd, selectors.EVENT_READ)
+    decoder = FrameDecoder()
+    reading = True
+    send(Frame({"type": "ready", "pid": os.getpid()}))
+    while reading:
+        for key, _ in selector.select():
+            data = os.read(key.fd, 65536)
+            if key.fd != reader_fd:
+                if data:
+                    relay(children[key.fd], data)
+                else:
+                    finish(key.fd)
+                continue
+            if not data:
+                reading = False
+                selector.unregister(reader_fd)
+                continue
+            for frame in decoder.feed(data):
+                handle(frame)
+    kill_children()
+    selector.close()
+
+
+def main() -> None:  # pragma: no cover
+    """entry point of worker process"""
+    # keep protocol channel private. anything else printed to fd 1
+    # (C extensions, stray prints) goes to stderr instead
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, on_cpu_time_exceeded)
+    preload()
+    if "--zygote" in sys.argv[1:]:
+        serve_zygote(sys.stdin.fileno(), channel)
+    else:
+        serve(sys.stdin.buffer, channel)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,131 @@
+"""test circuit_pages.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import unittest
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit
+from qiskit.circuit.library import XGate
+from qiskit.extensions import UnitaryGate
+from qiskit.quantum_info import random_unitary
+from qiskit_classroom.circuit_pages import (
+    PAGE_NAME,
+    dump_circuit,
+    layers_of,
+    load_circuit,
+    page_key,
+    split_circuit,
+)
+
+
+def ladder(repeat: int) -> QuantumCircuit:
+    """circuit of h and cx repeated on two qubits"""
+    circuit = QuantumCircuit(2, 2)
+    for _ in range(repeat):
+        circuit.h(0)
+        circuit.cx(0, 1)
+    circuit.measure([0, 1], [0, 1])
+    return circuit
+
+
+class CircuitPagesTest(unittest.TestCase):
+    """test pagination of circuit"""
+
+    def test_layers_of(self):
+        """test instruction follows last instruction on its bits"""
+        circuit = QuantumCircuit(3)
+        circuit.h(0)
+        circuit.x(2)
+        circuit.cx(0, 1)
+        circuit.barrier()
+        self.assertEqual(layers_of(circuit), [0, 0, 1, 2])
+
+    def test_layers_of_condition(self):
+        """test conditioned gate follows measurement of its condition"""
+        circuit = QuantumCircuit(2, 1)
+        circuit.h(0)
+        circuit.measure(0, 0)
+        circuit.x(1).c_if(circuit.clbits[0], 1)
+        register = ClassicalRegister(1)
+        circuit.add_register(register)
+        circuit.h(0)
+        circuit.h(0)
+        circuit.measure(0, register[0])
+        circuit.x(1).c_if(register, 1)
+        self.assertEqual(layers_of(circuit), [0, 1, 2, 2, 3, 4, 5])
+
+    def test_split_circuit(self):
+        """test pages keep registers and every instruction"""
+        circuit = ladder(10)
+        pages = split_circuit(circuit, 4)
+        self.assertEqual(len(pages), 6)
+        self.assertEqual(sum(len(page.data) for page in pages), len(circuit.data))
+        for page in pages:
+            self.assertEqual(page.qregs, circuit.qregs)
+            self.assertEqual(page.cregs, circuit.cregs)
+            self.assertEqual(page.name, PAGE_NAME)
+        self.assertEqual(len(split_circuit(QuantumCircuit(1), 4)), 1)
+
+    def test_page_key(self):
+        """test same gates give same key"""
+        pages = [dump_circuit(page) for page in split_circuit(ladder(8), 4)]
+        other = [dump_circuit(page) for page in split_circuit(ladder(8), 4)]
+        self.assertEqual(page_key(pages[0], "png"), page_key(pages[1], "png"))
+        self.assertEqual(page_key(pages[0], "png"), page_key(other[0], "png"))
+        self.assertNotEqual(page_key(pages[0], "png"), page_key(pages[0], "svg"))
+        self.assertNotEqual(page_key(pages[0], "png"), page_key(pages[-1], "png"))
+
+    def test_page_key_collision(self):
+        """test pages differing only in drawn details have different keys"""
+        unitary = random_unitary(32, seed=1).data
+        # differs only in interior rows, which str of array elides
+        swapped = unitary[[*range(10), 11, 10, *range(12, 32)]]
+        open_control = XGate().control(1, ctrl_state=0)
+        closed_control = XGate().control(1, ctrl_state=1)
+
+        def key_of(build) -> str:
+            circuit = QuantumCircuit(5, 1)
+            build(circuit)
+            return page_key(dump_circuit(split_circuit(circuit)[0]), "png")
+
+        pairs = [
+            (
+                lambda circuit: circuit.append(XGate(label="A"), [0]),
+                lambda circuit: circuit.append(XGate(label="B"), [0]),
+            ),
+            (
+                lambda circuit: circuit.x(0).c_if(circuit.cregs[0], 1),
+                lambda circuit: circuit.x(0).c_if(circuit.cregs[0], 0),
+            ),
+            (
+                lambda circuit: circuit.append(open_control, [0, 1]),
+                lambda circuit: circuit.append(closed_control, [0, 1]),
+            ),
+            (
+                lambda circuit: circuit.append(UnitaryGate(unitary), range(5)),
+                lambda circuit: circuit.append(UnitaryGate(swapped), range(5)),
+            ),
+        ]
+        self.assertFalse(np.allclose(unitary, swapped))
+        for first, second in pairs:
+            self.assertNotEqual(key_of(first), key_of(second))
+
+    def test_dump_circuit(self):
+        """test circuit survives serialization"""
+        circuit = ladder(2)
+        self.assertEqual(load_circuit(dump_circuit(circuit)), circuit)
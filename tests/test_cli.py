@@ -0,0 +1,212 @@
+"""test cli.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from qiskit_classroom.cli import collect_files, main, make_input, parse_args
+from qiskit_classroom.input_model import MatrixInput, QuantumCircuitInput
+
+
+class CliTest(unittest.TestCase):
+    """test command line converter"""
+
+    def setUp(self) -> None:
+        # pylint: disable=consider-using-with
+        self.directory = tempfile.TemporaryDirectory()
+        self.inputs = os.path.join(self.directory.name, "inputs")
+        os.makedirs(os.path.join(self.inputs, "nested"))
+        for name, contents in [
+            ("x.txt", "[[0, 1], [1, 0]]"),
+            ("nested/cx.txt", "[[1,0,0,0],[0,0,0,1],[0,0,1,0],[0,1,0,0]]"),
+            ("notes.md", "not an input"),
+        ]:
+            with open(
+                os.path.join(self.inputs, name), "w", encoding="UTF-8"
+            ) as file:
+                file.write(contents)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_never_imports_qt(self):
+        """test cli does not import PySide6"""
+        code = "import sys, qiskit_classroom.cli; print('PySide6' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout
+        self.assertEqual(output.strip(), "False")
+
+    def test_main_reaps_workers(self):
+        """test workers of python inputs exit before event loop closes"""
+        path = os.path.join(self.directory.name, "bell.py")
+        with open(path, "w", encoding="UTF-8") as file:
+            file.write(
+                "from qiskit import QuantumCircuit\n"
+                "quantum_circuit = QuantumCircuit(2)\n"
+                "quantum_circuit.h(0)\n"
+                "quantum_circuit.cx(0, 1)\n"
+            )
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "qiskit_classroom.cli",
+                "--from=CIRCUIT",
+                "--to=DIRAC",
+                f"--output-dir={self.directory.name}",
+                path,
+            ],
+            capture_output=True,
+            check=False,
+            text=True,
+            timeout=120,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            # empty result cache, so conversion runs in worker
+            env={**os.environ, "HOME": self.directory.name},
+        )
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertTrue(os.path.exists(f"{path}.png"))
+        self.assertNotIn("Traceback", process.stderr)
+
+    def test_collect_files(self):
+        """test directories expand to input files"""
+        self.assertEqual(
+            collect_files([self.inputs, os.path.join(self.inputs, "x.txt")]),
+            [
+                (os.path.join(self.inputs, "x.txt"), "x.txt"),
+                (
+                    os.path.join(self.inputs, "nested", "cx.txt"),
+                    os.path.join("nested", "cx.txt"),
+                ),
+                (os.path.join(self.inputs, "x.txt"), "x.txt"),
+            ],
+        )
+
+    def test_make_input(self):
+        """test number of qubits is inferred from matrix"""
+        args = parse_args(["--from", "matrix", "--to", "circuit", "x.txt"])
+        matrix_input = make_input(args, "[[1,0,0,0],[0,1,0,0],[0,0,1,0],[0,0,0,1]]")
+        self.assertIsInstance(matrix_input, MatrixInput)
+        self.assertEqual(matrix_input.num_qubits, 2)
+        with self.assertRaises(ValueError):
+            make_input(args, "np.eye(4)")
+        args = parse_args(["--from", "circuit", "--to", "dirac", "qc.py"])
+        self.assertIsInstance(make_input(args, ""), QuantumCircuitInput)
+
+    def test_parse_args_invalid(self):
+        """test unsupported conversions are rejected"""
+        with mock.patch("sys.stderr"):
+            with self.assertRaises(SystemExit):
+                parse_args(["--from", "matrix", "--to", "dirac", "x.txt"])
+            with self.assertRaises(SystemExit):
+                parse_args(["--from", "matrix", "--to", "circuit", "--format", "tex"])
+
+    def test_main(self):
+        """test outputs and summary are written"""
+        output_dir = os.path.join(self.directory.name, "outputs")
+        summary_path = os.path.join(self.directory.name, "summary.json")
+
+        async def fake_convert(_, job, shows_result, image_format):
+            self.assertFalse(shows_result)
+            if job.input_data.num_qubits == 2:
+                raise SyntaxError
+            return f"<{image_format}/>".encode()
+
+        with mock.patch(
+            "qiskit_classroom.cli.ConverterModel.convert",
+            autospec=True,
+            side_effect=fake_convert,
+        ), mock.patch("sys.stderr"):
+            code = main(
+                [
+                    "--from=MATRIX",
+                    "--to=MATRIX",
+                    "--format=svg",
+                    f"--output-dir={output_dir}",
+                    f"--summary={summary_path}",
+                    "--jobs=2",
+                    self.inputs,
+                ]
+            )
+        self.assertEqual(code, 1)
+        with open(summary_path, "r", encoding="UTF-8") as file:
+            summary = json.load(file)
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["files"][0]["output"], f"{output_dir}/x.txt.svg")
+        with open(f"{output_dir}/x.txt.svg", "rb") as file:
+            self.assertEqual(file.read(), b"<svg/>")
+        self.assertEqual(summary["files"][1]["status"], "error")
+
+    def test_main_same_names(self):
+        """test inputs of same name never overwrite each other"""
+        output_dir = os.path.join(self.directory.name, "outputs")
+        summary_path = os.path.join(self.directory.name, "summary.json")
+        other = os.path.join(self.directory.name, "other")
+        os.makedirs(other)
+        for name in ("x.txt", "x.py"):
+            with open(os.path.join(other, name), "w", encoding="UTF-8") as file:
+                file.write("[[1, 0], [0, 1]]")
+
+        async def fake_convert(_, job, *__):
+            return job.expression_text.encode()
+
+        with mock.patch(
+            "qiskit_classroom.cli.ConverterModel.convert",
+            autospec=True,
+            side_effect=fake_convert,
+        ), mock.patch("sys.stderr"):
+            code = main(
+                [
+                    "--from=MATRIX",
+                    "--to=CIRCUIT",
+                    f"--output-dir={output_dir}",
+                    f"--summary={summary_path}",
+                    self.inputs,
+                    other,
+                ]
+            )
+        self.assertEqual(code, 1)
+        self.assertEqual(
+            sorted(
+                os.path.relpath(os.path.join(root, name), output_dir)
+                for root, _, names in os.walk(output_dir)
+                for name in names
+            ),
+            [os.path.join("nested", "cx.txt.png"), "x.py.png", "x.txt.png"],
+        )
+        # first x.txt is kept
+        with open(os.path.join(output_dir, "x.txt.png"), "rb") as file:
+            self.assertEqual(file.read(), b"[[0, 1], [1, 0]]")
+        with open(summary_path, "r", encoding="UTF-8") as file:
+            summary = json.load(file)
+        self.assertEqual(
+            [record["status"] for record in summary["files"]],
+            ["ok", "ok", "ok", "error"],
+        )
+        self.assertIn("also written by", summary["files"][3]["error"])
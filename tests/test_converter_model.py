@@ -17,9 +17,19 @@
 #  specific language governing permissions and limitations
 #  under the License.
 
+import asyncio
+import tempfile
 import unittest
-from qiskit_classroom.converter_model import ConverterModel, ConvertingRuleException
+from unittest import mock
+from qiskit_classroom.circuit_pages import DEFAULT_PAGE_LAYERS, CircuitPage
+from qiskit_classroom.converter_model import (
+    ConversionJob,
+    ConverterModel,
+    ConvertingRuleException,
+)
 from qiskit_classroom.expression_enum import QuantumExpression
+from qiskit_classroom.input_model import MatrixInput
+from qiskit_classroom.result_cache import ResultCache
 
 
 class TestConverterModel(unittest.TestCase):
@@ -41,8 +51,153 @@ class TestConverterModel(unittest.TestCase):
         with self.assertRaises(ConvertingRuleException):
             self.model.to_expression = QuantumExpression.DIRAC
 
-    def test_set_img_path(self) -> None:
-        """test setter image_path"""
-        self.model.result_img_path = "random_file.py.png"
+    def test_set_result_image(self) -> None:
+        """test setter result_image"""
+        self.model.result_image = b"image"
 
-        self.assertEqual(self.model.result_img_path, "random_file.py.png")
+        self.assertEqual(self.model.result_image, b"image")
+        self.model.clear_result_image()
+        self.assertIsNone(self.model.result_image)
+
+    def test_image_format(self) -> None:
+        """test result image is svg unless another shown format is chosen"""
+        self.assertEqual(self.model.image_format, "svg")
+        self.assertEqual(ConverterModel(image_format="png").image_format, "png")
+        with self.assertRaises(ValueError):
+            ConverterModel(image_format="tex")
+
+
+class TestConverterModelCache(unittest.IsolatedAsyncioTestCase):
+    """unittest class for result cache of ConverterModel"""
+
+    def setUp(self) -> None:
+        # pylint: disable=consider-using-with
+        self.directory = tempfile.TemporaryDirectory()
+        self.model = ConverterModel(result_cache=ResultCache(self.directory.name))
+        self.model.from_expression = QuantumExpression.MATRIX
+        self.model.to_expression = QuantumExpression.CIRCUIT
+        self.model.expression_text = "[[0, 1], [1, 0]]"
+        self.model.input_data = MatrixInput(1, False)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_result_cache_key(self):
+        """test key ignores random value_name of MatrixInput"""
+        key = self.model.result_cache_key(False)
+        self.model.input_data = MatrixInput(1, False)
+        self.assertEqual(self.model.result_cache_key(False), key)
+        self.assertNotEqual(self.model.result_cache_key(True), key)
+        self.model.input_data = MatrixInput(1, True)
+        self.assertNotEqual(self.model.result_cache_key(False), key)
+
+    async def test_convert_and_draw_cached(self):
+        """test second conversion is served from cache"""
+        with mock.patch(
+            "qiskit_classroom.converter_model.ConverterWorker.run",
+            mock.AsyncMock(return_value=b"image"),
+        ) as run:
+            self.assertTrue(await self.model.convert_and_draw(False))
+            self.model.clear_result_image()
+            self.assertTrue(await self.model.convert_and_draw(False))
+            run.assert_awaited_once()
+        self.assertEqual(self.model.result_image, b"image")
+
+    async def test_draw_pages(self):
+        """test pages stream to callback and drawn pages are cached"""
+        self.model.to_expression = QuantumExpression.CIRCUIT
+        self.model.direct_engine.split_pages = mock.AsyncMock(
+            return_value=[("first", b"page 0"), ("second", b"page 1")]
+        )
+
+        async def fake_draw_page(page, image_format):
+            # first page is slow, second page arrives first
+            await asyncio.sleep(0.02 if page == b"page 0" else 0)
+            return page + b" " + image_format.encode()
+
+        self.model.direct_engine.draw_page = mock.AsyncMock(side_effect=fake_draw_page)
+        pages = []
+        with mock.patch(
+            "qiskit_classroom.converter_model.ConverterWorker.run",
+            mock.AsyncMock(return_value=b"circuit"),
+        ):
+            self.assertTrue(
+                await self.model.convert_and_draw(False, on_page=pages.append)
+            )
+            self.assertIsNone(self.model.result_image)
+            self.assertEqual(
+                pages,
+                [
+                    CircuitPage(1, 2, b"page 1 svg"),
+                    CircuitPage(0, 2, b"page 0 svg"),
+                ],
+            )
+            self.model.direct_engine.split_pages.assert_awaited_once_with(
+                b"circuit", DEFAULT_PAGE_LAYERS, "svg"
+            )
+            await self.model.convert_and_draw(False, on_page=pages.append)
+        self.assertEqual(self.model.direct_engine.draw_page.await_count, 2)
+        self.assertEqual(len(pages), 4)
+
+    async def test_warm_up(self):
+        """test warm up starts everything and bypasses result cache"""
+        self.model.executor = mock.Mock(start=mock.AsyncMock())
+        self.model.renderer.warm_up = mock.AsyncMock()
+        with mock.patch(
+            "qiskit_classroom.converter_model.ConverterWorker.run",
+            mock.AsyncMock(return_value=b"image"),
+        ) as run:
+            await self.model.warm_up()
+            await self.model.warm_up()
+        self.assertEqual(run.await_count, 2)
+        self.model.executor.start.assert_awaited()
+        self.model.renderer.warm_up.assert_awaited_with("svg")
+
+
+class TestConverterModelBatch(unittest.IsolatedAsyncioTestCase):
+    """unittest class for ConverterModel.convert_many"""
+
+    def setUp(self) -> None:
+        # pylint: disable=consider-using-with
+        self.directory = tempfile.TemporaryDirectory()
+        self.model = ConverterModel(result_cache=ResultCache(self.directory.name))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    async def test_convert_many(self):
+        """test results stream in completion order with bounded concurrency"""
+        running = []
+        peak = []
+
+        async def fake_run(worker):
+            running.append(worker)
+            peak.append(len(running))
+            # second job finishes first, third job starts after it
+            await asyncio.sleep({"0": 0.03, "1": 0.01, "2": 0.05}[worker.expression_text])
+            running.remove(worker)
+            if worker.expression_text == "1":
+                raise SyntaxError
+            return None
+
+        jobs = [
+            ConversionJob(
+                QuantumExpression.MATRIX,
+                QuantumExpression.MATRIX,
+                MatrixInput(1, False),
+                str(index),
+            )
+            for index in range(3)
+        ]
+        with mock.patch(
+            "qiskit_classroom.converter_model.ConverterWorker.run",
+            autospec=True,
+            side_effect=fake_run,
+        ):
+            results = [
+                result async for result in self.model.convert_many(jobs, concurrency=2)
+            ]
+        self.assertEqual([result.index for result in results], [1, 0, 2])
+        self.assertIsInstance(results[0].error, SyntaxError)
+        self.assertIsNone(results[1].error)
+        self.assertLessEqual(max(peak), 2)
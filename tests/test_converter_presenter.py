@@ -19,10 +19,12 @@
 
 import unittest
 from unittest import mock
+from qiskit_classroom.circuit_pages import CircuitPage
 from qiskit_classroom.converter_model import ConverterModel
 from qiskit_classroom.converter_presenter import ConverterPresenter
 from qiskit_classroom.converter_view import ConverterView
 from qiskit_classroom.expression_enum import QuantumExpression
+from qiskit_classroom.scheduler import JobSuperseded
 
 
 PATH = ["not_python_script.txt", "ramdom_file.py"]
@@ -90,3 +92,39 @@ class ConverterPresenterTest(unittest.IsolatedAsyncioTestCase):
         self.presenter.on_to_combo_changed()
 
         self.assertEqual(self.model.to_expression, QuantumExpression.CIRCUIT)
+
+    async def test_on_convert_button_clicked_shows_result(self) -> None:
+        """test result dialog opens as soon as conversion returns"""
+        self.view.get_expression_plain_text_text = mock.Mock(return_value="")
+        self.model.convert_and_draw = mock.AsyncMock(return_value=True)
+        self.model.result_image = b"image"
+        with mock.patch("asyncio.sleep") as sleep:
+            await self.presenter.on_convert_button_clicked()
+        sleep.assert_not_called()
+        self.view.close_progress_bar.assert_called_once()
+        self.view.show_result_image.assert_called_once_with(b"image", "svg")
+
+    async def test_on_convert_button_clicked_superseded(self) -> None:
+        """test superseded conversion leaves progress bar and result to newer one"""
+        self.view.get_expression_plain_text_text = mock.Mock(return_value="")
+        self.model.convert_and_draw = mock.AsyncMock(side_effect=JobSuperseded())
+        await self.presenter.on_convert_button_clicked()
+        self.view.show_progress_bar.assert_called_once()
+        self.view.close_progress_bar.assert_not_called()
+        self.view.show_result_image.assert_not_called()
+
+    async def test_on_convert_button_clicked_shows_pages(self) -> None:
+        """test circuit pages are passed to view as they are drawn"""
+        page = CircuitPage(0, 2, b"page")
+
+        async def fake_convert_and_draw(shows_result, on_progress, on_page):
+            del shows_result, on_progress
+            on_page(page)
+            return True
+
+        self.view.get_expression_plain_text_text = mock.Mock(return_value="")
+        self.model.convert_and_draw = mock.AsyncMock(side_effect=fake_convert_and_draw)
+        await self.presenter.on_convert_button_clicked()
+        self.view.reset_result_pages.assert_called_once()
+        self.view.show_result_page.assert_called_once_with(page, "svg")
+        self.view.show_result_image.assert_not_called()
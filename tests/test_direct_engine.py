@@ -0,0 +1,147 @@
+"""test direct_engine.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+from qiskit_classroom.direct_engine import (
+    DirectConversionEngine,
+    format_gate_matrices,
+    is_structured,
+    parse_matrix_literal,
+)
+from qiskit_classroom.expression_enum import QuantumExpression
+from qiskit_classroom.limits import ConversionTimeout, ResourceLimits
+from qiskit_classroom.scheduler import JobSuperseded, LatestJobScheduler
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+x q[0];
+cx q[0],q[1];"""
+
+
+class DirectEngineTest(unittest.TestCase):
+    """test structured input detection and formatting"""
+
+    def test_parse_matrix_literal(self):
+        """test only plain literal matrices are parsed"""
+        self.assertEqual(parse_matrix_literal("[[1, 0], [0, 1j]]"), [[1, 0], [0, 1j]])
+        self.assertIsNone(parse_matrix_literal("[[1, 0], [0, np.sqrt(2)]]"))
+        self.assertIsNone(parse_matrix_literal("[1, 0]"))
+        self.assertIsNone(parse_matrix_literal("[]"))
+        self.assertIsNone(parse_matrix_literal("[[1, 0],"))
+
+    def test_is_structured(self):
+        """test conversion selection"""
+        self.assertTrue(
+            is_structured(QuantumExpression.MATRIX, QuantumExpression.MATRIX, "[[1]]")
+        )
+        self.assertFalse(
+            is_structured(
+                QuantumExpression.MATRIX, QuantumExpression.CIRCUIT, "value = [[1]]"
+            )
+        )
+        self.assertTrue(
+            is_structured(QuantumExpression.CIRCUIT, QuantumExpression.DIRAC, QASM)
+        )
+        self.assertFalse(
+            is_structured(
+                QuantumExpression.CIRCUIT,
+                QuantumExpression.DIRAC,
+                "from qiskit import QuantumCircuit",
+            )
+        )
+        self.assertFalse(
+            is_structured(QuantumExpression.MATRIX, QuantumExpression.NONE, "[[1]]")
+        )
+
+    def test_format_gate_matrices(self):
+        """test format is same as generated visualization code"""
+        result = {
+            "gate": ["A", "B"],
+            "name": [(0, ["X_{q0}"]), (1, ["CX_{q0, q1}", "I_{q2}"])],
+            "result": "C",
+        }
+        with mock.patch(
+            "qiskit_classroom.direct_engine.matrix_to_latex",
+            side_effect=lambda matrix, max_size: matrix,
+        ) as matrix_to_latex:
+            self.assertEqual(
+                format_gate_matrices(result, False),
+                "\\stackrel{CX_{q0, q1} \\otimes I_{q2}}{B}\n\\stackrel{X_{q0}}{A}",
+            )
+            self.assertTrue(
+                format_gate_matrices(result, True, 4).endswith(
+                    "= \\stackrel{result}{C}"
+                )
+            )
+            matrix_to_latex.assert_called_with("C", 4)
+
+
+class DirectConversionEngineTest(unittest.IsolatedAsyncioTestCase):
+    """test engine processes"""
+
+    async def start_engine(
+        self, max_workers: int, limits: ResourceLimits = None
+    ) -> DirectConversionEngine:
+        """start engine processes before timing jobs"""
+        engine = DirectConversionEngine(max_workers, limits)
+        # sleeping jobs need no preloaded qiskit
+        engine.initializer = None
+        self.addAsyncCleanup(engine.shutdown)
+        await engine.start()
+        return engine
+
+    async def test_superseded_job_process_killed(self):
+        """test process of superseded job is killed and replaced"""
+        engine = await self.start_engine(1)
+        scheduler = LatestJobScheduler(debounce=0)
+        (process,) = engine.processes
+        superseded = asyncio.ensure_future(
+            scheduler.submit(lambda: engine.run(time.sleep, 60))
+        )
+        await asyncio.sleep(0.1)
+        self.assertEqual(await scheduler.submit(lambda: engine.run(abs, -1)), 1)
+        with self.assertRaises(JobSuperseded):
+            await superseded
+        process.join(5)
+        self.assertFalse(process.is_alive())
+        self.assertNotIn(process, engine.processes)
+
+    async def test_timeout_keeps_other_jobs(self):
+        """test timed out job kills only its process"""
+        engine = await self.start_engine(2, ResourceLimits(2, None, None))
+        timed_out = asyncio.ensure_future(engine.run(time.sleep, 60))
+        await asyncio.sleep(1)
+        # still running when first job times out
+        running = asyncio.ensure_future(engine.run(time.sleep, 1.5))
+        with self.assertRaises(ConversionTimeout):
+            await timed_out
+        self.assertIsNone(await running)
+        self.assertEqual(len(engine.processes), 2)
+
+    async def test_shutdown(self):
+        """test shutdown waits until processes exit"""
+        engine = await self.start_engine(2)
+        processes = engine.processes
+        await engine.shutdown()
+        self.assertEqual(engine.processes, [])
+        self.assertFalse(any(process.is_alive() for process in processes))
@@ -0,0 +1,77 @@
+"""test figure_pool.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import io
+import threading
+import unittest
+import matplotlib.image
+from qiskit_classroom.figure_pool import FigurePool
+from qiskit_classroom.renderer import MATHTEXT_RC
+
+LATEX = "\\frac{1}{\\sqrt{2}}|0\\rangle + |1\\rangle"
+
+
+class FigurePoolTest(unittest.TestCase):
+    """test figure pool"""
+
+    def test_figure_reused(self):
+        """test idle figure is lent again"""
+        pool = FigurePool()
+        with pool.figure() as first:
+            pass
+        with pool.figure() as second:
+            self.assertEqual(len(pool), 0)
+        self.assertIs(first, second)
+        self.assertEqual(len(pool), 1)
+
+    def test_max_idle(self):
+        """test idle figures beyond max_idle are dropped"""
+        pool = FigurePool(1)
+        with pool.figure(), pool.figure():
+            pass
+        self.assertEqual(len(pool), 1)
+
+    def test_render_sized_to_text(self):
+        """test image grows with equation and is stable across renders"""
+        pool = FigurePool()
+        short = pool.render("A", "png", MATHTEXT_RC)
+        long = pool.render(LATEX, "png", MATHTEXT_RC)
+        short_height, short_width = matplotlib.image.imread(io.BytesIO(short)).shape[:2]
+        long_height, long_width = matplotlib.image.imread(io.BytesIO(long)).shape[:2]
+        self.assertGreater(long_width, short_width)
+        self.assertGreater(long_height, short_height)
+        self.assertEqual(pool.render("A", "png", MATHTEXT_RC), short)
+        self.assertTrue(pool.render("A", "svg", MATHTEXT_RC).startswith(b"<?xml"))
+
+    def test_render_threads(self):
+        """test renders from several threads give same images"""
+        pool = FigurePool()
+        expected = pool.render(LATEX, "png", MATHTEXT_RC)
+        results = []
+
+        def render():
+            for _ in range(5):
+                results.append(pool.render(LATEX, "png", MATHTEXT_RC))
+
+        threads = [threading.Thread(target=render) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [expected] * 20)
@@ -0,0 +1,40 @@
+"""test latex_analyzer.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import unittest
+from qiskit_classroom.latex_analyzer import is_mathtext
+
+
+class LatexAnalyzerTest(unittest.TestCase):
+    """test mathtext detection"""
+
+    def test_mathtext(self):
+        """test dirac states and plain formulas use mathtext"""
+        half = "\\frac{\\sqrt{2}}{2}"
+        self.assertTrue(is_mathtext(f"{half} |00\\rangle + {half} |11\\rangle"))
+        self.assertTrue(is_mathtext("X \\otimes I"))
+
+    def test_tex(self):
+        """test amsmath matrices, stackrel and unknown commands need TeX"""
+        self.assertFalse(
+            is_mathtext("\\begin{bmatrix} 1 & 0 \\\\ 0 & 1 \\end{bmatrix}")
+        )
+        self.assertFalse(is_mathtext("\\stackrel{X_{q0}}{A}"))
+        self.assertFalse(is_mathtext("\\unknowncommand"))
+        self.assertFalse(is_mathtext(" "))
@@ -0,0 +1,51 @@
+"""test limits.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import unittest
+from qiskit_classroom.limits import (
+    ConversionLimitExceeded,
+    ConversionMemoryExceeded,
+    ConversionTimeout,
+    ResourceLimits,
+)
+
+
+class ResourceLimitsTest(unittest.TestCase):
+    """test resource limits"""
+
+    def test_error_of(self):
+        """test breached limit maps to typed error"""
+        limits = ResourceLimits(wall_time=5, cpu_time=3, memory=512 * 1024 * 1024)
+        self.assertIsInstance(limits.error_of("wall_time"), ConversionTimeout)
+        self.assertIsInstance(limits.error_of("cpu_time"), ConversionTimeout)
+        memory_error = limits.error_of("memory")
+        self.assertIsInstance(memory_error, ConversionMemoryExceeded)
+        self.assertIsInstance(memory_error, RuntimeError)
+        self.assertIn("512 MB", str(memory_error))
+        self.assertIn("3 s", str(limits.error_of("cpu_time")))
+
+    def test_to_message(self):
+        """test only in-process limits are sent to worker"""
+        limits = ResourceLimits(wall_time=5, cpu_time=None, memory=1024)
+        self.assertEqual(limits.to_message(), {"cpu_time": None, "memory": 1024})
+        self.assertTrue(issubclass(ConversionTimeout, ConversionLimitExceeded))
+
+
+if __name__ == "__main__":
+    unittest.main()
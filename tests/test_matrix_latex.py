@@ -0,0 +1,124 @@
+"""test matrix_latex.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import unittest
+import numpy as np
+from qiskit_classroom.matrix_latex import (
+    elided_matrix,
+    format_entry,
+    kept_indices,
+    matrix_to_latex,
+)
+from qiskit_classroom.renderer import LATEX_RC
+from qiskit_classroom.tex_daemon import MAX_MATRIX_COLUMNS, PREAMBLE
+
+
+def column_count(latex: str) -> int:
+    """return number of columns of widest matrix row
+
+    Args:
+        latex (str): latex matrix
+
+    Returns:
+        int: columns
+    """
+    return max(row.count("&") + 1 for row in latex.split("\\\\") if "&" in row)
+
+
+class MatrixLatexTest(unittest.TestCase):
+    """test size-aware matrix latex"""
+
+    def test_format_entry(self):
+        """test complex entries"""
+        self.assertEqual(format_entry(0.5, 0.0), "0.5")
+        self.assertEqual(format_entry(0.0, -1.0), "-i")
+        self.assertEqual(format_entry(1.0, 0.25), "1 + 0.25i")
+        self.assertEqual(format_entry(-0.70711, -1.0), "-0.70711 - i")
+
+    def test_kept_indices(self):
+        """test head, dots and tail fill max_size"""
+        indices, dots = kept_indices(4, 5)
+        self.assertEqual(indices.tolist(), [0, 1, 2, 3])
+        self.assertEqual(dots, -1)
+        indices, dots = kept_indices(100, 5)
+        self.assertEqual(indices.tolist(), [0, 1, 98, 99])
+        self.assertEqual(dots, 2)
+
+    def test_small_matrix(self):
+        """test small matrix is written in full"""
+        latex = matrix_to_latex(np.eye(4), 4)
+        self.assertEqual(latex.count("1"), 4)
+        self.assertNotIn("cdots", latex)
+        self.assertNotIn("underset", latex)
+
+    def test_numeric_matrix(self):
+        """test matrix larger than MAX_EXACT_SIZE is written in full without
+        sympy"""
+        rng = np.random.default_rng(0)
+        matrix = rng.normal(size=(16, 16)) + 1j * rng.normal(size=(16, 16))
+        matrix[0, 0] = np.sqrt(0.5)
+        latex = matrix_to_latex(matrix, 16)
+        self.assertEqual(column_count(latex), 16)
+        self.assertEqual(latex.count("\\\\"), 16)
+        self.assertIn("0.70711", latex)
+        self.assertNotIn("frac", latex)
+        self.assertNotIn("cdots", latex)
+
+    def test_scalar(self):
+        """test scalar is written as one entry"""
+        self.assertIn("\\frac{1}{2}", matrix_to_latex(np.float64(0.5)))
+        self.assertIn("i", matrix_to_latex(1j))
+
+    def test_sparse_matrix(self):
+        """test sparse matrix is written as table of non-zero entries"""
+        matrix = np.zeros((64, 64), dtype=complex)
+        matrix[0, 3] = 0.5
+        matrix[63, 1] = -1j
+        latex = matrix_to_latex(matrix, 4)
+        self.assertIn("64 \\times 64,\\ 2 \\neq 0", latex)
+        self.assertIn("(0, 3) & 0.5 \\\\", latex)
+        self.assertIn("(63, 1) & -i \\\\", latex)
+
+    def test_dense_matrix(self):
+        """test dense matrix is elided and latex length does not grow"""
+        small = matrix_to_latex(np.ones((64, 64)), 5)
+        large = matrix_to_latex(np.ones((1024, 1024)), 5)
+        self.assertIn("\\ddots", large)
+        self.assertEqual(large.replace("1024", "64").replace("1048576", "4096"), small)
+        self.assertEqual(large.count("\\\\"), 5)
+
+    def test_elided_vector(self):
+        """test vector is elided as one row"""
+        latex = elided_matrix(np.arange(10), 5)
+        self.assertEqual(
+            latex,
+            "\\begin{bmatrix}\n0 & 1 & \\cdots & 8 & 9 \\\\\n\\end{bmatrix}",
+        )
+
+    def test_columns_fit_preamble(self):
+        """test emitted matrices are not wider than MaxMatrixCols"""
+        setting = f"\\setcounter{{MaxMatrixCols}}{{{MAX_MATRIX_COLUMNS}}}"
+        self.assertIn(setting, PREAMBLE)
+        self.assertIn(setting, LATEX_RC["text.latex.preamble"])
+        rng = np.random.default_rng(0)
+        for size, max_size in ((16, 16), (32, 16), (64, 16), (128, 1000)):
+            matrix = rng.integers(1, 9, (size, size))
+            columns = column_count(matrix_to_latex(matrix, max_size))
+            self.assertEqual(columns, min(size, max_size, MAX_MATRIX_COLUMNS))
+            self.assertLessEqual(columns, MAX_MATRIX_COLUMNS)
@@ -0,0 +1,44 @@
+"""test progress.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import unittest
+from qiskit_classroom.progress import OutputCollector, Progress, parse_progress
+
+
+class ProgressTest(unittest.TestCase):
+    """test progress parsing"""
+
+    def test_parse_progress(self):
+        """test marker line is parsed"""
+        self.assertEqual(parse_progress("%progress gate 3 10"), Progress("gate", 3, 10))
+        self.assertIsNone(parse_progress("\\stackrel{H}{x}"))
+        self.assertIsNone(parse_progress("%progress broken"))
+
+    def test_output_collector(self):
+        """test progress is reported and other lines are kept in order"""
+        events = []
+        collector = OutputCollector(events.append)
+        for line in ["%progress converting 0 0", "first", "%progress gate 1 1", "last"]:
+            collector.feed(line)
+        self.assertEqual(collector.output, "first\nlast\n")
+        self.assertEqual(events, [Progress("converting"), Progress("gate", 1, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""test protocol.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import io
+import unittest
+from unittest import mock
+from qiskit_classroom.limits import ConversionMemoryExceeded, ResourceLimits
+from qiskit_classroom.protocol import (
+    Channel,
+    ConversionError,
+    Frame,
+    FrameDecoder,
+    ProtocolError,
+    encode_frame,
+    read_frame,
+    read_frame_async,
+    unpack_result,
+)
+
+RESULT = {
+    "type": "result",
+    "id": 1,
+    "stdout": "latex",
+    "stderr": "",
+    "error": None,
+    "timings": {"execute": 0.5},
+    "memory": 0,
+    "limit": None,
+}
+
+
+class FrameTest(unittest.TestCase):
+    """test frame encoding"""
+
+    def test_read_frame(self):
+        """test frames with payload are read back in order"""
+        stream = io.BytesIO(
+            encode_frame({"type": "ready"}) + encode_frame(RESULT, b"\x89PNG\x00")
+        )
+        self.assertEqual(read_frame(stream), Frame({"type": "ready"}))
+        self.assertEqual(read_frame(stream), Frame(RESULT, b"\x89PNG\x00"))
+        self.assertIsNone(read_frame(stream))
+
+    def test_read_truncated_frame(self):
+        """test stream ending inside frame is protocol error"""
+        with self.assertRaises(ProtocolError):
+            read_frame(io.BytesIO(encode_frame(RESULT)[:-1]))
+
+    def test_frame_decoder(self):
+        """test frames split across chunks are decoded once complete"""
+        data = encode_frame({"type": "line", "id": 1, "line": "a"}) + encode_frame(
+            RESULT, b"payload"
+        )
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(data[:5]), [])
+        frames = decoder.feed(data[5:-1]) + decoder.feed(data[-1:])
+        self.assertEqual([frame.header["type"] for frame in frames], ["line", "result"])
+        self.assertEqual(frames[1].payload, b"payload")
+
+    def test_unpack_result(self):
+        """test result header becomes result or typed error"""
+        limits = ResourceLimits()
+        result = unpack_result(Frame(RESULT, b"image"), limits)
+        self.assertEqual(result.stdout, "latex")
+        self.assertEqual(result.timings, {"execute": 0.5})
+        self.assertEqual(result.payload, b"image")
+        with self.assertRaises(ConversionMemoryExceeded):
+            unpack_result(Frame({**RESULT, "limit": "memory"}), limits)
+        for error_type, exception in [
+            ("SyntaxError", SyntaxError),
+            ("NameError", NameError),
+            ("ValueError", ConversionError),
+        ]:
+            error = {"type": error_type, "message": "bad", "traceback": "trace"}
+            with self.assertRaises(exception):
+                unpack_result(Frame({**RESULT, "error": error}), limits)
+
+
+class ChannelTest(unittest.IsolatedAsyncioTestCase):
+    """test job multiplexing"""
+
+    async def test_read_frame_async(self):
+        """test end of stream between frames is not error"""
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame(RESULT))
+        reader.feed_eof()
+        self.assertEqual((await read_frame_async(reader)).header, RESULT)
+        self.assertIsNone(await read_frame_async(reader))
+
+    async def test_multiplex(self):
+        """test results arriving out of order reach their jobs"""
+        reader = asyncio.StreamReader()
+        writer = mock.Mock(drain=mock.AsyncMock())
+        channel = Channel(reader, writer)
+        lines = []
+        first = asyncio.ensure_future(
+            channel.request({"type": "job", "id": 1}, on_line=lines.append)
+        )
+        second = asyncio.ensure_future(channel.request({"type": "job", "id": 2}))
+        await asyncio.sleep(0)
+        self.assertEqual(writer.write.call_count, 2)
+        reader.feed_data(encode_frame({**RESULT, "id": 2, "stdout": "second"}))
+        reader.feed_data(encode_frame({"type": "line", "id": 1, "line": "partial"}))
+        reader.feed_data(encode_frame({**RESULT, "id": 1}))
+        self.assertEqual((await second).header["stdout"], "second")
+        self.assertEqual((await first).header["stdout"], "latex")
+        self.assertEqual(lines, ["partial"])
+        reader.feed_eof()
+        with self.assertRaises(RuntimeError):
+            await channel.request({"type": "job", "id": 3})
+        channel.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
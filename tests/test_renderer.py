@@ -0,0 +1,142 @@
+"""test renderer.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import unittest
+from unittest import mock
+from qiskit_classroom.limits import ConversionTimeout, ResourceLimits
+from qiskit_classroom.renderer import LatexRenderer, render_equation, render_latex
+from qiskit_classroom.result_cache import LayeredCache
+
+
+class RendererTest(unittest.IsolatedAsyncioTestCase):
+    """test latex renderer"""
+
+    def test_render_latex_tex(self):
+        """test tex format returns latex source without rendering"""
+        self.assertEqual(render_latex("A\n B ", "tex"), b"$A B$\n")
+
+    async def test_render_tex(self):
+        """test tex format needs no render process"""
+        renderer = LatexRenderer(1, cache=LayeredCache())
+        with mock.patch.object(renderer, "create_executor") as create_executor:
+            self.assertEqual(await renderer.render("A", "tex"), b"$A$\n")
+        create_executor.assert_not_called()
+
+    async def test_render_cached(self):
+        """test identical equation is rendered once"""
+        renderer = LatexRenderer(1, cache=LayeredCache())
+        loop = asyncio.get_running_loop()
+        rendered = loop.create_future()
+        with mock.patch.object(
+            loop, "run_in_executor", return_value=rendered
+        ) as run, mock.patch.object(renderer, "create_executor"):
+            first = asyncio.ensure_future(renderer.render("A  B"))
+            second = asyncio.ensure_future(renderer.render("A\nB"))
+            await asyncio.sleep(0)
+            rendered.set_result(b"image")
+            self.assertEqual(await asyncio.gather(first, second), [b"image"] * 2)
+            self.assertEqual(await renderer.render(" A B "), b"image")
+            self.assertEqual(run.call_count, 1)
+            self.assertEqual(run.call_args.args[2:], ("A B", "png", None))
+            run.return_value = loop.create_future()
+            run.return_value.set_result(b"svg")
+            self.assertEqual(await renderer.render("A B", "svg"), b"svg")
+            self.assertEqual(run.call_count, 2)
+
+    async def test_render_cancelled_caller(self):
+        """test cancelled caller does not stop render of other callers"""
+        renderer = LatexRenderer(1, cache=LayeredCache())
+        loop = asyncio.get_running_loop()
+        rendered = loop.create_future()
+        with mock.patch.object(
+            loop, "run_in_executor", return_value=rendered
+        ), mock.patch.object(renderer, "create_executor"):
+            first = asyncio.ensure_future(renderer.render("A"))
+            second = asyncio.ensure_future(renderer.render("A"))
+            await asyncio.sleep(0)
+            first.cancel()
+            rendered.set_result(b"image")
+            self.assertEqual(await second, b"image")
+        self.assertTrue(first.cancelled())
+
+    async def test_render_timeout(self):
+        """test render exceeding wall_time replaces its render process"""
+        renderer = LatexRenderer(
+            2, ResourceLimits(0.01, None, None), cache=LayeredCache()
+        )
+        loop = asyncio.get_running_loop()
+        executors = []
+
+        def create_executor():
+            executors.append(mock.MagicMock())
+            return executors[-1]
+
+        with mock.patch.object(
+            loop, "run_in_executor", return_value=loop.create_future()
+        ), mock.patch.object(renderer, "create_executor", create_executor):
+            with self.assertRaises(ConversionTimeout):
+                await renderer.render("A")
+        self.assertEqual(len(executors), 2)
+        executors[0].shutdown.assert_called_once()
+        executors[1].shutdown.assert_not_called()
+
+    async def test_warm_up(self):
+        """test samples are rendered without cache, TeX only when installed"""
+        cache = mock.Mock()
+        renderer = LatexRenderer(1, cache=cache)
+        loop = asyncio.get_running_loop()
+
+        def rendered(*_):
+            future = loop.create_future()
+            future.set_result(b"image")
+            return future
+
+        with mock.patch.object(
+            loop, "run_in_executor", side_effect=rendered
+        ) as run, mock.patch.object(renderer, "create_executor"), mock.patch(
+            "qiskit_classroom.tex_daemon.TexDaemon.supports", return_value=False
+        ) as supports:
+            await renderer.warm_up("svg")
+            self.assertEqual(run.call_count, 1)
+            supports.return_value = True
+            await renderer.warm_up("svg")
+            self.assertEqual(run.call_count, 3)
+        cache.get.assert_not_called()
+        cache.put.assert_not_called()
+        cache.store.assert_not_called()
+
+    def test_render_equation(self):
+        """test typesetter is chosen by latex and installed TeX tools"""
+        stackrel = "\\stackrel{X}{A}"
+        with mock.patch("qiskit_classroom.renderer.TEX_DAEMON") as daemon, mock.patch(
+            "qiskit_classroom.renderer.render_latex", return_value=b"image"
+        ) as render, mock.patch(
+            "qiskit_classroom.tex_daemon.TexDaemon.supports", return_value=False
+        ) as supports:
+            self.assertEqual(render_equation("\\frac{1}{2}|0\\rangle"), b"image")
+            render.assert_called_once_with(
+                "\\frac{1}{2}|0\\rangle", "png", usetex=False
+            )
+            self.assertEqual(render_equation(stackrel, "svg"), b"image")
+            render.assert_called_with(stackrel, "svg", usetex=True)
+            supports.return_value = True
+            daemon.render_many.return_value = [b"tex image"]
+            self.assertEqual(render_equation(stackrel), b"tex image")
+            daemon.render_many.assert_called_once_with([stackrel], "png", None)
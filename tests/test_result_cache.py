@@ -0,0 +1,138 @@
+"""test result_cache.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import contextlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+from qiskit_classroom.result_cache import (
+    LayeredCache,
+    MemoryCache,
+    ResultCache,
+    make_key,
+)
+
+
+class ResultCacheTest(unittest.TestCase):
+    """test ResultCache"""
+
+    def setUp(self) -> None:
+        # pylint: disable=consider-using-with
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.directory.name, "cache"), 10)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_make_key(self):
+        """test key depends on every field but not on order"""
+        self.assertEqual(make_key(a=1, b="2"), make_key(b="2", a=1))
+        self.assertNotEqual(make_key(a=1, b="2"), make_key(a=1, b="3"))
+
+    def test_get_put(self):
+        """test stored bytes are returned"""
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.put("key", b"value")
+        self.assertEqual(self.cache.get("key"), b"value")
+
+    def test_persistent(self):
+        """test entries survive new cache instance"""
+        self.cache.put("key", b"value")
+        self.assertEqual(ResultCache(self.cache.directory, 10).get("key"), b"value")
+
+    def test_evict_least_recently_used(self):
+        """test least recently used entry is removed over max_size"""
+        self.cache.put("first", b"1234")
+        self.cache.put("second", b"1234")
+        os.utime(self.cache.path_of("first"), ns=(1, 1))
+        os.utime(self.cache.path_of("second"), ns=(2, 2))
+        self.cache.get("first")
+        self.cache.put("third", b"1234")
+        self.assertIsNone(self.cache.get("second"))
+        self.assertEqual(self.cache.get("first"), b"1234")
+        self.assertEqual(self.cache.get("third"), b"1234")
+
+    def test_vanished_entry(self):
+        """test entry removed by other instance during evict is skipped"""
+        self.cache.put("first", b"1234")
+        self.cache.put("second", b"1234")
+        vanished = mock.Mock()
+        vanished.name = "vanished"
+        vanished.is_file.return_value = True
+        vanished.stat.side_effect = FileNotFoundError
+        scandir = os.scandir
+
+        def scandir_with_vanished(path):
+            with scandir(path) as iterator:
+                listed = list(iterator)
+            return contextlib.nullcontext([vanished, *listed])
+
+        with mock.patch("os.scandir", scandir_with_vanished):
+            self.cache.put("third", b"1234")
+        self.assertEqual(self.cache.get("third"), b"1234")
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_store(self):
+        """test store writes entry from worker thread"""
+        asyncio.run(self.cache.store("key", b"value"))
+        self.assertEqual(self.cache.get("key"), b"value")
+
+    def test_too_large(self):
+        """test entry larger than max_size is not stored"""
+        self.cache.put("key", b"01234567890")
+        self.assertIsNone(self.cache.get("key"))
+
+
+class MemoryCacheTest(unittest.TestCase):
+    """test MemoryCache and LayeredCache"""
+
+    def test_evict_least_recently_used(self):
+        """test least recently used entry is dropped over max_size"""
+        cache = MemoryCache(10)
+        cache.put("first", b"1234")
+        cache.put("second", b"1234")
+        cache.get("first")
+        cache.put("third", b"1234")
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("first"), b"1234")
+        self.assertEqual(cache.size, 8)
+        cache.put("first", b"12")
+        self.assertEqual(cache.size, 6)
+        cache.put("large", b"01234567890")
+        self.assertIsNone(cache.get("large"))
+
+    def test_layered(self):
+        """test disk entry is kept in memory after first read"""
+        with tempfile.TemporaryDirectory() as directory:
+            disk = ResultCache(directory, 10)
+            disk.put("key", b"value")
+            cache = LayeredCache(MemoryCache(10), disk)
+            self.assertEqual(cache.get("key"), b"value")
+            disk.clear()
+            self.assertEqual(cache.get("key"), b"value")
+            cache.put("other", b"data")
+            self.assertEqual(disk.get("other"), b"data")
+            asyncio.run(cache.store("stored", b"data"))
+            self.assertEqual(cache.memory.get("stored"), b"data")
+            self.assertEqual(disk.get("stored"), b"data")
+            cache.clear()
+            self.assertIsNone(cache.get("other"))
+        self.assertIsNone(LayeredCache().get("key"))
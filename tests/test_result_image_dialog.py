@@ -0,0 +1,37 @@
+"""test result_image_dialog.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import os
+import unittest
+from qiskit_classroom.result_image_dialog import page_paths
+
+
+class PagePathsTest(unittest.TestCase):
+    """test files of saved pages"""
+
+    def test_single_page(self):
+        """test single page is saved to chosen file"""
+        self.assertEqual(page_paths("circuit.png", 1), ["circuit.png"])
+
+    def test_pages(self):
+        """test every page gets numbered file next to chosen file"""
+        self.assertEqual(
+            page_paths(os.path.join("out", "circuit.svg"), 3),
+            [os.path.join("out", f"circuit-{index}.svg") for index in (1, 2, 3)],
+        )
@@ -0,0 +1,67 @@
+"""test scheduler.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import unittest
+from qiskit_classroom.scheduler import JobSuperseded, LatestJobScheduler
+
+
+class LatestJobSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    """test LatestJobScheduler"""
+
+    async def test_latest_wins(self):
+        """test older running job is cancelled and newest result delivered"""
+        scheduler = LatestJobScheduler(debounce=0)
+        cancelled = asyncio.Event()
+
+        async def slow_job():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "slow"
+
+        async def fast_job():
+            return "fast"
+
+        first = asyncio.ensure_future(scheduler.submit(slow_job))
+        await asyncio.sleep(0.01)
+        self.assertTrue(scheduler.busy)
+        self.assertEqual(await scheduler.submit(fast_job), "fast")
+        with self.assertRaises(JobSuperseded):
+            await first
+        self.assertTrue(cancelled.is_set())
+        self.assertFalse(scheduler.busy)
+
+    async def test_debounce(self):
+        """test job submitted again during debounce never starts"""
+        scheduler = LatestJobScheduler(debounce=0.05)
+        started = []
+
+        async def job():
+            started.append(True)
+            return len(started)
+
+        first = asyncio.ensure_future(scheduler.submit(job))
+        await asyncio.sleep(0)
+        self.assertEqual(await scheduler.submit(job), 1)
+        with self.assertRaises(JobSuperseded):
+            await first
+        self.assertEqual(started, [True])
@@ -0,0 +1,62 @@
+"""test startup time of __main__.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# seconds from first import to shown main window
+STARTUP_BUDGET = float(os.environ.get("QISKIT_CLASSROOM_STARTUP_BUDGET", "2.0"))
+# modules loaded only by first conversion or render
+DEFERRED_MODULES = ("qiskit", "qiskit_class_converter", "matplotlib")
+
+# runs in fresh interpreter, so modules imported by tests do not count
+STARTUP_PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from qasync import QApplication
+from qiskit_classroom.__main__ import create_main_window
+app = QApplication([])
+main_window, model = create_main_window()
+main_window.show()
+app.processEvents()
+elapsed = time.perf_counter() - started
+loaded = [name for name in %r if name in sys.modules]
+asyncio.run(model.shutdown())
+print(json.dumps({"elapsed": elapsed, "loaded": loaded}))
+"""
+
+
+class StartupTest(unittest.TestCase):
+    """measure time to first window in separate process"""
+
+    def test_startup_budget(self):
+        """test main window is shown within budget without heavy imports"""
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE % (DEFERRED_MODULES,)],
+            capture_output=True,
+            check=True,
+            timeout=60,
+            env={**os.environ, "QT_QPA_PLATFORM": "offscreen"},
+        )
+        startup = json.loads(result.stdout.decode().splitlines()[-1])
+        self.assertEqual(startup["loaded"], [])
+        self.assertLess(startup["elapsed"], STARTUP_BUDGET)
@@ -0,0 +1,125 @@
+"""test tex_daemon.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+from qiskit_classroom.tex_daemon import (
+    DEFAULT_TIMEOUT,
+    TexDaemon,
+    TexError,
+    log_error,
+)
+
+
+def fake_run(args, cwd, **_):
+    """write files each tool would write"""
+    pages = 0
+    if args[0] == "latex" and "-ini" not in args:
+        with open(os.path.join(cwd, "equations.tex"), "r", encoding="UTF-8") as file:
+            source = file.read()
+        if "\\undefined" in source:
+            log = b"! Undefined control sequence.\nl.3 \\undefined\n\nmore\n"
+            return subprocess.CompletedProcess(args, 1, log)
+        pages = source.count("\\shipout")
+        with open(os.path.join(cwd, "equations.dvi"), "w", encoding="UTF-8") as file:
+            file.write(str(pages))
+    if args[0] in ("dvipng", "dvisvgm"):
+        with open(os.path.join(cwd, "equations.dvi"), "r", encoding="UTF-8") as file:
+            pages = int(file.read())
+        suffix = "png" if args[0] == "dvipng" else "svg"
+        for page in range(1, pages + 1):
+            with open(os.path.join(cwd, f"page{page}.{suffix}"), "wb") as file:
+                file.write(f"{suffix}{page}".encode())
+    return subprocess.CompletedProcess(args, 0, b"")
+
+
+class TexDaemonTest(unittest.TestCase):
+    """test TexDaemon"""
+
+    def setUp(self):
+        self.daemon = TexDaemon()
+
+    def tearDown(self):
+        self.daemon.close()
+
+    def test_make_document(self):
+        """test every equation is shipped as own page"""
+        document = TexDaemon.make_document(["A\n", "B"])
+        self.assertIn("\\shipout\\hbox{$A$}\n\\shipout\\hbox{$B$}", document)
+        self.assertTrue(document.startswith("\\begin{document}"))
+        self.assertTrue(document.endswith("\\end{document}"))
+
+    def test_supports(self):
+        """test supported formats depend on installed tools"""
+        with mock.patch("shutil.which", return_value="/usr/bin/tool"):
+            self.assertTrue(TexDaemon.supports("png"))
+            self.assertTrue(TexDaemon.supports("svg"))
+            self.assertFalse(TexDaemon.supports("tex"))
+        with mock.patch("shutil.which", return_value=None):
+            self.assertFalse(TexDaemon.supports("png"))
+
+    def test_render_many(self):
+        """test format is compiled once and equations are typeset in one run"""
+        with mock.patch("subprocess.run", side_effect=fake_run) as run:
+            self.assertEqual(self.daemon.render_many(["A", "B"]), [b"png1", b"png2"])
+            self.assertEqual(self.daemon.render_many(["C"], "svg", 5), [b"svg1"])
+        tools = [call.args[0][0] for call in run.call_args_list]
+        self.assertEqual(tools, ["latex", "latex", "dvipng", "latex", "dvisvgm"])
+        timeouts = [call.kwargs["timeout"] for call in run.call_args_list]
+        self.assertEqual(timeouts[:3], [DEFAULT_TIMEOUT] * 3)
+        self.assertTrue(all(0 < timeout <= 5 for timeout in timeouts[3:]))
+        self.assertIn("-ini", run.call_args_list[0].args[0])
+        self.assertTrue(self.daemon.running)
+
+    def test_render_many_error(self):
+        """test latex error is raised with its log"""
+        with mock.patch("subprocess.run", side_effect=fake_run):
+            with self.assertRaises(TexError) as context:
+                self.daemon.render_many(["\\undefined"])
+        self.assertIn("Undefined control sequence", str(context.exception))
+
+    def test_run_timeout(self):
+        """test tool running past deadline is killed"""
+        started = time.monotonic()
+        with self.assertRaises(TexError) as context:
+            self.daemon.run(
+                sys.executable,
+                "-c",
+                "import time; time.sleep(30)",
+                deadline=started + 0.2,
+            )
+        self.assertIn("timed out", str(context.exception))
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_start_error(self):
+        """test failed format compile leaves no working directory"""
+        failed = subprocess.CompletedProcess([], 1, b"! LaTeX Error: missing.sty\n")
+        with mock.patch("subprocess.run", return_value=failed):
+            with self.assertRaises(TexError):
+                self.daemon.start()
+        self.assertFalse(self.daemon.running)
+
+    def test_log_error(self):
+        """test error lines are picked from log"""
+        self.assertEqual(log_error("a\n! bad\nl.1 x\n\nz"), "! bad\nl.1 x\n")
+        self.assertEqual(log_error("a\nb"), "a\nb")
@@ -0,0 +1,123 @@
+"""test tiles.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import unittest
+from qiskit_classroom.tiles import (
+    MAX_ZOOM,
+    MIN_ZOOM,
+    Tile,
+    TileCache,
+    clamp_zoom,
+    visible_tiles,
+)
+
+
+class VisibleTilesTest(unittest.TestCase):
+    """visible_tiles test"""
+
+    def test_visible_tiles(self):
+        """test only tiles overlapping viewport are returned"""
+        tiles = visible_tiles((300, 0, 200, 100), (10000, 10000), 256)
+        self.assertEqual({(tile.column, tile.row) for tile in tiles}, {(1, 0)})
+        tiles = visible_tiles((200, 200, 100, 100), (10000, 10000), 256)
+        self.assertEqual(
+            {(tile.column, tile.row) for tile in tiles},
+            {(0, 0), (1, 0), (0, 1), (1, 1)},
+        )
+
+    def test_clipped_to_content(self):
+        """test edge tiles are cut at content size"""
+        tiles = visible_tiles((0, 0, 1000, 1000), (300, 100), 256)
+        self.assertEqual(
+            sorted(tiles),
+            [Tile(0, 0, 0, 0, 256, 100), Tile(1, 0, 256, 0, 44, 100)],
+        )
+        self.assertEqual(visible_tiles((400, 0, 100, 100), (300, 100), 256), [])
+        self.assertEqual(visible_tiles((0, 0, 100, 100), (0, 0), 256), [])
+
+    def test_center_first(self):
+        """test tile at viewport center is rendered first"""
+        tiles = visible_tiles((0, 0, 768, 768), (10000, 10000), 256)
+        self.assertEqual(len(tiles), 9)
+        self.assertEqual((tiles[0].column, tiles[0].row), (1, 1))
+
+    def test_count_follows_viewport(self):
+        """test number of tiles does not depend on content size"""
+        small = visible_tiles((0, 0, 800, 600), (1000, 1000), 256)
+        huge = visible_tiles((0, 0, 800, 600), (100000, 100000), 256)
+        self.assertEqual(len(small), len(huge))
+
+
+class TileCacheTest(unittest.TestCase):
+    """TileCache test"""
+
+    def test_put_get(self):
+        """test tile is returned"""
+        cache = TileCache(2)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_drop_least_recently_used(self):
+        """test least recently used tile is dropped"""
+        cache = TileCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_drop_by_cost(self):
+        """test tiles are dropped until total cost fits"""
+        cache = TileCache(10)
+        cache.put("a", 1, 4)
+        cache.put("b", 2, 4)
+        cache.put("c", 3, 4)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.cost, 8)
+        cache.put("b", 2, 2)
+        self.assertEqual(cache.cost, 6)
+
+    def test_skip_too_costly(self):
+        """test tile costing more than max_cost is not stored"""
+        cache = TileCache(10)
+        cache.put("a", 1, 4)
+        cache.put("b", 2, 11)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_clear(self):
+        """test every tile is dropped"""
+        cache = TileCache()
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.cost, 0)
+
+
+class ClampZoomTest(unittest.TestCase):
+    """clamp_zoom test"""
+
+    def test_clamp_zoom(self):
+        """test zoom is limited"""
+        self.assertEqual(clamp_zoom(1.5), 1.5)
+        self.assertEqual(clamp_zoom(0), MIN_ZOOM)
+        self.assertEqual(clamp_zoom(100), MAX_ZOOM)
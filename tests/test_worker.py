@@ -22,6 +22,8 @@ from unittest import mock
 from qiskit_classroom.expression_enum import QuantumExpression
 from qiskit_classroom.worker import ConverterWorker
 from qiskit_classroom.input_model import QuantumCircuitInput, MatrixInput
+from qiskit_classroom.progress import Progress
+from qiskit_classroom.protocol import JobResult
 
 VALUE_NAME = "value_name"
 QUANTUM_CIRCUIT_CODE = """from qiskit import QuantumCircuit
@@ -35,16 +37,18 @@ MATRIX_CODE = """[[1, 0, 0, 0],
 [0, 0, 1, 0],
 [0, 1, 0, 0]]"""
 
-RANDOM_FILE_NAME = "random_file_name"
-
 
 QC_TO_MATRIX_EXPECTED = [
     "converter = ConversionService(conversion_type='QC_TO_MATRIX',"
-    + " option={'print': 'raw'})\n"
+    + " option={})\n"
     + f"result = converter.convert(input_value={VALUE_NAME})",
-    "for gate, name in zip(reversed(result['gate']),reversed(result['name'])):\n"
+    "gate_count = len(result['gate'])\n"
+    + "for index, (gate, name) in enumerate("
+    + "zip(reversed(result['gate']),reversed(result['name']))):\n"
     + "\totimes=' \\\\otimes '\n"
-    + "\tprint('\\stackrel{' + otimes.join(name[1]) +'}' + f'{{{gate}}}')\n",
+    + "\tprint('\\\\stackrel{' + otimes.join(name[1]) + '}{' "
+    + "+ matrix_to_latex(gate, 16) + '}')\n"
+    + "\tprint(f'%progress gate {index + 1} {gate_count}')\n",
 ]
 
 MATRIX_TO_QC_EXPECTED = [
@@ -55,7 +59,9 @@ MATRIX_TO_QC_EXPECTED = [
 quantum_circuit = QuantumCircuit(2)
 quantum_circuit.append(result, list(range(result.num_qubits)))
 quantum_circuit.measure_all()""",
-    f"""quantum_circuit.draw(output="mpl").savefig("{RANDOM_FILE_NAME + ".png"}", """
+    """__artifact__ = __import__("io").BytesIO()
+"""
+    + """quantum_circuit.draw(output="mpl").savefig(__artifact__, format="png", """
     + """bbox_inches="tight")""",
 ]
 
@@ -64,11 +70,6 @@ class ConverterWorkerTest(unittest.IsolatedAsyncioTestCase):
     """test converter worker"""
 
     def setUp(self):
-        ConverterWorker.generate_random_file_name = mock.Mock(
-            return_value=RANDOM_FILE_NAME
-        )
-        ConverterWorker.write_converting_code = mock.Mock(return_value=True)
-
         self.quantum_circuit_input = QuantumCircuitInput(VALUE_NAME)
         self.matrix_input = MatrixInput(2, True)
         self.matrix_input.value_name = VALUE_NAME
@@ -156,18 +157,58 @@ class ConverterWorkerTest(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(
             worker.generate_visualization_code(),
-            f'{VALUE_NAME}.draw(output="mpl")'
-            + f'.savefig("{RANDOM_FILE_NAME + ".png"}",'
-            + 'bbox_inches="tight")',
+            '__artifact__ = __import__("io").BytesIO()\n'
+            + f'{VALUE_NAME}.draw(output="mpl")'
+            + '.savefig(__artifact__, format="png", bbox_inches="tight")',
         )
         worker.from_expression = QuantumExpression.MATRIX
         worker.to_expression = QuantumExpression.MATRIX
         worker.input_data: MatrixInput = MatrixInput(2, True)
         self.assertEqual(
             worker.generate_visualization_code(),
-            f"print(array_to_latex({worker.input_data.value_name}, source=True))",
+            f"print(matrix_to_latex({worker.input_data.value_name}, 16))",
         )
 
+    def test_export_circuit(self):
+        """test circuit is exported as qpy for paginated drawing"""
+        worker = ConverterWorker(
+            QuantumExpression.CIRCUIT,
+            QuantumExpression.CIRCUIT,
+            self.quantum_circuit_input,
+            QUANTUM_CIRCUIT_CODE,
+            False,
+            image_format="qpy",
+        )
+        self.assertEqual(
+            worker.generate_visualization_code(),
+            '__artifact__ = __import__("io").BytesIO()\n'
+            + "from qiskit import qpy\n"
+            + f"qpy.dump({VALUE_NAME}, __artifact__)",
+        )
+        with self.assertRaises(ValueError):
+            ConverterWorker(
+                QuantumExpression.CIRCUIT,
+                QuantumExpression.MATRIX,
+                self.quantum_circuit_input,
+                QUANTUM_CIRCUIT_CODE,
+                False,
+                image_format="qpy",
+            )
+
+    def test_max_matrix_size(self):
+        """test generated code summarizes matrices larger than max_matrix_size"""
+        worker = ConverterWorker(
+            QuantumExpression.CIRCUIT,
+            QuantumExpression.MATRIX,
+            self.quantum_circuit_input,
+            QUANTUM_CIRCUIT_CODE,
+            True,
+            max_matrix_size=4,
+        )
+        code = worker.generate_visualization_code()
+        self.assertIn("matrix_to_latex(gate, 4)", code)
+        self.assertIn("matrix_to_latex(result['result'], 4)", code)
+
     async def test_run_quantum_circuit_to_matrix(self):
         """test run method"""
 
@@ -178,14 +219,12 @@ class ConverterWorkerTest(unittest.IsolatedAsyncioTestCase):
             QUANTUM_CIRCUIT_CODE,
             False,
         )
-        worker.run_subprocess = mock.AsyncMock(return_value=(" ", " "))
-        worker.cleanup = mock.Mock(return_value=True)
-        worker.draw_latex = mock.Mock(return_value="")
+        worker.run_subprocess = mock.AsyncMock(return_value=JobResult(" ", " ", {}))
+        worker.draw_latex = mock.AsyncMock(return_value="")
         run_result = await worker.run()
         self.assertEqual(run_result, "")
-        worker.cleanup.assert_called_once()
         worker.run_subprocess.assert_awaited_once()
-        worker.draw_latex.assert_called_once()
+        worker.draw_latex.assert_awaited_once()
 
     async def test_run_matrix_to_quantum_circuit(self):
         """test run matrix to quantum circuit"""
@@ -196,9 +235,86 @@ class ConverterWorkerTest(unittest.IsolatedAsyncioTestCase):
             MATRIX_CODE,
             False,
         )
-        worker.run_subprocess = mock.AsyncMock(return_value=(" ", " "))
-        worker.cleanup = mock.Mock(return_value=True)
+        worker.run_subprocess = mock.AsyncMock(
+            return_value=JobResult(" ", " ", {}, b"image", 5)
+        )
         run_result = await worker.run()
-        self.assertEqual(run_result, f"{RANDOM_FILE_NAME}" + ".png")
-        worker.cleanup.assert_called_once()
+        self.assertEqual(run_result, b"image")
         worker.run_subprocess.assert_awaited_once()
+        self.assertTrue(worker.run_subprocess.call_args.kwargs["artifact"])
+
+    async def test_run_streams_progress(self):
+        """test streamed progress markers are reported and removed from result"""
+
+        async def run_subprocess(source, on_line, artifact=False):
+            # latex result is drawn after script, script draws no image
+            self.assertFalse(artifact)
+            self.assertIn("ConversionService", source)
+            for line in ["%progress gate 1 2", "A", "%progress gate 2 2"]:
+                on_line(line)
+            return JobResult("B\n", "", {"execute": 0.25})
+
+        events = []
+        worker = ConverterWorker(
+            QuantumExpression.CIRCUIT,
+            QuantumExpression.MATRIX,
+            self.quantum_circuit_input,
+            QUANTUM_CIRCUIT_CODE,
+            False,
+            on_progress=events.append,
+        )
+        worker.run_subprocess = run_subprocess
+        worker.draw_latex = mock.AsyncMock(return_value=b"image")
+        self.assertEqual(await worker.run(), b"image")
+        worker.draw_latex.assert_awaited_once_with(latex="A\nB\n")
+        self.assertEqual(worker.timings["execute"], 0.25)
+        self.assertIn("drawing", worker.timings)
+        self.assertEqual(
+            events,
+            [Progress("gate", 1, 2), Progress("gate", 2, 2), Progress("drawing")],
+        )
+
+    async def test_run_structured_input(self):
+        """test structured input is converted by engine without script"""
+        engine = mock.Mock()
+        engine.convert = mock.AsyncMock(return_value="latex")
+        worker = ConverterWorker(
+            QuantumExpression.MATRIX,
+            QuantumExpression.MATRIX,
+            self.matrix_input,
+            MATRIX_CODE,
+            False,
+            engine=engine,
+        )
+        worker.run_subprocess = mock.AsyncMock(return_value=JobResult(" ", " ", {}))
+        worker.draw_latex = mock.AsyncMock(return_value=b"image")
+        self.assertEqual(await worker.run(), b"image")
+        engine.convert.assert_awaited_once()
+        worker.run_subprocess.assert_not_awaited()
+        worker.draw_latex.assert_awaited_once_with(latex="latex")
+
+    async def test_draw_latex(self):
+        """test latex is rendered by renderer when given"""
+        renderer = mock.Mock()
+        renderer.render = mock.AsyncMock(return_value=b"image")
+        worker = ConverterWorker(
+            QuantumExpression.MATRIX,
+            QuantumExpression.MATRIX,
+            self.matrix_input,
+            MATRIX_CODE,
+            False,
+            image_format="svg",
+            renderer=renderer,
+        )
+        self.assertEqual(await worker.draw_latex("A"), b"image")
+        renderer.render.assert_awaited_once_with("A", "svg")
+
+        worker = ConverterWorker(
+            QuantumExpression.MATRIX,
+            QuantumExpression.MATRIX,
+            self.matrix_input,
+            MATRIX_CODE,
+            False,
+            image_format="tex",
+        )
+        self.assertEqual(await worker.draw_latex("A\nB"), b"$A B$\n")
@@ -0,0 +1,329 @@
+"""test worker_pool.py, fork_server.py and worker_process.py"""
+
+#  Licensed to the Apache Software Foundation (ASF) under one
+#  or more contributor license agreements.  See the NOTICE file
+#  distributed with this work for additional information
+#  regarding copyright ownership.  The ASF licenses this file
+#  to you under the Apache License, Version 2.0 (the
+#  "License"); you may not use this file except in compliance
+#  with the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing,
+#  software distributed under the License is distributed on an
+#  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#  KIND, either express or implied.  See the License for the
+#  specific language governing permissions and limitations
+#  under the License.
+
+import asyncio
+import io
+import os
+import sys
+import unittest
+from typing import BinaryIO
+from unittest import mock
+from qiskit_classroom.executor import ExecutionMode, create_executor
+from qiskit_classroom.fork_server import ForkServer
+from qiskit_classroom.worker_pool import PooledWorker, WorkerPool
+from qiskit_classroom.protocol import (
+    ConversionError,
+    Frame,
+    FrameDecoder,
+    encode_frame,
+    read_frame,
+)
+from qiskit_classroom.limits import (
+    ConversionMemoryExceeded,
+    ConversionTimeout,
+    ResourceLimits,
+)
+from qiskit_classroom.worker_process import execute_job, run_job, serve, serve_zygote
+
+
+class FakeWorker(PooledWorker):
+    """worker without process"""
+
+    def __init__(self, memory: int = 0, limit: str = None, delay: float = 0) -> None:
+        super().__init__(mock.Mock(returncode=None))
+        self.fake_memory = memory
+        self.fake_limit = limit
+        self.delay = delay
+
+    # pylint: disable=too-many-arguments
+    async def run(
+        self,
+        job_id: int,
+        source: str,
+        limits: dict = None,
+        on_line=None,
+        artifact=None,
+    ) -> Frame:
+        await asyncio.sleep(self.delay)
+        self.jobs_done += 1
+        self.memory = self.fake_memory
+        error = None
+        if source == "raise":
+            error = {"type": "ValueError", "message": "bad", "traceback": "trace"}
+        header = {
+            "type": "result",
+            "id": job_id,
+            "stdout": source,
+            "stderr": "",
+            "error": error,
+            "timings": {"execute": 0.5},
+            "memory": self.memory,
+            "limit": self.fake_limit,
+        }
+        return Frame(header)
+
+    def kill(self) -> None:
+        self.process.returncode = -9
+
+    async def stop(self) -> None:
+        self.kill()
+
+
+class WorkerPoolTest(unittest.IsolatedAsyncioTestCase):
+    """test worker pool"""
+
+    async def test_reuse_worker(self):
+        """test same worker runs following jobs"""
+        pool = WorkerPool(size=1)
+        pool.spawn_worker = mock.AsyncMock(side_effect=FakeWorker)
+        self.assertEqual((await pool.run("first")).stdout, "first")
+        self.assertEqual((await pool.run("second")).stdout, "second")
+        pool.spawn_worker.assert_awaited_once()
+        self.assertEqual(pool.workers[0].jobs_done, 2)
+
+    async def test_recycle_after_max_jobs(self):
+        """test worker is replaced after max_jobs_per_worker jobs"""
+        pool = WorkerPool(size=1, max_jobs_per_worker=1)
+        pool.spawn_worker = mock.AsyncMock(side_effect=FakeWorker)
+        await pool.run("first")
+        await asyncio.sleep(0)
+        self.assertEqual(pool.spawn_worker.await_count, 2)
+        await pool.run("second")
+        await asyncio.sleep(0)
+        self.assertEqual(pool.spawn_worker.await_count, 3)
+        self.assertEqual(len(pool.workers), 1)
+
+    async def test_recycle_above_memory(self):
+        """test worker is replaced when memory exceeds max_memory"""
+        pool = WorkerPool(size=1, max_memory=10)
+        pool.spawn_worker = mock.AsyncMock(side_effect=lambda: FakeWorker(memory=20))
+        first = await pool.run("first")
+        self.assertEqual(first.stdout, "first")
+        await asyncio.sleep(0)
+        self.assertEqual(pool.spawn_worker.await_count, 2)
+
+    async def test_stop(self):
+        """test stopped worker process is reaped"""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            "import time; time.sleep(60)",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        worker = PooledWorker(process)
+        await worker.stop()
+        self.assertFalse(worker.alive)
+        self.assertTrue(worker.channel.writer.is_closing())
+
+    async def test_start(self):
+        """test start fills pool"""
+        pool = WorkerPool(size=3)
+        pool.spawn_worker = mock.AsyncMock(side_effect=FakeWorker)
+        await pool.start()
+        self.assertEqual(len(pool.workers), 3)
+        workers = pool.workers
+        await pool.terminate()
+        self.assertEqual(pool.workers, [])
+        self.assertFalse(any(worker.alive for worker in workers))
+
+    async def test_script_error(self):
+        """test exception of script is raised as typed error and worker is kept"""
+        pool = WorkerPool(size=1)
+        pool.spawn_worker = mock.AsyncMock(side_effect=FakeWorker)
+        with self.assertRaises(ConversionError) as context:
+            await pool.run("raise")
+        self.assertEqual(context.exception.error_type, "ValueError")
+        self.assertEqual(context.exception.traceback, "trace")
+        self.assertEqual((await pool.run("next")).stdout, "next")
+        pool.spawn_worker.assert_awaited_once()
+
+    async def test_limit_exceeded(self):
+        """test breached limit raises typed error and replaces worker"""
+        pool = WorkerPool(size=1, limits=ResourceLimits())
+        pool.spawn_worker = mock.AsyncMock(
+            side_effect=lambda: FakeWorker(limit="memory")
+        )
+        with self.assertRaises(ConversionMemoryExceeded):
+            await pool.run("first")
+        await asyncio.sleep(0)
+        self.assertEqual(pool.spawn_worker.await_count, 2)
+
+    async def test_wall_time_exceeded(self):
+        """test slow job is stopped after wall_time"""
+        pool = WorkerPool(size=1, limits=ResourceLimits(wall_time=0.01))
+        pool.spawn_worker = mock.AsyncMock(side_effect=lambda: FakeWorker(delay=1))
+        with self.assertRaises(ConversionTimeout):
+            await pool.run("first")
+        await asyncio.sleep(0)
+        self.assertEqual(pool.spawn_worker.await_count, 2)
+
+    def test_invalid_size(self):
+        """test pool size validation"""
+        with self.assertRaises(ValueError):
+            WorkerPool(size=0)
+
+
+class ExecutorTest(unittest.TestCase):
+    """test create_executor"""
+
+    def test_create_executor(self):
+        """test executor of each mode"""
+        self.assertIsNone(create_executor(ExecutionMode.SUBPROCESS))
+        self.assertIsInstance(create_executor(ExecutionMode.POOL), WorkerPool)
+        if hasattr(os, "fork"):
+            self.assertIsInstance(
+                create_executor(ExecutionMode.FORK_SERVER), ForkServer
+            )
+
+
+class WorkerProcessTest(unittest.TestCase):
+    """test worker process side"""
+
+    source = "value = 1 + 1\nprint(value)\n"
+
+    def test_execute_job(self):
+        """test stdout is captured"""
+        result = execute_job(self.source)
+        self.assertEqual(result["stdout"], "2\n")
+        self.assertEqual(result["stderr"], "")
+        self.assertIsNone(result["error"])
+        self.assertEqual(set(result["timings"]), {"compile", "execute"})
+
+    def test_execute_job_error(self):
+        """test exception is returned with traceback"""
+        result = execute_job("print(undefined_name)", "<job>")
+        self.assertEqual(result["stdout"], "")
+        error = result["error"]
+        self.assertEqual(error["type"], "NameError")
+        self.assertIn("undefined_name", error["message"])
+        # source line is shown though script has no file
+        self.assertIn('File "<job>", line 1', error["traceback"])
+        self.assertIn("print(undefined_name)", error["traceback"])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "resource limits are posix only")
+    def test_run_job_memory_limit(self):
+        """test allocation above memory limit is reported as breached limit"""
+        message = run_job(
+            {
+                "id": 0,
+                "source": "data = bytearray(64 * 1024 ** 3)",
+                "limits": {"memory": 16 * 1024**3},
+            }
+        )
+        self.assertEqual(message.header["limit"], "memory")
+
+    def job(self, job_id: int, source: str, **fields) -> bytes:
+        """encode job frame"""
+        return encode_frame({"type": "job", "id": job_id, "source": source, **fields})
+
+    def test_serve(self):
+        """test serve answers every job"""
+        jobs = self.job(0, self.source) + self.job(1, "print(undefined_name)")
+        writer = io.BytesIO()
+        serve(io.BytesIO(jobs), writer)
+        headers = [frame.header for frame in FrameDecoder().feed(writer.getvalue())]
+        self.assertEqual(headers[0]["type"], "ready")
+        self.assertEqual([header["id"] for header in headers[1:]], [0, 1])
+        self.assertEqual(headers[1]["stdout"], "2\n")
+        self.assertIsNone(headers[1]["error"])
+        self.assertEqual(headers[2]["error"]["type"], "NameError")
+
+    def test_run_job_artifact(self):
+        """test image bound to __artifact__ is returned as payload"""
+        source = "__artifact__ = __import__('io').BytesIO()\n__artifact__.write(b'image')"
+        result = run_job({"id": 0, "source": source, "artifact": True})
+        self.assertIsNone(result.header["error"])
+        self.assertEqual(result.header["artifact"], 5)
+        self.assertEqual(result.payload, b"image")
+        result = run_job({"id": 1, "source": "", "artifact": True})
+        self.assertEqual(result.header["error"]["type"], "ArtifactMissing")
+        self.assertEqual(result.payload, b"")
+
+    def test_serve_artifact(self):
+        """test image is sent as payload of result frame"""
+        writer = io.BytesIO()
+        source = "__artifact__ = b'image'"
+        serve(io.BytesIO(self.job(3, source, artifact=True)), writer)
+        frames = list(FrameDecoder().feed(writer.getvalue()))
+        self.assertEqual(frames[1].header["artifact"], 5)
+        self.assertEqual(frames[1].payload, b"image")
+
+    def test_serve_stream(self):
+        """test stdout of streaming job is sent as line frames before result"""
+        writer = io.BytesIO()
+        serve(io.BytesIO(self.job(7, self.source, stream=True)), writer)
+        headers = [frame.header for frame in FrameDecoder().feed(writer.getvalue())]
+        self.assertEqual(headers[1], {"type": "line", "id": 7, "line": "2"})
+        self.assertEqual(headers[2]["type"], "result")
+        self.assertEqual(headers[2]["stdout"], "")
+
+    def start_zygote(self) -> tuple[int, BinaryIO]:
+        """fork zygote process serving over pipes. its children would keep
+        job pipe open if zygote ran in thread of this process
+
+        Returns:
+            tuple[int, BinaryIO]: job pipe and result stream. closing job
+            pipe stops zygote
+        """
+        job_read, job_write = os.pipe()
+        result_read, result_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                os.close(job_write)
+                os.close(result_read)
+                serve_zygote(job_read, os.fdopen(result_write, "wb"))
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+        os.close(job_read)
+        os.close(result_write)
+        results = os.fdopen(result_read, "rb")
+        self.addCleanup(results.close)
+        self.addCleanup(os.waitpid, pid, 0)
+        return (job_write, results)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not supported")
+    def test_serve_zygote(self):
+        """test zygote answers every job from forked children"""
+        source = self.source + "import os\nprint(os.getpid())\n"
+        jobs, results = self.start_zygote()
+        os.write(jobs, self.job(0, source) + self.job(1, source))
+        messages = [read_frame(results).header for _ in range(3)]
+        os.close(jobs)
+        self.assertEqual(messages[0]["type"], "ready")
+        results = sorted(messages[1:], key=lambda message: message["id"])
+        self.assertEqual([message["id"] for message in results], [0, 1])
+        child_pids = [message["stdout"].split()[1] for message in results]
+        self.assertNotIn(str(os.getpid()), child_pids)
+        self.assertNotEqual(child_pids[0], child_pids[1])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not supported")
+    def test_serve_zygote_eof(self):
+        """test zygote kills running children when job stream closes"""
+        source = "import os, time\nprint(os.getpid())\ntime.sleep(60)\n"
+        jobs, results = self.start_zygote()
+        os.write(jobs, self.job(0, source, stream=True))
+        self.assertEqual(read_frame(results).header["type"], "ready")
+        child_pid = int(read_frame(results).header["line"])
+        os.close(jobs)
+        # zygote exits and reaps child instead of waiting for it
+        self.assertIsNone(read_frame(results))
+        with self.assertRaises(ProcessLookupError):
+            os.kill(child_pid, 0)